@@ -0,0 +1,16 @@
+import timeit
+from typing import Callable
+
+
+def ops_per_second(
+    func: Callable[[], object], number: int = 10_000, repeat: int = 5
+) -> float:
+    """Returns the best rate out of `repeat` runs of `number` calls"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return number / best
+
+
+def report(results: dict[str, float], unit: str = "ops/s"):
+    width = max(map(len, results))
+    for name, value in results.items():
+        print(f"{name:<{width}}  {value:>14,.0f} {unit}")
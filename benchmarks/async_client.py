@@ -0,0 +1,107 @@
+"""AsyncS3Object against aioaws on a real bucket.
+
+Needs the `compare` dependency group and the usual environment
+variables (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION and
+BUCKET_NAME). Objects are written under a random prefix and removed at
+the end. Run with `python -m benchmarks.async_client`.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable
+from typing import Callable
+
+from simple_aws.config import default_loader
+from simple_aws.credentials import Credentials
+from simple_aws.services.s3 import AsyncS3Object
+from simple_aws.services.s3 import ObjectTuple
+from simple_aws.services.s3 import S3ObjectConfig
+
+from . import report
+
+OBJECTS = int(os.environ.get("BENCH_OBJECTS", "200"))
+OBJECT_SIZE = int(os.environ.get("BENCH_OBJECT_SIZE", str(16 * 1024)))
+CONCURRENCY = int(os.environ.get("BENCH_CONCURRENCY", "32"))
+
+
+async def _timed(
+    keys: list[str], func: Callable[[str], Awaitable[object]]
+) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def run(key: str):
+        async with semaphore:
+            await func(key)
+
+    start = time.perf_counter()
+    await asyncio.gather(*map(run, keys))
+    return len(keys) / (time.perf_counter() - start)
+
+
+async def bench_simple_aws(
+    credentials: Credentials, config: S3ObjectConfig, prefix: str
+):
+    keys = [f"{prefix}simple-aws/{i}.bin" for i in range(OBJECTS)]
+    content = os.urandom(OBJECT_SIZE)
+    async with AsyncS3Object(
+        credentials, config, max_concurrency=CONCURRENCY
+    ) as s3:
+        results = {
+            "simple_aws upload": await _timed(
+                keys, lambda key: s3.upload(key, content)
+            ),
+            "simple_aws download": await _timed(keys, s3.download),
+        }
+        start = time.perf_counter()
+        listed = [item async for item in s3.list_objects(prefix)]
+        results["simple_aws list"] = len(listed) / (
+            time.perf_counter() - start
+        )
+        await s3.delete_many(*(ObjectTuple(key) for key in keys))
+    return results
+
+
+async def bench_aioaws(
+    credentials: Credentials, config: S3ObjectConfig, prefix: str
+):
+    from aioaws.s3 import S3Client
+    from aioaws.s3 import S3Config
+    from httpx import AsyncClient
+
+    keys = [f"{prefix}aioaws/{i}.bin" for i in range(OBJECTS)]
+    content = os.urandom(OBJECT_SIZE)
+    async with AsyncClient() as http_client:
+        s3 = S3Client(
+            http_client,
+            S3Config(
+                credentials.access_key_id,
+                credentials.secret_access_key,
+                credentials.region,
+                config.bucket_name,
+            ),
+        )
+        results = {
+            "aioaws upload": await _timed(
+                keys, lambda key: s3.upload(key, content)
+            ),
+            "aioaws download": await _timed(keys, s3.download),
+        }
+        start = time.perf_counter()
+        listed = [item async for item in s3.list(prefix)]
+        results["aioaws list"] = len(listed) / (time.perf_counter() - start)
+        await s3.delete(*keys)
+    return results
+
+
+async def main():
+    credentials = default_loader.load(Credentials)
+    config = default_loader.load(S3ObjectConfig)
+    prefix = f"benchmarks/{uuid.uuid4()}/"
+    results = await bench_simple_aws(credentials, config, prefix)
+    results |= await bench_aioaws(credentials, config, prefix)
+    report(results, "objects/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Cold start cost of the package, from `python -X importtime`.
+
+Each statement runs in a fresh interpreter and is measured by the
+time spent in the imports it triggers. Results are the inverse of
+the best of `repeat` runs, so like the other benchmarks higher is
+better.
+"""
+import subprocess
+import sys
+
+from . import report
+
+FACTORY = """
+from simple_aws.credentials import Credentials
+from simple_aws.services import ServiceFactory
+factory = ServiceFactory(
+    Credentials(access_key_id="a", secret_access_key="b", region="r")
+)
+"""
+STATEMENTS = {
+    "import simple_aws": "import simple_aws",
+    "ServiceFactory()": FACTORY,
+    "ServiceFactory.s3_object()": FACTORY
+    + """
+from simple_aws.services.s3 import S3ObjectConfig
+factory.s3_object(S3ObjectConfig(bucket_name="bucket"))
+""",
+}
+# written before the statement runs, the imports made by the
+# interpreter startup are printed before it
+MARKER = "-- statement --"
+
+
+def import_time(statement: str) -> int:
+    """Microseconds the imports made by `statement` took"""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys\nprint({MARKER!r}, file=sys.stderr, flush=True)\n"
+            + statement,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in completed.stderr.partition(MARKER)[2].splitlines():
+        _, cumulative, name = (line.split("|", 2) + ["", ""])[:3]
+        # nested imports are indented and already counted by their parent
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total
+
+
+def imports_per_second(statement: str, repeat: int = 5) -> float:
+    best = min(import_time(statement) for _ in range(repeat))
+    return 1_000_000 / max(best, 1)
+
+
+def run(repeat: int = 5) -> dict[str, float]:
+    return {
+        name: imports_per_second(statement, repeat)
+        for name, statement in STATEMENTS.items()
+    }
+
+
+if __name__ == "__main__":
+    report({name: 1_000_000 / rate for name, rate in run().items()}, "us")
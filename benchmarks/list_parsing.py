@@ -0,0 +1,130 @@
+"""ListObjectsV2 page parsing throughput.
+
+Run with `python -m benchmarks.list_parsing`. `fromstring` is the
+previous approach, stripping the namespace with a regex and building the
+whole tree before reading any entry. The streaming numbers feed the page
+to `ListPageParser` the way `List.iter` reads it from the socket. Peak
+memory is measured with tracemalloc on a single page of `BENCH_KEYS`.
+"""
+import os
+import re
+import tracemalloc
+from typing import Callable
+from xml.etree import ElementTree as ET
+
+from simple_aws.services.s3.models import FileInfo
+from simple_aws.services.s3.object.list_ import READ_SIZE
+from simple_aws.services.s3.object.list_ import ListPageParser
+from simple_aws.services.s3.object.list_ import parse_file_info
+from simple_aws.services.s3.object.list_ import parse_key
+from simple_aws.services.s3.object.list_ import parse_record
+from simple_aws.utils import xmlns
+
+from . import ops_per_second
+from . import report
+
+KEYS = int(os.environ.get("BENCH_KEYS", "1000"))
+xmlns_re = re.compile(f' xmlns="{re.escape(xmlns)}"'.encode())
+
+
+def make_page(keys: int = KEYS) -> bytes:
+    contents = "".join(
+        "<Contents>"
+        f"<Key>some/prefix/object-{index:08d}.bin</Key>"
+        "<LastModified>2023-01-01T00:00:00.000Z</LastModified>"
+        '<ETag>"d41d8cd98f00b204e9800998ecf8427e"</ETag>'
+        f"<Size>{index}</Size>"
+        "<StorageClass>STANDARD</StorageClass>"
+        "</Contents>"
+        for index in range(keys)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<ListBucketResult xmlns="{xmlns}">'
+        "<Name>bucket</Name><Prefix>some/prefix/</Prefix>"
+        f"<KeyCount>{keys}</KeyCount><MaxKeys>{keys}</MaxKeys>"
+        "<IsTruncated>true</IsTruncated>"
+        f"{contents}"
+        "<NextContinuationToken>token</NextContinuationToken>"
+        "</ListBucketResult>"
+    ).encode()
+
+
+page = make_page()
+blocks = [page[i : i + READ_SIZE] for i in range(0, len(page), READ_SIZE)]
+
+
+def parse_fromstring():
+    xml_content = ET.fromstring(xmlns_re.sub(b"", page))
+    items = [
+        FileInfo.parse_obj({item.tag: item.text for item in contents})
+        for contents in xml_content.findall("Contents")
+    ]
+    return items, xml_content.find("NextContinuationToken")
+
+
+def parse_streaming(parse_contents=parse_file_info):
+    parser = ListPageParser(parse_contents)
+    items = [item for block in blocks for item in parser.feed(block)]
+    return items, parser.close()
+
+
+def first_item_fromstring():
+    xml_content = ET.fromstring(xmlns_re.sub(b"", page))
+    contents = xml_content.find("Contents")
+    return FileInfo.parse_obj({item.tag: item.text for item in contents})
+
+
+def first_item_streaming():
+    return next(ListPageParser().feed(blocks[0]))
+
+
+def iter_streaming():
+    parser = ListPageParser()
+    for block in blocks:
+        for _ in parser.feed(block):
+            pass
+    parser.close()
+
+
+def iter_fromstring():
+    for _ in parse_fromstring()[0]:
+        pass
+
+
+def peak_kib(func: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run() -> dict[str, float]:
+    return {
+        "fromstring (pages)": ops_per_second(parse_fromstring, 10, 3),
+        "streaming (pages)": ops_per_second(parse_streaming, 10, 3),
+        "streaming compact (pages)": ops_per_second(
+            lambda: parse_streaming(parse_record), 10, 3
+        ),
+        "streaming keys only (pages)": ops_per_second(
+            lambda: parse_streaming(parse_key), 10, 3
+        ),
+        "fromstring (first entry)": ops_per_second(
+            first_item_fromstring, 10, 3
+        ),
+        "streaming (first entry)": ops_per_second(first_item_streaming, 10, 3),
+    }
+
+
+def run_memory() -> dict[str, float]:
+    return {
+        "fromstring (peak)": peak_kib(iter_fromstring),
+        "streaming (peak)": peak_kib(iter_streaming),
+    }
+
+
+if __name__ == "__main__":
+    report(run(), "/s")
+    report(run_memory(), "KiB")
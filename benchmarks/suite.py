@@ -0,0 +1,189 @@
+"""Offline benchmarks of the request hot paths, saved as JSON.
+
+Run with `python -m benchmarks.suite`. Every input is built in memory,
+whole operations are answered by an `InMemoryS3`, so runs only differ
+by the machine and the code. `--output` saves the results and
+`--baseline` compares against saved ones, exiting with an error when
+a benchmark got slower than `--tolerance` allows.
+
+Cold starts are measured under a `cold start:` prefix, as the inverse
+of the import time of fresh interpreters (see `benchmarks.imports`).
+With the `compare` dependency group installed, aioaws equivalents are
+measured too, under an `aioaws:` prefix.
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+from typing import Optional
+
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.models import FileInfo
+from simple_aws.services.s3.object.delete import DeleteMany
+from simple_aws.services.s3.object.delete import ObjectTuple
+from simple_aws.services.s3.object.get import Get
+from simple_aws.services.s3.object.upload import Upload
+
+from . import imports
+from . import ops_per_second
+from . import report
+from .list_parsing import parse_streaming
+from .presign import core
+from .presign import credentials
+from .signing import headers_cached
+
+Benchmark = tuple[Callable[[], object], int]
+
+get = Get(core, "folder/sub folder/file.txt")
+upload = Upload(core, "folder/file.txt", b"content")
+delete = DeleteMany(core, ())
+delete_batch = [
+    ObjectTuple(f"folder/file-{index}.txt") for index in range(1000)
+]
+file_info = {
+    "Key": "folder/file.txt",
+    "LastModified": "2023-01-01T00:00:00.000Z",
+    "ETag": '"d41d8cd98f00b204e9800998ecf8427e"',
+    "Size": "1024",
+    "StorageClass": "STANDARD",
+}
+# whole operations, signed, verified and answered in memory
+backend = InMemoryS3(credentials)
+s3 = S3Object(credentials, core.config, transport=backend.transport)
+backend.put_object(core.config.bucket_name, "folder/file.txt", b"content")
+
+
+def benchmarks() -> dict[str, Benchmark]:
+    return {
+        "AwsAuthV4.headers": (headers_cached, 10_000),
+        "Get.presigned_url": (get.presigned_url, 10_000),
+        "Upload._put_object_fields": (
+            lambda: upload._put_object_fields("folder", "file.txt"),
+            10_000,
+        ),
+        "List page parsing (1000 keys)": (parse_streaming, 20),
+        "DeleteMany.build_payload (1000 keys)": (
+            lambda: delete.build_payload(delete_batch),
+            100,
+        ),
+        "FileInfo.parse_obj": (lambda: FileInfo.parse_obj(file_info), 10_000),
+        "S3Object.upload (in memory)": (
+            lambda: s3.upload("folder/upload.txt", b"content"),
+            1000,
+        ),
+        "S3Object.object_info (in memory)": (
+            lambda: s3.object_info("folder/file.txt"),
+            1000,
+        ),
+        "S3Object.download (in memory)": (
+            lambda: s3.download("folder/file.txt"),
+            1000,
+        ),
+        **aioaws_benchmarks(),
+    }
+
+
+def aioaws_benchmarks() -> dict[str, Benchmark]:
+    try:
+        from aioaws.s3 import S3Client
+        from aioaws.s3 import S3Config
+    except ImportError:
+        return {}
+    s3 = S3Client(
+        None,  # type: ignore
+        S3Config(
+            credentials.access_key_id,
+            credentials.secret_access_key,
+            credentials.region,
+            core.config.bucket_name,
+        ),
+    )
+    return {
+        "aioaws: Get.presigned_url": (
+            lambda: s3.signed_download_url("folder/sub folder/file.txt"),
+            10_000,
+        ),
+        "aioaws: Upload._put_object_fields": (
+            lambda: s3.signed_upload_url(
+                path="folder/",
+                filename="file.txt",
+                content_type="text/plain",
+                size=7,
+            ),
+            10_000,
+        ),
+    }
+
+
+def run(names: Optional[list[str]] = None) -> dict[str, float]:
+    results = {
+        name: ops_per_second(func, number, 3)
+        for name, (func, number) in benchmarks().items()
+        if not names or name in names
+    }
+    for name, statement in imports.STATEMENTS.items():
+        name = f"cold start: {name}"
+        if not names or name in names:
+            results[name] = imports.imports_per_second(statement, 3)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    """Prints the change of each result against the baseline and
+    returns the benchmarks that got slower than `tolerance`"""
+    width = max(map(len, results))
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        slower = change < -tolerance
+        if slower:
+            regressions.append(name)
+        print(
+            f"{name:<{width}}  {change:>+8.1%}"
+            + ("  REGRESSION" if slower else "")
+        )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--output", help="file to save the results in")
+    parser.add_argument("--baseline", help="results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("names", nargs="*", help="benchmarks to run")
+    args = parser.parse_args(argv)
+
+    results = run(args.names)
+    report(results)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "unit": "ops/s",
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        print()
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from typing import Any
+from typing import AsyncIterator
+from typing import Mapping
+from typing import Optional
+from typing import Union
+
+from gyver.context import AsyncAdapter
+from gyver.url import URL
+from gyver.utils import lazyfield
+
+from simple_aws.auth import AwsAuthV4
+from simple_aws.auth import PayloadSigning
+from simple_aws.exc import InvalidParam
+from simple_aws.typedef import METHODS
+
+from .credentials import Credentials
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+def _require_httpx():
+    if httpx is None:
+        raise ImportError(
+            "httpx is required for the async client, "
+            "install it with `pip install simple-aws[async]`"
+        )
+
+
+@dataclass(frozen=True)
+class AsyncAuthHttpClient:
+    """asyncio counterpart of `AuthHttpClient` backed by a pooled
+    `httpx.AsyncClient`.
+
+    At most `max_concurrency` requests are in flight at the same time,
+    defaulting to the size of the connection pool. `transport`
+    replaces the httpx network transport, as `httpx.MockTransport`
+    does in tests."""
+
+    credentials: Credentials
+    service: str
+    use_default_headers: bool = True
+    verify_ssl: bool = True
+    payload_signing: PayloadSigning = PayloadSigning.SHA256_MD5
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_concurrency: Optional[int] = None
+    transport: Optional["httpx.AsyncBaseTransport"] = None
+
+    @lazyfield
+    def aws_auth(self):
+        return AwsAuthV4(
+            self.credentials,
+            self.service,
+            self.use_default_headers,
+            self.payload_signing,
+        )
+
+    @lazyfield
+    def session(self) -> "httpx.AsyncClient":
+        _require_httpx()
+        return httpx.AsyncClient(
+            verify=self.verify_ssl,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            transport=self.transport,
+        )
+
+    @lazyfield
+    def semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency or self.max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
+        await self.session.aclose()
+
+    def is_closed(self) -> bool:
+        return self.session.is_closed
+
+    def _headers(
+        self,
+        method: METHODS,
+        url: URL,
+        headers: Optional[Mapping[str, str]],
+        raw: bool,
+        data: bytes = b"",
+        payload_signing: Optional[PayloadSigning] = None,
+    ):
+        headers = headers or {}
+        if raw:
+            return headers
+        return self.aws_auth.headers(
+            method,
+            url,
+            headers=headers,
+            data=data,
+            payload_signing=payload_signing,
+        )
+
+    async def request(
+        self,
+        method: METHODS,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+        data: Union[bytes, Mapping[str, Any]] = b"",
+        files: Optional[Mapping[str, bytes]] = None,
+        payload_signing: Optional[PayloadSigning] = None,
+    ) -> "httpx.Response":
+        if not isinstance(data, bytes):
+            if not raw:
+                raise InvalidParam(
+                    "data", data, "Requests using data as mapping must be raw"
+                )
+            content, form = None, data
+        else:
+            content, form = data or None, None
+        headers = self._headers(
+            method,
+            url,
+            headers,
+            raw,
+            data if isinstance(data, bytes) else b"",
+            payload_signing,
+        )
+        async with self.semaphore:
+            return await self.session.request(
+                method,
+                url.encode(),
+                headers=headers,
+                content=content,
+                data=form,
+                files=files,
+            )
+
+    async def head(
+        self,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+    ):
+        return await self.request("HEAD", url, headers, raw)
+
+    async def get(
+        self,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+    ):
+        return await self.request("GET", url, headers, raw)
+
+    async def delete(
+        self,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+    ):
+        return await self.request("DELETE", url, headers, raw)
+
+    async def post(
+        self,
+        url: URL,
+        data: Union[bytes, Mapping[str, Any]] = b"",
+        headers: Optional[Mapping[str, str]] = None,
+        files: Optional[Mapping[str, bytes]] = None,
+        raw: bool = False,
+        payload_signing: Optional[PayloadSigning] = None,
+    ):
+        return await self.request(
+            "POST", url, headers, raw, data, files, payload_signing
+        )
+
+    async def put(
+        self,
+        url: URL,
+        data: bytes = b"",
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+        payload_signing: Optional[PayloadSigning] = None,
+    ):
+        return await self.request(
+            "PUT", url, headers, raw, data, payload_signing=payload_signing
+        )
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        method: METHODS,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+    ) -> AsyncIterator["httpx.Response"]:
+        """Sends a bodyless request and yields the response
+        before its body is read"""
+        headers = self._headers(method, url, headers, raw)
+        async with self.semaphore:
+            async with self.session.stream(
+                method, url.encode(), headers=headers
+            ) as response:
+                yield response
+
+
+@dataclass(frozen=True)
+class AsyncAuthHttpAdapter(AsyncAdapter[AsyncAuthHttpClient]):
+    credentials: Credentials
+    service: str
+    use_default_headers: bool = True
+    verify_ssl: bool = True
+    payload_signing: PayloadSigning = PayloadSigning.SHA256_MD5
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_concurrency: Optional[int] = None
+    transport: Optional["httpx.AsyncBaseTransport"] = None
+
+    async def is_closed(self, client: AsyncAuthHttpClient) -> bool:
+        return client.is_closed()
+
+    async def release(self, client: AsyncAuthHttpClient) -> None:
+        await client.close()
+
+    async def new(self):
+        return AsyncAuthHttpClient(
+            self.credentials,
+            self.service,
+            self.use_default_headers,
+            self.verify_ssl,
+            self.payload_signing,
+            self.max_connections,
+            self.max_concurrency,
+            self.transport,
+        )
@@ -4,6 +4,8 @@ from typing import TypeVar
 from gyver.config import ConfigLoader
 from gyver.config import ProviderConfig
 
+DEFAULT_POOL_SIZE = 10
+
 default_loader = ConfigLoader()
 
 ProviderConfigT = TypeVar("ProviderConfigT", bound=ProviderConfig)
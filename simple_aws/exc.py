@@ -1,6 +1,5 @@
 from typing import Any
-
-import requests
+from typing import Protocol
 
 
 class SimpleAwsError(Exception):
@@ -15,8 +14,20 @@ class InvalidParam(SimpleAwsError):
         self.message = message
 
 
+class HttpResponse(Protocol):
+    """What errors need from `requests` or `httpx` responses"""
+
+    @property
+    def status_code(self) -> int:
+        ...
+
+    @property
+    def url(self) -> Any:
+        ...
+
+
 class RequestFailed(SimpleAwsError):
-    def __init__(self, response: requests.Response) -> None:
+    def __init__(self, response: HttpResponse) -> None:
         super().__init__(response.status_code, response.url)
         self.response = response
 
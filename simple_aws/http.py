@@ -1,5 +1,12 @@
+import contextlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from typing import Any
+from typing import Callable
 from typing import Literal
 from typing import Mapping
 from typing import Optional
@@ -12,10 +19,39 @@ from gyver.url import URL
 from gyver.utils import lazyfield
 
 from simple_aws.auth import AwsAuthV4
+from simple_aws.auth import PayloadSigning
 from simple_aws.exc import InvalidParam
+from simple_aws.instrumentation import RequestDescriber
+from simple_aws.instrumentation import RequestHook
+from simple_aws.instrumentation import RequestRecord
+from simple_aws.instrumentation import describe_request
+from simple_aws.retry import THROTTLING_STATUSES
+from simple_aws.retry import AdaptiveRateLimiter
+from simple_aws.retry import RetryPolicy
+from simple_aws.retry import rate_key
+from simple_aws.streaming import DEFAULT_CHUNK_SIZE
+from simple_aws.streaming import ChunkedPayload
+from simple_aws.streaming import PayloadSource
+from simple_aws.streaming import source_length
+from simple_aws.transport import DEFAULT_POOL_SIZE
+from simple_aws.transport import RequestsTransport
+from simple_aws.transport import Transport
+from simple_aws.transport import TransportFactory
+from simple_aws.transport import TransportOptions
+from simple_aws.transport import opened_connections
+from simple_aws.typedef import METHODS
 
 from .credentials import Credentials
 
+logger = logging.getLogger(__name__)
+
+
+class _Timing:
+    def __init__(self) -> None:
+        self.signing = 0.0
+        self.retries = 0
+        self.headers: Mapping[str, str] = {}
+
 
 @dataclass(frozen=True)
 class AuthHttpClient:
@@ -23,18 +59,49 @@ class AuthHttpClient:
     service: str
     use_default_headers: bool = True
     verify_ssl: bool = True
+    payload_signing: PayloadSigning = PayloadSigning.SHA256_MD5
+    pool_size: int = DEFAULT_POOL_SIZE
+    keep_alive: bool = True
+    retry_policy: RetryPolicy = RetryPolicy()
+    rate_limiter: Optional[AdaptiveRateLimiter] = None
+    # waits the retry backoff delays
+    sleep: Callable[[float], None] = time.sleep
+    hooks: tuple[RequestHook, ...] = ()
+    describe: RequestDescriber = describe_request
+    transport_factory: TransportFactory = RequestsTransport
 
     @lazyfield
     def aws_auth(self):
         return AwsAuthV4(
-            self.credentials, self.service, self.use_default_headers
+            self.credentials,
+            self.service,
+            self.use_default_headers,
+            self.payload_signing,
         )
 
     @lazyfield
-    def session(self):
-        session = requests.Session()
-        session.verify = self.verify_ssl
-        return session
+    def transport(self) -> Transport:
+        return self.transport_factory(
+            TransportOptions(
+                self.pool_size,
+                self.keep_alive,
+                self.verify_ssl,
+                count_connections=bool(self.hooks),
+            )
+        )
+
+    def prewarm(self, url: URL, connections: int):
+        """Opens up to `connections` connections to `url`'s host
+        by sending that many concurrent HEAD requests, so they are
+        ready in the pool for later requests"""
+        connections = min(connections, self.pool_size)
+        if connections < 1:
+            return
+        with ThreadPoolExecutor(connections) as executor:
+            for response in executor.map(
+                lambda _: self.head(url), range(connections)
+            ):
+                response.close()
 
     def __enter__(self):
         return self
@@ -43,7 +110,130 @@ class AuthHttpClient:
         self.close()
 
     def close(self):
-        self.session.close()
+        self.transport.close()
+
+    def _send(
+        self,
+        method: METHODS,
+        url: URL,
+        sign: Callable[[], Mapping[str, str]],
+        send: Callable[[Mapping[str, str]], requests.Response],
+        idempotent: bool = True,
+        bytes_sent: int = 0,
+    ) -> requests.Response:
+        """Sends a request signed by `sign`, waiting for the rate
+        limiter first. Idempotent requests failing with a throttling
+        or transient error are signed and sent again, following the
+        retry policy, until they succeed or run out of attempts.
+
+        With hooks, they receive a record of the request once done.
+        Hooks failing are logged, never replacing the response or the
+        error of the request"""
+        if not self.hooks:
+            return self._send_attempts(url, sign, send, idempotent, None)
+        timing = _Timing()
+        started = time.perf_counter()
+        opened = opened_connections()
+        response = None
+        try:
+            response = self._send_attempts(url, sign, send, idempotent, timing)
+            return response
+        finally:
+            try:
+                record = self._record(
+                    method, url, timing, started, opened, response, bytes_sent
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to record %s %s", method, url.encode()
+                )
+            else:
+                for hook in self.hooks:
+                    try:
+                        hook(record)
+                    except Exception:
+                        logger.exception("Request hook %r failed", hook)
+
+    def _record(
+        self,
+        method: METHODS,
+        url: URL,
+        timing: _Timing,
+        started: float,
+        opened: int,
+        response: Optional[requests.Response],
+        bytes_sent: int,
+    ) -> RequestRecord:
+        operation, bucket = self.describe(method, url, timing.headers)
+        return RequestRecord(
+            operation,
+            bucket,
+            method,
+            None if response is None else response.status_code,
+            bytes_sent,
+            0
+            if response is None
+            else int(response.headers.get("content-length") or 0),
+            timing.signing,
+            0.0 if response is None else response.elapsed.total_seconds(),
+            time.perf_counter() - started,
+            response is not None and opened_connections() == opened,
+            timing.retries,
+        )
+
+    def _send_attempts(
+        self,
+        url: URL,
+        sign: Callable[[], Mapping[str, str]],
+        send: Callable[[Mapping[str, str]], requests.Response],
+        idempotent: bool,
+        timing: Optional["_Timing"],
+    ) -> requests.Response:
+        attempts = self.retry_policy.max_attempts if idempotent else 1
+        key = rate_key(url) if self.rate_limiter is not None else ""
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(key)
+            attempt += 1
+            try:
+                if timing is None:
+                    response = send(sign())
+                else:
+                    timing.retries = attempt - 1
+                    signing_started = time.perf_counter()
+                    timing.headers = sign()
+                    timing.signing += time.perf_counter() - signing_started
+                    response = send(timing.headers)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == attempts:
+                    raise
+            else:
+                status = response.status_code
+                if (
+                    self.rate_limiter is not None
+                    and status in THROTTLING_STATUSES
+                ):
+                    self.rate_limiter.on_throttle(key)
+                if attempt == attempts or not self.retry_policy.should_retry(
+                    status
+                ):
+                    return response
+                response.close()
+            self.sleep(self.retry_policy.delay(attempt - 1))
+
+    def _sign(
+        self,
+        method: METHODS,
+        url: URL,
+        headers: Optional[Mapping[str, str]],
+        raw: bool,
+        **kwargs,
+    ) -> Mapping[str, str]:
+        headers = headers or {}
+        if raw:
+            return headers
+        return self.aws_auth.headers(method, url, headers=headers, **kwargs)
 
     def head(
         self,
@@ -51,27 +241,45 @@ class AuthHttpClient:
         headers: Optional[Mapping[str, str]] = None,
         raw: bool = False,
     ):
-        headers = headers or {}
-        headers = (
-            headers
-            if raw
-            else self.aws_auth.headers("HEAD", url, headers=headers)
+        return self._send(
+            "HEAD",
+            url,
+            partial(self._sign, "HEAD", url, headers, raw),
+            lambda signed: self.transport.request(
+                "HEAD", url.encode(), signed
+            ),
         )
-        return self.session.head(url.encode(), headers=headers)
 
     def get(
         self,
         url: URL,
         headers: Optional[Mapping[str, str]] = None,
         raw: bool = False,
+        stream: bool = False,
     ):
-        headers = headers or {}
-        headers = (
-            headers
-            if raw
-            else self.aws_auth.headers("GET", url, headers=headers)
+        return self._send(
+            "GET",
+            url,
+            partial(self._sign, "GET", url, headers, raw),
+            lambda signed: self.transport.request(
+                "GET", url.encode(), signed, stream=stream
+            ),
+        )
+
+    def delete(
+        self,
+        url: URL,
+        headers: Optional[Mapping[str, str]] = None,
+        raw: bool = False,
+    ):
+        return self._send(
+            "DELETE",
+            url,
+            partial(self._sign, "DELETE", url, headers, raw),
+            lambda signed: self.transport.request(
+                "DELETE", url.encode(), signed
+            ),
         )
-        return self.session.get(url.encode(), headers=headers)
 
     @overload
     def post(
@@ -81,6 +289,8 @@ class AuthHttpClient:
         headers: Optional[Mapping[str, str]] = None,
         files: Optional[Mapping[str, bytes]] = None,
         raw: bool = False,
+        payload_signing: Optional[PayloadSigning] = None,
+        idempotent: bool = False,
     ) -> requests.Response:
         ...
 
@@ -93,6 +303,8 @@ class AuthHttpClient:
         files: Optional[Mapping[str, bytes]] = None,
         *,
         raw: Literal[True],
+        payload_signing: Optional[PayloadSigning] = None,
+        idempotent: bool = False,
     ) -> requests.Response:
         ...
 
@@ -103,18 +315,19 @@ class AuthHttpClient:
         headers: Optional[Mapping[str, str]] = None,
         files: Optional[Mapping[str, bytes]] = None,
         raw: bool = False,
+        payload_signing: Optional[PayloadSigning] = None,
+        idempotent: bool = False,
     ):
-        headers = headers or {}
-        if not raw:
-            if not isinstance(data, bytes):
-                raise InvalidParam(
-                    "data", data, "Requests using data as mapping must be raw"
-                )
-            headers = self.aws_auth.headers(
-                "POST", url, headers=headers, data=data
-            )
-        return self.session.post(
-            url.encode(), data=data, headers=headers, files=files
+        """POST requests are only retried when `idempotent`"""
+        return self._send_data(
+            "POST",
+            url,
+            data,
+            headers,
+            files,
+            raw,
+            payload_signing,
+            idempotent,
         )
 
     def put(
@@ -124,18 +337,88 @@ class AuthHttpClient:
         headers: Optional[Mapping[str, str]] = None,
         files: Optional[Mapping[str, bytes]] = None,
         raw: bool = False,
+        payload_signing: Optional[PayloadSigning] = None,
     ):
-        headers = headers or {}
-        if not raw:
-            if not isinstance(data, bytes):
-                raise InvalidParam(
-                    "data", data, "Requests using data as mapping must be raw"
-                )
-            headers = self.aws_auth.headers(
-                "PUT", url, headers=headers, data=data
+        return self._send_data(
+            "PUT", url, data, headers, files, raw, payload_signing
+        )
+
+    def _send_data(
+        self,
+        method: Literal["POST", "PUT"],
+        url: URL,
+        data: Union[bytes, Mapping[str, Any]],
+        headers: Optional[Mapping[str, str]],
+        files: Optional[Mapping[str, bytes]],
+        raw: bool,
+        payload_signing: Optional[PayloadSigning],
+        idempotent: bool = True,
+    ) -> requests.Response:
+        if not raw and not isinstance(data, bytes):
+            raise InvalidParam(
+                "data", data, "Requests using data as mapping must be raw"
+            )
+        return self._send(
+            method,
+            url,
+            partial(
+                self._sign,
+                method,
+                url,
+                headers,
+                raw,
+                data=data,
+                payload_signing=payload_signing,
+            ),
+            lambda signed: self.transport.request(
+                method, url.encode(), signed, data, files
+            ),
+            idempotent,
+            (len(data) if isinstance(data, bytes) else 0)
+            + sum(len(content) for content in (files or {}).values()),
+        )
+
+    def put_stream(
+        self,
+        url: URL,
+        body: PayloadSource,
+        content_length: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        content_type: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """Sends `body` with aws-chunked streaming signatures,
+        reading it in `chunk_size` blocks instead of all at once.
+        `content_length` may be omitted for seekable file objects"""
+        if content_length is None:
+            content_length = source_length(body)
+        if content_length is None:
+            raise InvalidParam(
+                "content_length",
+                content_length,
+                "Content length is required for non seekable bodies",
             )
-        return self.session.put(
-            url.encode(), data=data, headers=headers, files=files
+        headers, signer = self.aws_auth.streaming_headers(
+            "PUT",
+            url,
+            content_length,
+            chunk_size,
+            headers=headers,
+            content_type=content_type,
+        )
+        # the body is read while sent, so it cannot be sent again
+        return self._send(
+            "PUT",
+            url,
+            lambda: headers,
+            lambda signed: self.transport.request(
+                "PUT",
+                url.encode(),
+                signed,
+                ChunkedPayload(body, content_length, signer, chunk_size),
+            ),
+            idempotent=False,
+            bytes_sent=content_length,
         )
 
 
@@ -145,9 +428,19 @@ class AuthHttpAdapter(Adapter[AuthHttpClient]):
     service: str
     use_default_headers: bool = True
     verify_ssl: bool = True
+    payload_signing: PayloadSigning = PayloadSigning.SHA256_MD5
+    pool_size: int = DEFAULT_POOL_SIZE
+    keep_alive: bool = True
+    retry_policy: RetryPolicy = RetryPolicy()
+    rate_limiter: Optional[AdaptiveRateLimiter] = None
+    # waits the retry backoff delays
+    sleep: Callable[[float], None] = time.sleep
+    hooks: tuple[RequestHook, ...] = ()
+    describe: RequestDescriber = describe_request
+    transport_factory: TransportFactory = RequestsTransport
 
     def is_closed(self, client: AuthHttpClient) -> bool:
-        """`requests.Session` doesn't have a closed state
+        """Transports don't have a closed state
         so we implement this only for interface purposes"""
         del client
         return False
@@ -161,4 +454,74 @@ class AuthHttpAdapter(Adapter[AuthHttpClient]):
             self.service,
             self.use_default_headers,
             self.verify_ssl,
+            self.payload_signing,
+            self.pool_size,
+            self.keep_alive,
+            self.retry_policy,
+            self.rate_limiter,
+            self.sleep,
+            self.hooks,
+            self.describe,
+            self.transport_factory,
         )
+
+
+class PooledContext:
+    """Thread safe replacement for `gyver.context.Context` that keeps a
+    single long-lived `AuthHttpClient` instead of creating one for each
+    outermost `begin`, so every call reuses warm pooled connections.
+
+    The client is created on first use, passed to `on_new` (to prewarm
+    connections for example) and only released by `close`."""
+
+    def __init__(
+        self,
+        adapter: AuthHttpAdapter,
+        on_new: Optional[Callable[[AuthHttpClient], None]] = None,
+    ) -> None:
+        self._adapter = adapter
+        self._on_new = on_new
+        self._lock = threading.Lock()
+        self._client: Optional[AuthHttpClient] = None
+
+    @property
+    def adapter(self) -> AuthHttpAdapter:
+        return self._adapter
+
+    @property
+    def client(self) -> AuthHttpClient:
+        if (client := self._client) is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                client = self._adapter.new()
+                # create the transport before sharing the client
+                client.transport
+                if self._on_new is not None:
+                    self._on_new(client)
+                self._client = client
+            return self._client
+
+    def is_active(self) -> bool:
+        return self._client is not None
+
+    def acquire(self) -> AuthHttpClient:
+        return self.client
+
+    def release(self):
+        """Connections stay pooled until `close`"""
+
+    @contextlib.contextmanager
+    def open(self):
+        self.acquire()
+        yield
+
+    @contextlib.contextmanager
+    def begin(self):
+        yield self.acquire()
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            self._adapter.release(client)
@@ -0,0 +1,153 @@
+import math
+import threading
+from typing import Callable
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+
+from gyver.url import URL
+
+
+class RequestRecord(NamedTuple):
+    """What happened to one request, including its retries.
+
+    `status` is None when it failed without a response. Times are in
+    seconds, `time_to_first_byte` being the time the last attempt took
+    to receive the response headers."""
+
+    operation: str
+    bucket: str
+    method: str
+    status: Optional[int]
+    bytes_sent: int
+    bytes_received: int
+    signing_time: float
+    time_to_first_byte: float
+    total_time: float
+    connection_reused: bool
+    retries: int
+
+
+RequestHook = Callable[[RequestRecord], None]
+RequestDescriber = Callable[[str, URL, Mapping[str, str]], tuple[str, str]]
+
+
+def describe_request(
+    method: str, url: URL, headers: Mapping[str, str]
+) -> tuple[str, str]:
+    """Names requests after their method and host"""
+    del headers
+    return method, url.netloc.encode()
+
+
+class Histogram:
+    """Counts values in buckets growing by `growth`, so percentiles are
+    estimated within that relative error in constant memory"""
+
+    def __init__(self, growth: float = 1.05, min_value: float = 1e-6):
+        self.growth = growth
+        self.min_value = min_value
+        self._log_growth = math.log(growth)
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        index = (
+            0
+            if value <= self.min_value
+            else math.ceil(math.log(value / self.min_value) / self._log_growth)
+        )
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the `percent` percentile"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100) or 1
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.min_value * self.growth**index, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class OperationStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.reused_connections = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total_time = Histogram()
+        self.time_to_first_byte = Histogram()
+        self.signing_time = Histogram()
+
+    def add(self, record: RequestRecord):
+        self.requests += 1
+        self.errors += record.status is None or record.status >= 400
+        self.retries += record.retries
+        self.reused_connections += record.connection_reused
+        self.bytes_sent += record.bytes_sent
+        self.bytes_received += record.bytes_received
+        self.total_time.add(record.total_time)
+        self.time_to_first_byte.add(record.time_to_first_byte)
+        self.signing_time.add(record.signing_time)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "reused_connections": self.reused_connections,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            **{
+                f"{name}_p{percent}": histogram.percentile(percent)
+                for name, histogram in (
+                    ("total_time", self.total_time),
+                    ("time_to_first_byte", self.time_to_first_byte),
+                    ("signing_time", self.signing_time),
+                )
+                for percent in (50, 90, 99)
+            },
+        }
+
+
+class RequestStats:
+    """In memory aggregator of request records per operation and bucket,
+    to be installed as a request hook. Safe to share between threads"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.operations: dict[tuple[str, str], OperationStats] = {}
+
+    def __call__(self, record: RequestRecord):
+        key = (record.operation, record.bucket)
+        with self._lock:
+            stats = self.operations.get(key)
+            if stats is None:
+                stats = self.operations[key] = OperationStats()
+            stats.add(record)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Counters and p50/p90/p99 times by `operation bucket`"""
+        with self._lock:
+            return {
+                f"{operation} {bucket}": stats.summary()
+                for (operation, bucket), stats in self.operations.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self.operations.clear()
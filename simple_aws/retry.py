@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+from typing import Optional
+
+from gyver.url import URL
+
+from simple_aws.exc import InvalidParam
+
+DEFAULT_MAX_ATTEMPTS = 3
+# statuses S3 uses to ask for a slower request rate (503 SlowDown)
+THROTTLING_STATUSES = frozenset((429, 503))
+TRANSIENT_STATUSES = frozenset((500, 502, 503, 504))
+RETRYABLE_STATUSES = THROTTLING_STATUSES | TRANSIENT_STATUSES
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How many times a request is sent and how long to wait between
+    attempts: a random delay of up to `base_delay` doubled after each
+    attempt, capped at `max_delay` (exponential backoff with full
+    jitter, which keeps concurrent clients from retrying in sync)"""
+
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = 0.1
+    max_delay: float = 20.0
+    jitter: Callable[[], float] = random.random
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise InvalidParam(
+                "max_attempts",
+                self.max_attempts,
+                "Max attempts must be at least 1",
+            )
+
+    def should_retry(self, status_code: int) -> bool:
+        return status_code in RETRYABLE_STATUSES
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the failed `attempt`, starting at 0"""
+        return self.jitter() * min(
+            self.max_delay, self.base_delay * 2**attempt
+        )
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def rate_key(url: URL) -> str:
+    """Requests are limited per bucket host and top level prefix,
+    the unit S3 scales request rates by"""
+    prefix = url.path.encode().lstrip("/").partition("/")[0]
+    return f"{url.netloc.encode()}/{prefix}"
+
+
+class _Bucket:
+    def __init__(self, now: float) -> None:
+        # None until throttled, requests are not limited before
+        self.rate: Optional[float] = None
+        self.throttled_rate = 0.0
+        self.throttled_at = now
+        self.tokens = 0.0
+        self.updated_at = now
+        self.window_start = now
+        self.window_count = 0
+        self.measured_rate = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Client side token buckets, one per `rate_key`, that adapt to
+    the rate S3 accepts.
+
+    Requests pass freely until a throttling response. The bucket rate
+    then drops to `backoff` times the rate requests were being sent
+    at and grows back by `ramp_up` requests per second every second
+    without throttling, so sustained load settles just under the
+    accepted rate instead of bursting into retries."""
+
+    def __init__(
+        self,
+        backoff: float = 0.7,
+        ramp_up: float = 5.0,
+        min_rate: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not 0 < backoff < 1:
+            raise InvalidParam(
+                "backoff", backoff, "Backoff must be between 0 and 1"
+            )
+        self.backoff = backoff
+        self.ramp_up = ramp_up
+        self.min_rate = min_rate
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, key: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(now)
+        return bucket
+
+    def rate(self, key: str) -> Optional[float]:
+        """Requests per second allowed for `key`, None if unlimited"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.rate is None:
+                return None
+            return self._current_rate(bucket, self.clock())
+
+    def _current_rate(self, bucket: _Bucket, now: float) -> float:
+        return bucket.throttled_rate + self.ramp_up * (
+            now - bucket.throttled_at
+        )
+
+    def acquire(self, key: str):
+        """Waits until a request for `key` may be sent"""
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(key, now)
+            self._measure(bucket, now)
+            if bucket.rate is None:
+                return
+            rate = bucket.rate = self._current_rate(bucket, now)
+            # tokens go negative to reserve them for waiting requests
+            bucket.tokens = min(
+                max(rate, 1.0),
+                bucket.tokens + (now - bucket.updated_at) * rate,
+            )
+            bucket.updated_at = now
+            bucket.tokens -= 1
+            wait = -bucket.tokens / rate if bucket.tokens < 0 else 0.0
+        if wait:
+            self.sleep(wait)
+
+    def _measure(self, bucket: _Bucket, now: float):
+        bucket.window_count += 1
+        elapsed = now - bucket.window_start
+        if elapsed >= 1:
+            bucket.measured_rate = bucket.window_count / elapsed
+            bucket.window_start = now
+            bucket.window_count = 0
+
+    def on_throttle(self, key: str):
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(key, now)
+            if bucket.rate is not None:
+                sending_rate = self._current_rate(bucket, now)
+            else:
+                elapsed = now - bucket.window_start
+                sending_rate = max(
+                    bucket.measured_rate,
+                    # a partial window counts as a whole second
+                    bucket.window_count / max(elapsed, 1.0),
+                )
+            bucket.rate = bucket.throttled_rate = max(
+                self.min_rate, sending_rate * self.backoff
+            )
+            bucket.throttled_at = now
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.updated_at = now
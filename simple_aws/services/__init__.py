@@ -1,3 +1,8 @@
+from simple_aws.utils import lazy_exports
+
 from .factory import ServiceFactory
 
+# service packages are imported on first access
+__getattr__, __dir__ = lazy_exports(__name__, {}, submodules=("s3",))
+
 __all__ = ["ServiceFactory"]
@@ -1,3 +1,4 @@
+from typing import TYPE_CHECKING
 from typing import Callable
 from typing import Optional
 from typing import TypeVar
@@ -9,7 +10,8 @@ from typing_extensions import ParamSpec
 from simple_aws.config import ProviderConfigT
 from simple_aws.credentials import Credentials
 
-from . import s3
+if TYPE_CHECKING:
+    from . import s3
 
 T = TypeVar("T")
 P = ParamSpec("P")
@@ -33,8 +35,11 @@ class ServiceFactory:
         return service_class(self.credentials, *args, **kwargs)
 
     def s3_object(
-        self, config: Optional[s3.S3ObjectConfig] = None
-    ) -> s3.S3Object:
+        self, config: Optional["s3.S3ObjectConfig"] = None
+    ) -> "s3.S3Object":
+        # services are only imported when built, keeping startup cheap
+        from . import s3
+
         return self.build(
             s3.S3Object, config=self.get_or_load(s3.S3ObjectConfig, config)
         )
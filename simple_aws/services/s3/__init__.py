@@ -1,13 +1,65 @@
-from .config import S3ObjectConfig
-from .models import FileInfo
-from .models import StorageClass
-from .object import ObjectTuple
-from .object import S3Object
+from typing import TYPE_CHECKING
+
+from simple_aws.utils import lazy_exports
+
+if TYPE_CHECKING:
+    from .config import S3ObjectConfig
+    from .models import CommonPrefix
+    from .models import FileInfo
+    from .models import ObjectRecord
+    from .models import StorageClass
+    from .object import AsyncS3Object
+    from .object import CopyError
+    from .object import CopyResult
+    from .object import DeleteError
+    from .object import DeleteProgress
+    from .object import DeleteResult
+    from .object import DiskCache
+    from .object import InfoCache
+    from .object import ListCheckpoint
+    from .object import ObjectTuple
+    from .object import PresignCache
+    from .object import S3Object
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "S3ObjectConfig": ".config",
+        "S3Object": ".object",
+        "AsyncS3Object": ".object",
+        "ObjectTuple": ".object",
+        "DeleteResult": ".object",
+        "DeleteError": ".object",
+        "CopyResult": ".object",
+        "CopyError": ".object",
+        "DeleteProgress": ".object",
+        "InfoCache": ".object",
+        "DiskCache": ".object",
+        "ListCheckpoint": ".object",
+        "PresignCache": ".object",
+        "StorageClass": ".models",
+        "FileInfo": ".models",
+        "CommonPrefix": ".models",
+        "ObjectRecord": ".models",
+    },
+)
 
 __all__ = [
     "S3ObjectConfig",
     "S3Object",
+    "AsyncS3Object",
     "ObjectTuple",
+    "DeleteResult",
+    "DeleteError",
+    "DeleteProgress",
+    "CopyResult",
+    "CopyError",
+    "InfoCache",
+    "DiskCache",
+    "ListCheckpoint",
+    "PresignCache",
     "StorageClass",
     "FileInfo",
+    "CommonPrefix",
+    "ObjectRecord",
 ]
@@ -1,5 +1,18 @@
+from typing import Optional
+
 from gyver.config import ProviderConfig
 
+from simple_aws.auth import PayloadSigning
+from simple_aws.config import DEFAULT_POOL_SIZE
+from simple_aws.retry import DEFAULT_MAX_ATTEMPTS
+
 
 class S3ObjectConfig(ProviderConfig):
     bucket_name: str
+    payload_signing: PayloadSigning = PayloadSigning.SHA256_MD5
+    pool_size: int = DEFAULT_POOL_SIZE
+    keep_alive: bool = True
+    prewarm_connections: int = 0
+    prewarm_key: Optional[str] = None
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    adaptive_rate_limit: bool = False
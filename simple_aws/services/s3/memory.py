@@ -0,0 +1,1231 @@
+import base64
+import email.policy
+import hashlib
+import hmac
+import io
+import threading
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.parser import BytesParser
+from http import HTTPStatus
+from typing import Callable
+from typing import Iterator
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from urllib.parse import parse_qsl
+from urllib.parse import quote
+from urllib.parse import unquote
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+import requests
+import urllib3
+from gyver.utils import json
+from requests.structures import CaseInsensitiveDict
+
+from simple_aws.auth import AWS_ALGORITHM
+from simple_aws.auth import AWS_PAYLOAD_ALGORITHM
+from simple_aws.auth import EMPTY_SHA256
+from simple_aws.auth import STREAMING_PAYLOAD
+from simple_aws.auth import UNSIGNED_PAYLOAD
+from simple_aws.auth import derive_signing_key
+from simple_aws.credentials import Credentials
+from simple_aws.transport import Body
+from simple_aws.transport import TransportOptions
+from simple_aws.transport import build_response
+from simple_aws.typedef import METHODS
+from simple_aws.utils import xmlns
+
+from .object.get import HTTP_DATE_FORMAT
+from .object.get import QUOTES
+from .object.multipart import MAX_PARTS
+from .object.multipart import MIN_PART_SIZE
+from .object.upload import DEFAULT_MIMETYPE
+
+# S3 rejects signed requests dated further away from its clock
+MAX_CLOCK_SKEW = timedelta(minutes=15)
+MAX_LIST_KEYS = 1000
+MAX_DELETE_KEYS = 1000
+LIST_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+AMZ_DATE_FORMAT = "%Y%m%dT%H%M%SZ"
+POLICY_DATE_FORMATS = ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S.%fZ")
+# object headers stored on upload and returned by GET and HEAD
+_STORED_HEADERS = frozenset(
+    (
+        "cache-control",
+        "content-disposition",
+        "content-encoding",
+        "content-language",
+        "content-type",
+        "expires",
+    )
+)
+# form fields a POST policy doesn't need to cover
+_UNCHECKED_FIELDS = frozenset(("policy", "x-amz-signature", "file"))
+
+Response = tuple[int, dict[str, str], bytes]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class StoredObject(NamedTuple):
+    content: bytes
+    e_tag: str
+    last_modified: datetime
+    headers: dict[str, str]
+    # "null" unless stored in a versioned backend
+    version_id: str = "null"
+    tags: tuple[tuple[str, str], ...] = ()
+
+    def response_headers(self) -> dict[str, str]:
+        headers = {
+            **self.headers,
+            "etag": f'"{self.e_tag}"',
+            "last-modified": self.last_modified.strftime(HTTP_DATE_FORMAT),
+            "accept-ranges": "bytes",
+        }
+        if self.version_id != "null":
+            headers["x-amz-version-id"] = self.version_id
+        if self.tags:
+            headers["x-amz-tagging-count"] = str(len(self.tags))
+        return headers
+
+
+class _Upload(NamedTuple):
+    bucket: str
+    key: str
+    headers: dict[str, str]
+    # part number to content and ETag
+    parts: dict[int, tuple[bytes, str]]
+    tags: dict[str, str]
+
+
+class S3Error(Exception):
+    """An error answered by `InMemoryS3` as S3 would"""
+
+    def __init__(self, status: int, code: str, message: str) -> None:
+        super().__init__(status, code, message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def response(self) -> Response:
+        return (
+            self.status,
+            {"content-type": "application/xml"},
+            "".join(
+                (
+                    '<?xml version="1.0" encoding="UTF-8"?>',
+                    f"<Error><Code>{self.code}</Code>",
+                    f"<Message>{escape(self.message)}</Message></Error>",
+                )
+            ).encode(),
+        )
+
+
+def _signature_mismatch() -> S3Error:
+    return S3Error(
+        HTTPStatus.FORBIDDEN,
+        "SignatureDoesNotMatch",
+        "The request signature we calculated does not match the signature"
+        " you provided",
+    )
+
+
+def _precondition_failed() -> S3Error:
+    return S3Error(
+        HTTPStatus.PRECONDITION_FAILED,
+        "PreconditionFailed",
+        "At least one of the pre-conditions you specified did not hold",
+    )
+
+
+def _xml(root: str, body: Iterator[str]) -> bytes:
+    return "".join(
+        (
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<{root} xmlns="{xmlns}">',
+            *body,
+            f"</{root}>",
+        )
+    ).encode()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+class _Signed(NamedTuple):
+    key: bytes
+    amz_date: str
+    scope: str
+    signature: str
+
+
+class InMemoryS3:
+    """S3 buckets kept in memory, answering requests the way S3 does
+    after verifying their signatures against `credentials`, so whole
+    S3 workloads run offline in tests and benchmarks.
+
+    Pass `transport` as the transport factory of an `S3Object`.
+    It serves POST policy uploads, PutObject, GetObject (conditional
+    and ranged), HeadObject, GetObjectTagging, ListObjectsV2,
+    DeleteObject, DeleteObjects, CopyObject and multipart uploads
+    (create, UploadPart, UploadPartCopy, complete and abort) on
+    virtual-hosted style URLs, keeping the tags sent by uploads.
+    Buckets exist as soon as they are used. Other operations are
+    answered 501 Not Implemented.
+
+    With `versioned`, every upload keeps the previous versions of the
+    object, which requests read by passing their `versionId`."""
+
+    def __init__(
+        self,
+        *credentials: Credentials,
+        clock: Callable[[], datetime] = _utcnow,
+        versioned: bool = False,
+    ) -> None:
+        self.clock = clock
+        self.versioned = versioned
+        self._credentials = {
+            credential.access_key_id: credential for credential in credentials
+        }
+        self._lock = threading.Lock()
+        self.buckets: dict[str, dict[str, StoredObject]] = {}
+        self._versions: dict[tuple[str, str, str], StoredObject] = {}
+        # multipart uploads in progress by upload id
+        self.uploads: dict[str, _Upload] = {}
+
+    def transport(
+        self, options: TransportOptions = TransportOptions()
+    ) -> "InMemoryTransport":
+        del options
+        return InMemoryTransport(self)
+
+    def put_object(
+        self,
+        bucket: str,
+        key: str,
+        content: bytes,
+        headers: Optional[Mapping[str, str]] = None,
+        e_tag: Optional[str] = None,
+        tags: Optional[Mapping[str, str]] = None,
+    ) -> StoredObject:
+        stored = StoredObject(
+            content,
+            e_tag or hashlib.md5(content).hexdigest(),
+            # S3 keeps modification times to the second
+            self.clock().replace(microsecond=0),
+            {
+                "content-type": DEFAULT_MIMETYPE,
+                **{
+                    name.lower(): value
+                    for name, value in (headers or {}).items()
+                },
+            },
+            uuid.uuid4().hex if self.versioned else "null",
+            tuple((tags or {}).items()),
+        )
+        with self._lock:
+            self.buckets.setdefault(bucket, {})[key] = stored
+            self._versions[bucket, key, stored.version_id] = stored
+        return stored
+
+    def get_object(
+        self, bucket: str, key: str, version: Optional[str] = None
+    ) -> Optional[StoredObject]:
+        if version is not None:
+            return self._versions.get((bucket, key, version))
+        return self.buckets.get(bucket, {}).get(key)
+
+    def delete_object(self, bucket: str, key: str):
+        with self._lock:
+            self.buckets.get(bucket, {}).pop(key, None)
+
+    def handle(
+        self,
+        method: METHODS,
+        url: str,
+        headers: Mapping[str, str],
+        data: Body = None,
+        files: Optional[Mapping[str, bytes]] = None,
+    ) -> Response:
+        """Answers a request with its status, headers and body"""
+        parts = urlsplit(url)
+        bucket = (parts.hostname or "").partition(".s3.")[0]
+        key = unquote(parts.path).lstrip("/")
+        params = dict(
+            (unquote(name), unquote(value))
+            for name, _, value in (
+                param.partition("=")
+                for param in parts.query.split("&")
+                if param
+            )
+        )
+        request_headers = CaseInsensitiveDict(headers)
+        # sent by every HTTP client, even when not passed
+        request_headers.setdefault("host", parts.netloc)
+        try:
+            if method == "POST" and files:
+                return self._post_object(
+                    bucket, data if isinstance(data, Mapping) else {}, files
+                )
+            body = _read_body(data)
+            content_type = request_headers.get("content-type", "")
+            if method == "POST" and content_type.startswith(
+                "multipart/form-data"
+            ):
+                # sent already encoded by clients other than requests
+                return self._post_object(
+                    bucket, *_parse_form(content_type, body)
+                )
+            signed = self._authenticate(
+                method, parts.path, parts.query, params, request_headers, body
+            )
+            if request_headers.get("content-encoding") == "aws-chunked":
+                body = self._decode_chunks(signed, body)
+            _check_md5(request_headers, body)
+            return self._dispatch(
+                method, bucket, key, params, request_headers, body
+            )
+        except S3Error as exc:
+            return exc.response()
+
+    def _dispatch(
+        self,
+        method: METHODS,
+        bucket: str,
+        key: str,
+        params: Mapping[str, str],
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        if method == "POST" and "uploads" in params:
+            return self._create_upload(bucket, key, headers)
+        if "uploadId" in params:
+            return self._dispatch_upload(method, params, headers, body)
+        if method == "GET" and not key:
+            return self._list_objects(bucket, params)
+        if method == "GET" and "tagging" in params:
+            return self._get_tagging(bucket, key, params.get("versionId"))
+        if method in ("GET", "HEAD"):
+            return self._get_object(
+                method, bucket, key, params.get("versionId"), headers
+            )
+        if method == "PUT" and "x-amz-copy-source" in headers:
+            return self._copy_object(bucket, key, headers)
+        if method == "PUT" and key:
+            return self._put_object(bucket, key, headers, body)
+        if method == "POST" and "delete" in params:
+            return self._delete_objects(bucket, body)
+        if method == "DELETE" and key:
+            self.delete_object(bucket, key)
+            return HTTPStatus.NO_CONTENT, {}, b""
+        raise S3Error(
+            HTTPStatus.NOT_IMPLEMENTED,
+            "NotImplemented",
+            f"{method} requests to {key or 'buckets'} are not implemented",
+        )
+
+    def _dispatch_upload(
+        self,
+        method: METHODS,
+        params: Mapping[str, str],
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        upload_id = params["uploadId"]
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            raise S3Error(
+                HTTPStatus.NOT_FOUND,
+                "NoSuchUpload",
+                "The specified upload does not exist.",
+            )
+        if method == "PUT" and "partNumber" in params:
+            return self._upload_part(
+                upload, params["partNumber"], headers, body
+            )
+        if method == "POST":
+            return self._complete_upload(upload_id, upload, body)
+        if method == "DELETE":
+            with self._lock:
+                self.uploads.pop(upload_id, None)
+            return HTTPStatus.NO_CONTENT, {}, b""
+        raise S3Error(
+            HTTPStatus.NOT_IMPLEMENTED,
+            "NotImplemented",
+            f"{method} requests to multipart uploads are not implemented",
+        )
+
+    def _signing_key(self, credential: str) -> tuple[bytes, str]:
+        access_key_id, _, scope = credential.partition("/")
+        datestamp, region, service, _ = (scope.split("/") + [""] * 4)[:4]
+        found = self._credentials.get(access_key_id)
+        if found is None:
+            raise S3Error(
+                HTTPStatus.FORBIDDEN,
+                "InvalidAccessKeyId",
+                "The AWS Access Key Id you provided does not exist",
+            )
+        return (
+            derive_signing_key(
+                found.secret_access_key, datestamp, region, service
+            ),
+            scope,
+        )
+
+    def _parse_date(self, amz_date: str, scope: str) -> datetime:
+        try:
+            moment = datetime.strptime(amz_date, AMZ_DATE_FORMAT)
+        except ValueError:
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "AuthorizationQueryParametersError",
+                f"Invalid date {amz_date!r}",
+            ) from None
+        if not scope.startswith(amz_date[:8]):
+            raise _signature_mismatch()
+        return moment.replace(tzinfo=timezone.utc)
+
+    def _authenticate(
+        self,
+        method: METHODS,
+        path: str,
+        query: str,
+        params: Mapping[str, str],
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> _Signed:
+        """Verifies the signature of a request signed with headers
+        or presigned with query parameters"""
+        if "X-Amz-Signature" in params:
+            credential = params.get("X-Amz-Credential", "")
+            amz_date = params.get("X-Amz-Date", "")
+            signed_headers = params.get("X-Amz-SignedHeaders", "")
+            signature = params["X-Amz-Signature"]
+            payload_hash = UNSIGNED_PAYLOAD
+            query = "&".join(
+                param
+                for param in query.split("&")
+                if not param.startswith("X-Amz-Signature=")
+            )
+        else:
+            authorization = headers.get("authorization", "")
+            algorithm, _, fields = authorization.partition(" ")
+            if algorithm != AWS_ALGORITHM:
+                raise S3Error(
+                    HTTPStatus.FORBIDDEN,
+                    "AccessDenied",
+                    "Anonymous requests are not allowed",
+                )
+            values = dict(
+                field.strip().partition("=")[::2]
+                for field in fields.split(",")
+            )
+            credential = values.get("Credential", "")
+            signed_headers = values.get("SignedHeaders", "")
+            signature = values.get("Signature", "")
+            amz_date = headers.get("x-amz-date", "")
+            payload_hash = headers.get("x-amz-content-sha256", "")
+            if not payload_hash:
+                raise S3Error(
+                    HTTPStatus.BAD_REQUEST,
+                    "InvalidRequest",
+                    "Missing required header: x-amz-content-sha256",
+                )
+            if (
+                payload_hash
+                not in (
+                    UNSIGNED_PAYLOAD,
+                    STREAMING_PAYLOAD,
+                )
+                and payload_hash != hashlib.sha256(body).hexdigest()
+            ):
+                raise S3Error(
+                    HTTPStatus.BAD_REQUEST,
+                    "XAmzContentSHA256Mismatch",
+                    "The provided x-amz-content-sha256 header does not"
+                    " match what was computed",
+                )
+        key, scope = self._signing_key(credential)
+        signed_at = self._parse_date(amz_date, scope)
+        now = self.clock()
+        if "X-Amz-Signature" in params:
+            if now > signed_at + timedelta(
+                seconds=int(params.get("X-Amz-Expires") or 0)
+            ):
+                raise S3Error(
+                    HTTPStatus.FORBIDDEN, "AccessDenied", "Request has expired"
+                )
+        elif abs(now - signed_at) > MAX_CLOCK_SKEW:
+            raise S3Error(
+                HTTPStatus.FORBIDDEN,
+                "RequestTimeTooSkewed",
+                "The difference between the request time and the current"
+                " time is too large",
+            )
+        names = signed_headers.split(";")
+        if any(name not in headers for name in names):
+            raise _signature_mismatch()
+        canonical_request = "\n".join(
+            (
+                method,
+                _canonical_path(path),
+                _canonical_query(query),
+                "".join(f"{name}:{headers[name].strip()}\n" for name in names),
+                signed_headers,
+                payload_hash,
+            )
+        )
+        expected = _sign(
+            key,
+            "\n".join(
+                (
+                    AWS_ALGORITHM,
+                    amz_date,
+                    scope,
+                    hashlib.sha256(canonical_request.encode()).hexdigest(),
+                )
+            ),
+        )
+        if not hmac.compare_digest(expected, signature):
+            raise _signature_mismatch()
+        return _Signed(key, amz_date, scope, signature)
+
+    def _decode_chunks(self, signed: _Signed, body: bytes) -> bytes:
+        """Decodes an aws-chunked body, verifying each chunk signature
+        chained from the request signature"""
+        decoded = io.BytesIO()
+        previous = signed.signature
+        position = 0
+        while True:
+            end = body.find(b"\r\n", position)
+            size, _, signature = (
+                body[position:end].decode().partition(";chunk-signature=")
+            )
+            try:
+                start, length = end + 2, int(size, 16)
+            except ValueError:
+                length = -1
+            if end < 0 or length < 0:
+                raise S3Error(
+                    HTTPStatus.BAD_REQUEST,
+                    "IncompleteBody",
+                    "The request body is not a valid aws-chunked payload",
+                )
+            chunk = body[start : start + length]
+            previous = _sign(
+                signed.key,
+                "\n".join(
+                    (
+                        AWS_PAYLOAD_ALGORITHM,
+                        signed.amz_date,
+                        signed.scope,
+                        previous,
+                        EMPTY_SHA256,
+                        hashlib.sha256(chunk).hexdigest(),
+                    )
+                ),
+            )
+            if not hmac.compare_digest(previous, signature):
+                raise _signature_mismatch()
+            if not chunk:
+                return decoded.getvalue()
+            decoded.write(chunk)
+            position = start + length + 2
+
+    def _post_object(
+        self,
+        bucket: str,
+        fields: Mapping[str, str],
+        files: Mapping[str, bytes],
+    ) -> Response:
+        """Stores a browser-based upload after verifying the policy
+        signature and that the upload satisfies its conditions"""
+        values = {name.lower(): str(value) for name, value in fields.items()}
+        content = files.get("file", b"")
+        policy = values.get("policy", "")
+        key, scope = self._signing_key(values.get("x-amz-credential", ""))
+        self._parse_date(values.get("x-amz-date", ""), scope)
+        if not hmac.compare_digest(
+            _sign(key, policy), values.get("x-amz-signature", "")
+        ):
+            raise _signature_mismatch()
+        document = json.loads(base64.b64decode(policy))
+        _check_policy(
+            document,
+            {**values, "bucket": bucket},
+            len(content),
+            self.clock(),
+        )
+        object_key = values["key"]
+        self.put_object(
+            bucket,
+            object_key,
+            content,
+            {
+                name: value
+                for name, value in values.items()
+                if name in _STORED_HEADERS or name.startswith("x-amz-meta-")
+            },
+        )
+        return HTTPStatus.NO_CONTENT, {}, b""
+
+    def _put_object(
+        self,
+        bucket: str,
+        key: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        stored = self.put_object(
+            bucket,
+            key,
+            body,
+            _object_headers(headers),
+            tags=_object_tags(headers),
+        )
+        return HTTPStatus.OK, {"etag": f'"{stored.e_tag}"'}, b""
+
+    def _get_tagging(
+        self, bucket: str, key: str, version: Optional[str]
+    ) -> Response:
+        stored = self.get_object(bucket, key, version)
+        if stored is None:
+            raise S3Error(
+                HTTPStatus.NOT_FOUND,
+                "NoSuchKey",
+                "The specified key does not exist.",
+            )
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "Tagging",
+                iter(
+                    (
+                        "<TagSet>",
+                        *(
+                            f"<Tag><Key>{escape(name)}</Key>"
+                            f"<Value>{escape(value)}</Value></Tag>"
+                            for name, value in stored.tags
+                        ),
+                        "</TagSet>",
+                    )
+                ),
+            ),
+        )
+
+    def _get_object(
+        self,
+        method: METHODS,
+        bucket: str,
+        key: str,
+        version: Optional[str],
+        headers: Mapping[str, str],
+    ) -> Response:
+        stored = self.get_object(bucket, key, version)
+        if stored is None:
+            if method == "HEAD":
+                return HTTPStatus.NOT_FOUND, {}, b""
+            if version is not None:
+                raise S3Error(
+                    HTTPStatus.NOT_FOUND,
+                    "NoSuchVersion",
+                    "The specified version does not exist.",
+                )
+            raise S3Error(
+                HTTPStatus.NOT_FOUND,
+                "NoSuchKey",
+                "The specified key does not exist.",
+            )
+        if_match = headers.get("if-match")
+        if if_match is not None and if_match.strip(QUOTES) != stored.e_tag:
+            raise _precondition_failed()
+        response_headers = stored.response_headers()
+        if _not_modified(stored, headers):
+            return (
+                HTTPStatus.NOT_MODIFIED,
+                {
+                    "etag": response_headers["etag"],
+                    "last-modified": response_headers["last-modified"],
+                },
+                b"",
+            )
+        status = HTTPStatus.OK
+        content = stored.content
+        byte_range = headers.get("range")
+        if byte_range is not None:
+            start, stop = _parse_range(byte_range, len(content))
+            status = HTTPStatus.PARTIAL_CONTENT
+            response_headers[
+                "content-range"
+            ] = f"bytes {start}-{stop - 1}/{len(content)}"
+            content = content[start:stop]
+        response_headers["content-length"] = str(len(content))
+        return status, response_headers, b"" if method == "HEAD" else content
+
+    def _list_objects(
+        self, bucket: str, params: Mapping[str, str]
+    ) -> Response:
+        prefix = params.get("prefix", "")
+        delimiter = params.get("delimiter", "")
+        max_keys = min(
+            int(params.get("max-keys") or MAX_LIST_KEYS), MAX_LIST_KEYS
+        )
+        token = params.get("continuation-token")
+        marker = (
+            base64.urlsafe_b64decode(token).decode()
+            if token
+            else params.get("start-after", "")
+        )
+        with self._lock:
+            objects = dict(self.buckets.get(bucket, {}))
+        contents: list[tuple[str, StoredObject]] = []
+        prefixes: list[str] = []
+        last = ""
+        truncated = False
+        for key in sorted(objects):
+            if not key.startswith(prefix) or key <= marker:
+                continue
+            common = ""
+            if delimiter:
+                index = key.find(delimiter, len(prefix))
+                if index >= 0:
+                    common = key[: index + len(delimiter)]
+                    if common == last or marker.startswith(common):
+                        continue
+            if len(contents) + len(prefixes) == max_keys:
+                truncated = True
+                break
+            if common:
+                prefixes.append(common)
+                last = common
+            else:
+                contents.append((key, objects[key]))
+                last = key
+        body = [
+            f"<Name>{escape(bucket)}</Name>",
+            f"<Prefix>{escape(prefix)}</Prefix>",
+            f"<KeyCount>{len(contents) + len(prefixes)}</KeyCount>",
+            f"<MaxKeys>{max_keys}</MaxKeys>",
+            f"<Delimiter>{escape(delimiter)}</Delimiter>" if delimiter else "",
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>",
+        ]
+        body.extend(
+            "".join(
+                (
+                    f"<Contents><Key>{escape(key)}</Key>",
+                    "<LastModified>",
+                    stored.last_modified.strftime(LIST_DATE_FORMAT),
+                    "</LastModified>",
+                    f"<ETag>&quot;{stored.e_tag}&quot;</ETag>",
+                    f"<Size>{len(stored.content)}</Size>",
+                    "<StorageClass>STANDARD</StorageClass></Contents>",
+                )
+            )
+            for key, stored in contents
+        )
+        body.extend(
+            f"<CommonPrefixes><Prefix>{escape(common)}</Prefix>"
+            "</CommonPrefixes>"
+            for common in prefixes
+        )
+        if truncated:
+            # pages continue after the last key or common prefix listed,
+            # which a listing that starts after a common prefix skips
+            next_token = base64.urlsafe_b64encode(last.encode()).decode()
+            body.append(
+                f"<NextContinuationToken>{next_token}</NextContinuationToken>"
+            )
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml("ListBucketResult", iter(body)),
+        )
+
+    def _delete_objects(self, bucket: str, body: bytes) -> Response:
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError:
+            root = None
+        if root is None or _local_name(root.tag) != "Delete":
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "MalformedXML",
+                "The XML you provided was not well-formed",
+            )
+        quiet = False
+        objects: list[tuple[str, Optional[str]]] = []
+        for element in root:
+            name = _local_name(element.tag)
+            if name == "Quiet":
+                quiet = (element.text or "").strip() == "true"
+            elif name == "Object":
+                fields = {
+                    _local_name(child.tag): child.text or ""
+                    for child in element
+                }
+                objects.append(
+                    (fields.get("Key", ""), fields.get("VersionId"))
+                )
+        if not 1 <= len(objects) <= MAX_DELETE_KEYS:
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "MalformedXML",
+                f"Requests must delete between 1 and {MAX_DELETE_KEYS} keys",
+            )
+        for key, _ in objects:
+            self.delete_object(bucket, key)
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "DeleteResult",
+                iter(
+                    ()
+                    if quiet
+                    else (
+                        f"<Deleted><Key>{escape(key)}</Key>"
+                        + (
+                            f"<VersionId>{escape(version)}</VersionId>"
+                            if version
+                            else ""
+                        )
+                        + "</Deleted>"
+                        for key, version in objects
+                    )
+                ),
+            ),
+        )
+
+    def _copy_source(self, headers: Mapping[str, str]) -> StoredObject:
+        source, _, version = headers["x-amz-copy-source"].partition(
+            "?versionId="
+        )
+        source_bucket, _, source_key = (
+            unquote(source).lstrip("/").partition("/")
+        )
+        stored = self.get_object(source_bucket, source_key, version or None)
+        if stored is None:
+            raise S3Error(
+                HTTPStatus.NOT_FOUND,
+                "NoSuchKey",
+                "The specified key does not exist.",
+            )
+        if_match = headers.get("x-amz-copy-source-if-match")
+        if if_match is not None and if_match.strip(QUOTES) != stored.e_tag:
+            raise _precondition_failed()
+        return stored
+
+    def _copy_object(
+        self, bucket: str, key: str, headers: Mapping[str, str]
+    ) -> Response:
+        stored = self._copy_source(headers)
+        replace = headers.get("x-amz-metadata-directive") == "REPLACE"
+        replace_tags = headers.get("x-amz-tagging-directive") == "REPLACE"
+        copied = self.put_object(
+            bucket,
+            key,
+            stored.content,
+            _object_headers(headers) if replace else stored.headers,
+            tags=_object_tags(headers) if replace_tags else dict(stored.tags),
+        )
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "CopyObjectResult",
+                iter(
+                    (
+                        "<LastModified>",
+                        copied.last_modified.strftime(LIST_DATE_FORMAT),
+                        "</LastModified>",
+                        f"<ETag>&quot;{copied.e_tag}&quot;</ETag>",
+                    )
+                ),
+            ),
+        )
+
+    def _create_upload(
+        self, bucket: str, key: str, headers: Mapping[str, str]
+    ) -> Response:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self.uploads[upload_id] = _Upload(
+                bucket,
+                key,
+                {"content-type": DEFAULT_MIMETYPE, **_object_headers(headers)},
+                {},
+                _object_tags(headers),
+            )
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "InitiateMultipartUploadResult",
+                iter(
+                    (
+                        f"<Bucket>{escape(bucket)}</Bucket>",
+                        f"<Key>{escape(key)}</Key>",
+                        f"<UploadId>{upload_id}</UploadId>",
+                    )
+                ),
+            ),
+        )
+
+    def _upload_part(
+        self,
+        upload: _Upload,
+        part_number: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> Response:
+        number = int(part_number) if part_number.isdigit() else 0
+        if not 1 <= number <= MAX_PARTS:
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "InvalidArgument",
+                f"Part number must be an integer between 1 and {MAX_PARTS}",
+            )
+        if "x-amz-copy-source" not in headers:
+            e_tag = hashlib.md5(body).hexdigest()
+            with self._lock:
+                upload.parts[number] = (body, e_tag)
+            return HTTPStatus.OK, {"etag": f'"{e_tag}"'}, b""
+        content = self._copy_source(headers).content
+        byte_range = headers.get("x-amz-copy-source-range")
+        if byte_range is not None:
+            start, stop = _parse_range(byte_range, len(content))
+            content = content[start:stop]
+        e_tag = hashlib.md5(content).hexdigest()
+        with self._lock:
+            upload.parts[number] = (content, e_tag)
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "CopyPartResult",
+                iter(
+                    (
+                        "<LastModified>",
+                        self.clock().strftime(LIST_DATE_FORMAT),
+                        "</LastModified>",
+                        f"<ETag>&quot;{e_tag}&quot;</ETag>",
+                    )
+                ),
+            ),
+        )
+
+    def _complete_upload(
+        self, upload_id: str, upload: _Upload, body: bytes
+    ) -> Response:
+        """Joins the listed parts, which must have been uploaded with
+        the given ETags, in ascending order and be at least
+        MIN_PART_SIZE bytes but for the last one"""
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError:
+            root = None
+        if root is None or _local_name(root.tag) != "CompleteMultipartUpload":
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "MalformedXML",
+                "The XML you provided was not well-formed",
+            )
+        listed = []
+        for element in root:
+            fields = {
+                _local_name(child.tag): child.text or "" for child in element
+            }
+            listed.append(
+                (
+                    int(fields.get("PartNumber") or 0),
+                    fields.get("ETag", "").strip(QUOTES),
+                )
+            )
+        numbers = [number for number, _ in listed]
+        if not listed or numbers != sorted(set(numbers)):
+            raise S3Error(
+                HTTPStatus.BAD_REQUEST,
+                "InvalidPartOrder",
+                "The list of parts was not in ascending order",
+            )
+        contents = []
+        for index, (number, e_tag) in enumerate(listed, 1):
+            content, stored_e_tag = upload.parts.get(number, (b"", ""))
+            if not stored_e_tag or e_tag != stored_e_tag:
+                raise S3Error(
+                    HTTPStatus.BAD_REQUEST,
+                    "InvalidPart",
+                    "One or more of the specified parts could not be found",
+                )
+            if index < len(listed) and len(content) < MIN_PART_SIZE:
+                raise S3Error(
+                    HTTPStatus.BAD_REQUEST,
+                    "EntityTooSmall",
+                    "Your proposed upload is smaller than the minimum"
+                    " allowed object size",
+                )
+            contents.append(content)
+        with self._lock:
+            self.uploads.pop(upload_id, None)
+        # multipart ETags hash the part digests, suffixed by their count
+        e_tag = "{}-{}".format(
+            hashlib.md5(
+                b"".join(bytes.fromhex(e_tag) for _, e_tag in listed)
+            ).hexdigest(),
+            len(listed),
+        )
+        self.put_object(
+            upload.bucket,
+            upload.key,
+            b"".join(contents),
+            upload.headers,
+            e_tag,
+            upload.tags,
+        )
+        return (
+            HTTPStatus.OK,
+            {"content-type": "application/xml"},
+            _xml(
+                "CompleteMultipartUploadResult",
+                iter(
+                    (
+                        f"<Bucket>{escape(upload.bucket)}</Bucket>",
+                        f"<Key>{escape(upload.key)}</Key>",
+                        f"<ETag>&quot;{e_tag}&quot;</ETag>",
+                    )
+                ),
+            ),
+        )
+
+
+class InMemoryTransport:
+    """Transport answering requests with an `InMemoryS3`"""
+
+    def __init__(self, backend: InMemoryS3) -> None:
+        self.backend = backend
+
+    def request(
+        self,
+        method: METHODS,
+        url: str,
+        headers: Mapping[str, str],
+        data: Body = None,
+        files: Optional[Mapping[str, bytes]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        del stream
+        status, response_headers, body = self.backend.handle(
+            method, url, headers, data, files
+        )
+        if method != "HEAD" or "content-length" not in response_headers:
+            response_headers["content-length"] = str(len(body))
+        return build_response(
+            url,
+            urllib3.HTTPResponse(
+                io.BytesIO(body),
+                response_headers,
+                status,
+                reason=HTTPStatus(status).phrase,
+                preload_content=False,
+                decode_content=False,
+                request_method=method,
+                request_url=url,
+            ),
+        )
+
+    def close(self):
+        """Objects outlive transports, they are kept by the backend"""
+
+
+def _uri_encode(value: str, safe: str = "") -> str:
+    """Percent-encodes all but the RFC 3986 unreserved characters"""
+    return quote(value, safe="-_.~" + safe)
+
+
+# canonicalized apart from simple_aws.auth, so a client canonicalizing
+# wrongly fails its requests instead of being checked against itself
+def _canonical_path(path: str) -> str:
+    return _uri_encode(unquote(path), "/") or "/"
+
+
+def _canonical_query(query: str) -> str:
+    pairs = sorted(
+        (_uri_encode(unquote(name)), _uri_encode(unquote(value)))
+        for name, _, value in (
+            param.partition("=") for param in query.split("&") if param
+        )
+    )
+    return "&".join(f"{name}={value}" for name, value in pairs)
+
+
+def _sign(key: bytes, string_to_sign: str) -> str:
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+
+def _read_body(data: Body) -> bytes:
+    if data is None:
+        return b""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, Mapping):
+        return urlencode(data).encode()
+    return b"".join(data)
+
+
+def _parse_form(
+    content_type: str, body: bytes
+) -> tuple[dict[str, str], dict[str, bytes]]:
+    """Splits a multipart/form-data body into fields and files"""
+    message = BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"content-type: " + content_type.encode() + b"\r\n\r\n" + body
+    )
+    fields: dict[str, str] = {}
+    files: dict[str, bytes] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        content = part.get_payload(decode=True) or b""
+        if part.get_filename() is None:
+            fields[str(name)] = content.decode()
+        else:
+            files[str(name)] = content
+    return fields, files
+
+
+def _check_md5(headers: Mapping[str, str], body: bytes):
+    content_md5 = headers.get("content-md5")
+    if content_md5 is None:
+        return
+    if content_md5 != base64.b64encode(hashlib.md5(body).digest()).decode():
+        raise S3Error(
+            HTTPStatus.BAD_REQUEST,
+            "BadDigest",
+            "The Content-MD5 you specified did not match what we received",
+        )
+
+
+def _object_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    return {
+        name.lower(): value
+        for name, value in headers.items()
+        if name.lower() in _STORED_HEADERS
+        or name.lower().startswith("x-amz-meta-")
+    }
+
+
+def _object_tags(headers: Mapping[str, str]) -> dict[str, str]:
+    """Returns the tags of the URL-encoded x-amz-tagging header"""
+    return dict(parse_qsl(headers.get("x-amz-tagging", "")))
+
+
+def _not_modified(stored: StoredObject, headers: Mapping[str, str]) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return if_none_match == "*" or any(
+            e_tag.strip().strip(QUOTES) == stored.e_tag
+            for e_tag in if_none_match.split(",")
+        )
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = datetime.strptime(if_modified_since, HTTP_DATE_FORMAT)
+    except ValueError:
+        return False
+    return stored.last_modified <= since.replace(tzinfo=timezone.utc)
+
+
+def _parse_range(byte_range: str, size: int) -> tuple[int, int]:
+    """Returns the `[start, stop)` span of a `bytes=` range header"""
+    unit, _, span = byte_range.partition("=")
+    start, _, end = span.partition("-")
+    try:
+        if unit != "bytes" or "," in span:
+            raise ValueError(byte_range)
+        if not start:
+            # suffix ranges select the last `end` bytes
+            return max(size - int(end), 0), size
+        first = int(start)
+        stop = size if not end else min(int(end) + 1, size)
+    except ValueError:
+        return 0, size
+    if first >= size or stop <= first:
+        raise S3Error(
+            HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+            "InvalidRange",
+            "The requested range is not satisfiable",
+        )
+    return first, stop
+
+
+def _check_policy(
+    document: Mapping,
+    fields: Mapping[str, str],
+    content_length: int,
+    now: datetime,
+):
+    """Checks the expiration and conditions of a POST policy, every
+    form field must be covered by a condition"""
+    expiration = document.get("expiration", "")
+    for date_format in POLICY_DATE_FORMATS:
+        try:
+            expires = datetime.strptime(expiration, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        raise _policy_error("invalid expiration")
+    if now > expires.replace(tzinfo=timezone.utc):
+        raise _policy_error("policy expired")
+    covered = {"bucket", *_UNCHECKED_FIELDS}
+    for condition in document.get("conditions", ()):
+        if isinstance(condition, dict):
+            checks = [("eq", name, value) for name, value in condition.items()]
+        else:
+            operator, name, *args = condition
+            if operator == "content-length-range":
+                low, high = int(name), int(args[0])
+                if not low <= content_length <= high:
+                    raise S3Error(
+                        HTTPStatus.BAD_REQUEST,
+                        "EntityTooLarge"
+                        if content_length > high
+                        else "EntityTooSmall",
+                        "Your proposed upload size is not within the"
+                        " allowed range",
+                    )
+                continue
+            checks = [(operator, name, args[0])]
+        for operator, name, value in checks:
+            name = name.lstrip("$").lower()
+            covered.add(name)
+            actual = fields.get(name, "")
+            if operator == "eq" and actual != value:
+                raise _policy_error(f"Policy Condition failed: {name}")
+            if operator == "starts-with" and not actual.startswith(value):
+                raise _policy_error(f"Policy Condition failed: {name}")
+    extra = [
+        name
+        for name in fields
+        if name not in covered and not name.startswith("x-ignore-")
+    ]
+    if extra:
+        raise _policy_error(f"Extra input fields: {', '.join(extra)}")
+
+
+def _policy_error(message: str) -> S3Error:
+    return S3Error(
+        HTTPStatus.FORBIDDEN,
+        "AccessDenied",
+        f"Invalid according to Policy: {message}",
+    )
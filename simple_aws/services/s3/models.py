@@ -1,6 +1,7 @@
 from datetime import datetime
 from enum import Enum
 from typing import TypedDict
+from typing import Union
 
 from typing_extensions import NotRequired
 
@@ -40,3 +41,68 @@ class FileInfo(AwsModel):
     size: int
     e_tag: str
     storage_class: StorageClass
+
+
+class CommonPrefix(str):
+    """Key prefix grouping the objects below a delimiter,
+    listed in place of those objects"""
+
+    __slots__ = ()
+
+    @property
+    def key(self) -> str:
+        return str(self)
+
+
+class ObjectRecord:
+    """Lightweight listing entry for callers that don't need a
+    validated `FileInfo`. `last_modified` and `storage_class` are
+    parsed on first access."""
+
+    __slots__ = ("key", "size", "e_tag", "_last_modified", "_storage_class")
+
+    def __init__(
+        self,
+        key: str,
+        size: int,
+        e_tag: str,
+        last_modified: Union[str, datetime],
+        storage_class: Union[str, StorageClass],
+    ) -> None:
+        self.key = key
+        self.size = size
+        self.e_tag = e_tag
+        self._last_modified = last_modified
+        self._storage_class = storage_class
+
+    @property
+    def last_modified(self) -> datetime:
+        if isinstance(value := self._last_modified, str):
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            self._last_modified = value
+        return value
+
+    @property
+    def storage_class(self) -> StorageClass:
+        if isinstance(value := self._storage_class, str):
+            try:
+                value = StorageClass(value)
+            except ValueError:
+                value = StorageClass.UNKNOWN
+            self._storage_class = value
+        return value
+
+    def to_file_info(self) -> FileInfo:
+        return FileInfo(
+            key=self.key,
+            last_modified=self.last_modified,
+            size=self.size,
+            e_tag=self.e_tag,
+            storage_class=self.storage_class,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(key={self.key!r}, size={self.size!r}, "
+            f"e_tag={self.e_tag!r})"
+        )
@@ -1,4 +1,51 @@
-from .delete import ObjectTuple
-from .service import S3Object
+from typing import TYPE_CHECKING
 
-__all__ = ["S3Object", "ObjectTuple"]
+from simple_aws.utils import lazy_exports
+
+if TYPE_CHECKING:
+    from .async_service import AsyncS3Object
+    from .copy import CopyError
+    from .copy import CopyResult
+    from .delete import DeleteError
+    from .delete import DeleteProgress
+    from .delete import DeleteResult
+    from .delete import ObjectTuple
+    from .disk_cache import DiskCache
+    from .info_cache import InfoCache
+    from .list_ import ListCheckpoint
+    from .presign import PresignCache
+    from .service import S3Object
+
+# imported on first access, so the sync client never loads httpx
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "S3Object": ".service",
+        "AsyncS3Object": ".async_service",
+        "ObjectTuple": ".delete",
+        "DeleteResult": ".delete",
+        "DeleteError": ".delete",
+        "CopyResult": ".copy",
+        "CopyError": ".copy",
+        "DeleteProgress": ".delete",
+        "InfoCache": ".info_cache",
+        "DiskCache": ".disk_cache",
+        "ListCheckpoint": ".list_",
+        "PresignCache": ".presign",
+    },
+)
+
+__all__ = [
+    "S3Object",
+    "AsyncS3Object",
+    "ObjectTuple",
+    "DeleteResult",
+    "DeleteError",
+    "DeleteProgress",
+    "CopyResult",
+    "CopyError",
+    "InfoCache",
+    "DiskCache",
+    "ListCheckpoint",
+    "PresignCache",
+]
@@ -0,0 +1,350 @@
+import asyncio
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from typing import AsyncIterator
+from typing import Iterable
+from typing import Optional
+from typing import overload
+
+from gyver.context import AsyncContext
+from gyver.utils import lazyfield
+
+from simple_aws.async_http import DEFAULT_MAX_CONNECTIONS
+from simple_aws.async_http import AsyncAuthHttpAdapter
+from simple_aws.async_http import AsyncAuthHttpClient
+from simple_aws.auth import PayloadSigning
+from simple_aws.config import make_default_factory
+from simple_aws.credentials import Credentials
+from simple_aws.exc import NotFound
+from simple_aws.exc import RequestFailed
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.models import FileInfo
+
+from .copy import Copy
+from .copy import CopyParams
+from .core import SERVICE_NAME
+from .core import S3Core
+from .delete import DeleteMany
+from .delete import DeleteResult
+from .delete import DeleteTarget
+from .delete import ObjectTuple
+from .delete import parse_delete_result
+from .get import DAY
+from .get import DEFAULT_STREAM_CHUNK_SIZE
+from .get import ByteRange
+from .get import Get
+from .get import check_range_response
+from .list_ import MAX_CHUNKSIZE
+from .list_ import READ_SIZE
+from .list_ import List
+from .list_ import ListCheckpoint
+from .list_ import ListEntry
+from .multipart import DEFAULT_CONCURRENCY
+from .upload import Upload
+
+if TYPE_CHECKING:
+    import httpx
+
+
+@dataclass(frozen=True)
+class AsyncS3Object:
+    """asyncio counterpart of `S3Object`.
+
+    Requests are signed by the same `AwsAuthV4` as the sync client.
+    Use it as an async context manager to keep one connection pool
+    open across calls, otherwise each call opens its own client.
+
+    >>> async with AsyncS3Object(credentials, config) as s3:
+    ...     await s3.upload("file.txt", b"content")
+    """
+
+    credentials: Credentials
+    config: S3ObjectConfig = field(
+        default_factory=make_default_factory(S3ObjectConfig)
+    )
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    max_concurrency: Optional[int] = None
+    transport: Optional["httpx.AsyncBaseTransport"] = None
+
+    @lazyfield
+    def core(self):
+        return S3Core(self.credentials, self.config)
+
+    @lazyfield
+    def http_provider(self):
+        return AsyncAuthHttpAdapter(
+            self.credentials,
+            SERVICE_NAME,
+            payload_signing=self.config.payload_signing,
+            max_connections=self.max_connections,
+            max_concurrency=self.max_concurrency,
+            transport=self.transport,
+        )
+
+    @lazyfield
+    def context(self) -> AsyncContext[AsyncAuthHttpClient]:
+        return AsyncContext(self.http_provider)
+
+    async def __aenter__(self):
+        await self.context.acquire()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.context.release()
+
+    async def upload(
+        self,
+        object_name: str,
+        content: bytes,
+        *,
+        content_type: Optional[str] = None
+    ) -> None:
+        upload = Upload(self.core, object_name, content, content_type)
+        async with self.context.begin() as client:
+            response = await client.post(
+                self.core.base_uri,
+                upload.form_fields(),
+                files={"file": content},
+                raw=True,
+            )
+            if response.status_code != HTTPStatus.NO_CONTENT:
+                raise RequestFailed(response)
+
+    @overload
+    async def download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        *,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
+    ) -> bytes:
+        ...
+
+    @overload
+    async def download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
+    ) -> Optional[bytes]:
+        ...
+
+    async def download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
+    ) -> Optional[bytes]:
+        """Downloads the object content, see `S3Object.download`"""
+        url, headers, raw = Get(
+            self.core, object_name, version
+        ).download_request(
+            if_none_match, if_modified_since, byte_range, presigned
+        )
+        async with self.context.begin() as client:
+            response = await client.get(url, headers, raw)
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                return None
+            if not response.is_success:
+                raise RequestFailed(response)
+            if byte_range is not None:
+                check_range_response(
+                    byte_range,
+                    response.status_code,
+                    response.headers.get("content-range"),
+                )
+            return response.content
+
+    async def iter_download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        url = Get(self.core, object_name, version).presigned_url(expires=30)
+        async with self.context.begin() as client:
+            async with client.stream("GET", url, raw=True) as response:
+                if not response.is_success:
+                    await response.aread()
+                    raise RequestFailed(response)
+                async for chunk in response.aiter_bytes(chunk_size):
+                    yield chunk
+
+    def create_presigned_get(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        expires: int = DAY,
+    ):
+        return Get(self.core, object_name, version).presigned_url(expires)
+
+    async def object_info(
+        self, object_name: str, version: Optional[str] = None
+    ) -> FileInfo:
+        return await self._head(Get(self.core, object_name, version))
+
+    async def _head(self, get: Get) -> FileInfo:
+        async with self.context.begin() as client:
+            response = await client.head(get.object_url())
+            if not response.is_success:
+                if response.status_code == HTTPStatus.NOT_FOUND:
+                    raise NotFound(get.object_name, SERVICE_NAME)
+                raise RequestFailed(response)
+            return get.parse_info(response.headers)
+
+    def list_objects(
+        self,
+        prefix: Optional[str] = None,
+        chunksize: int = MAX_CHUNKSIZE,
+        *,
+        compact: bool = False,
+        keys_only: bool = False,
+        delimiter: Optional[str] = None,
+        start_after: Optional[str] = None,
+        resume_from: Optional[ListCheckpoint] = None
+    ) -> AsyncIterator[ListEntry]:
+        return self.iter_list(
+            List(
+                self.core,
+                prefix,
+                chunksize,
+                compact,
+                keys_only,
+                start_after,
+                delimiter=delimiter,
+                resume_from=resume_from,
+            )
+        )
+
+    async def iter_list(self, lister: List) -> AsyncIterator[ListEntry]:
+        """Iterates over `lister` entries, its `checkpoint` is kept
+        up to date like when iterating it synchronously"""
+        base_url = lister.new_url()
+        progress = lister.progress
+        progress.reset(lister.resume_from)
+        async with self.context.begin() as client:
+            while True:
+                url = lister.page_url(base_url, progress.continuation_token)
+                async with client.stream("GET", url) as response:
+                    if not response.is_success:
+                        await response.aread()
+                        raise RequestFailed(response)
+                    parser = lister.new_parser()
+                    async for data in response.aiter_bytes(READ_SIZE):
+                        for item in lister.accept(progress, parser.feed(data)):
+                            yield item
+                        if lister.is_done(progress):
+                            return
+                    continuation_token = parser.close()
+                if progress.stopped or continuation_token is None:
+                    break
+                progress.next_page(continuation_token)
+
+    async def delete(
+        self, object_name: str, version: Optional[str] = None
+    ) -> DeleteResult:
+        return await self.delete_many(ObjectTuple(object_name, version))
+
+    async def delete_many(
+        self,
+        *objects: DeleteTarget,
+        quiet: bool = False,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> DeleteResult:
+        """Deletes the objects, each a key or a (key, version) pair,
+        see `delete_iter`"""
+        return await self.delete_iter(
+            objects, quiet=quiet, concurrency=concurrency
+        )
+
+    async def delete_iter(
+        self,
+        objects: Iterable[DeleteTarget],
+        *,
+        quiet: bool = False,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> DeleteResult:
+        """Deletes an iterable of objects of any size, each a key or a
+        (key, version) pair, in batches of 1000 keys. Up to
+        `concurrency` batches are read and sent at the same time"""
+        delete = DeleteMany(self.core, objects, quiet, concurrency)
+        batches = delete.batches()
+        result = DeleteResult()
+
+        async def send_batches(client: AsyncAuthHttpClient):
+            # the batches are shared, each is pulled when a sender is free
+            for batch in batches:
+                result.extend(await self._delete_batch(client, delete, batch))
+
+        async with self.context.begin() as client:
+            senders = [
+                asyncio.ensure_future(send_batches(client))
+                for _ in range(concurrency)
+            ]
+            try:
+                await asyncio.gather(*senders)
+            except BaseException:
+                for sender in senders:
+                    sender.cancel()
+                raise
+        return result
+
+    async def _delete_batch(
+        self,
+        client: AsyncAuthHttpClient,
+        delete: DeleteMany,
+        batch: list[ObjectTuple],
+    ) -> DeleteResult:
+        response = await client.post(
+            delete.new_url(),
+            data=delete.build_payload(batch),
+            headers={"content-type": "text/xml"},
+            payload_signing=PayloadSigning.SHA256_MD5,
+        )
+        if not response.is_success:
+            raise RequestFailed(response)
+        return parse_delete_result(response.content)
+
+    async def copy(
+        self, source: CopyParams, target: CopyParams, prevalidate: bool = True
+    ):
+        url, headers = Copy(self.core, prevalidate).copy_request(
+            source, target
+        )
+        async with self.context.begin() as client:
+            if prevalidate:
+                await self._validate_source(source)
+            response = await client.put(url, headers=headers)
+            if not response.is_success:
+                raise RequestFailed(response)
+
+    async def _validate_source(self, source: CopyParams):
+        await self._head(
+            Get(self.core.for_bucket(source.bucket), source.object_name)
+        )
+
+    async def move(
+        self, object_name: str, destination: str, prevalidate: bool = True
+    ):
+        """Move an object inside the same bucket
+        destination and object_name must be the full object path"""
+        async with self.context.open():
+            bucket = self.config.bucket_name
+            await self.copy(
+                CopyParams(object_name, bucket),
+                CopyParams(destination, bucket),
+                prevalidate,
+            )
+            await self.delete(object_name)
@@ -1,15 +1,59 @@
+import itertools
+from collections import defaultdict
+from contextlib import suppress
 from dataclasses import dataclass
+from dataclasses import field
+from functools import partial
+from http import HTTPStatus
+from typing import Iterable
+from typing import Mapping
 from typing import NamedTuple
 from typing import Optional
+from urllib.parse import urlencode
+from xml.etree import ElementTree as ET
 
 from gyver.url import URL
 from gyver.url import Path
+from gyver.utils import lazyfield
 
+from simple_aws.exc import NotFound
 from simple_aws.exc import RequestFailed
-from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.http import AuthHttpClient
 from simple_aws.services.s3.object.core import HOST_TEMPLATE
+from simple_aws.services.s3.object.core import SERVICE_NAME
 from simple_aws.services.s3.object.core import S3Core
 from simple_aws.services.s3.object.get import Get
+from simple_aws.utils import xmlns
+
+from .delete import MAX_DELETE_BATCH
+from .delete import DeleteError
+from .delete import DeleteMany
+from .delete import DeleteResult
+from .multipart import DEFAULT_CONCURRENCY
+from .multipart import MAX_SINGLE_UPLOAD_SIZE
+from .multipart import MIB
+from .multipart import Multipart
+from .multipart import _raise_for_error_body
+from .multipart import fit_part_size
+from .multipart import run_parts
+from .multipart import validate_concurrency
+
+DEFAULT_COPY_PART_SIZE = 64 * MIB
+DEFAULT_MULTIPART_COPY_THRESHOLD = 2 * DEFAULT_COPY_PART_SIZE
+
+# headers CopyObject copies from the source, which a multipart
+# copy has to set itself when creating the upload
+_COPIED_HEADERS = frozenset(
+    (
+        "cache-control",
+        "content-disposition",
+        "content-encoding",
+        "content-language",
+        "content-type",
+        "expires",
+    )
+)
 
 
 class CopyParams(NamedTuple):
@@ -17,38 +61,90 @@ class CopyParams(NamedTuple):
     bucket: str
 
 
+def copy_source(source: CopyParams) -> str:
+    return Path(source.bucket).add(source.object_name).encode()
+
+
+def copied_headers(headers: Mapping[str, str]) -> dict[str, str]:
+    """Returns the content and user metadata headers of an object"""
+    copied = {}
+    for name, value in headers.items():
+        name = name.lower()
+        if name in _COPIED_HEADERS or name.startswith("x-amz-meta-"):
+            copied[name] = value
+    return copied
+
+
 @dataclass(frozen=True)
 class Copy:
+    """Copies objects with CopyObject or, when `prevalidate` finds a
+    source larger than `multipart_threshold`, with `MultipartCopy`.
+
+    Either way the copy keeps the content headers, user metadata and
+    tags of the source, which a multipart copy reads with
+    GetObjectTagging and so requires s3:GetObjectTagging as
+    CopyObject does. Neither copies the source ACL, the target gets
+    the bucket default.
+
+    Without `prevalidate` the source size is unknown, so it is always
+    a single CopyObject, which S3 limits to 5GB sources."""
+
     core: S3Core
     prevalidate: bool = True
+    multipart_threshold: int = DEFAULT_MULTIPART_COPY_THRESHOLD
+    part_size: int = DEFAULT_COPY_PART_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
 
     def copy(self, source: CopyParams, target: CopyParams):
+        if self.prevalidate:
+            # validate if source object exists
+            get = Get(self.core.for_bucket(source.bucket), source.object_name)
+            headers = get.head()
+            info = get.parse_info(headers)
+            if info.size > min(
+                self.multipart_threshold, MAX_SINGLE_UPLOAD_SIZE
+            ):
+                copied = copied_headers(headers)
+                tags = get.tags()
+                if tags:
+                    copied["x-amz-tagging"] = urlencode(tags)
+                return MultipartCopy(
+                    self.core,
+                    source,
+                    target,
+                    info.size,
+                    info.e_tag,
+                    copied,
+                    self.part_size,
+                    self.concurrency,
+                ).copy()
+        with self.core.context.begin() as client:
+            self.send(client, source, target)
+
+    def send(
+        self, client: AuthHttpClient, source: CopyParams, target: CopyParams
+    ):
+        """Sends the CopyObject request, a missing source is reported
+        by S3 as a 404"""
+        url, headers = self.copy_request(source, target)
+        response = client.put(url, headers=headers)
+        if not response.ok:
+            if response.status_code == HTTPStatus.NOT_FOUND:
+                raise NotFound(source.object_name, SERVICE_NAME)
+            raise RequestFailed(response)
+        # S3 may fail a copy after answering 200
+        _raise_for_error_body(response, "copy failed")
+
+    def copy_request(
+        self, source: CopyParams, target: CopyParams
+    ) -> tuple[URL, dict[str, str]]:
+        """Returns the url and headers of a CopyObject request"""
         url = URL(
             HOST_TEMPLATE.format(
                 bucket=target.bucket, region=self.core.credentials.region
             )
         ).add(path=target.object_name)
-
-        if self.prevalidate:
-            # validate if source object exists
-            Get(
-                S3Core(
-                    self.core.credentials,
-                    S3ObjectConfig(bucket_name=source.bucket),
-                ),
-                source.object_name,
-            ).info()
-        with self.core.context.begin() as client:
-            response = client.put(
-                url,
-                headers={
-                    "x-amz-copy-source": Path(source.bucket)
-                    .add(source.object_name)
-                    .encode()
-                },
-            )
-            if not response.ok:
-                raise RequestFailed(response)
+        return url, {"x-amz-copy-source": copy_source(source)}
 
     def copy_from(self, source: CopyParams, target_name: Optional[str] = None):
         target = CopyParams(
@@ -61,3 +157,174 @@ class Copy:
             source_name or target.object_name, self.core.config.bucket_name
         )
         return self.copy(source, target)
+
+
+@dataclass(frozen=True)
+class MultipartCopy:
+    """Copies an object server side with concurrent UploadPartCopy
+    requests for `part_size` byte ranges of the source, aborting the
+    upload if any part fails. Every part requires the source to still
+    match `e_tag`, so a source replaced midway fails the copy.
+
+    Unlike CopyObject, UploadPartCopy copies no metadata: the target
+    only gets `headers`, which `Copy` fills from the source."""
+
+    core: S3Core
+    source: CopyParams
+    target: CopyParams
+    size: int
+    e_tag: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+    part_size: int = DEFAULT_COPY_PART_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
+
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+
+    @lazyfield
+    def multipart(self):
+        return Multipart(
+            self.core.for_bucket(self.target.bucket), self.target.object_name
+        )
+
+    def copy(self):
+        part_size = fit_part_size(self.part_size, self.size)
+        ranges = (
+            (start, min(start + part_size, self.size) - 1)
+            for start in range(0, self.size, part_size)
+        )
+        with self.core.context.begin() as client:
+            upload_id = self.multipart.create(client, self.headers)
+            try:
+                parts = run_parts(
+                    enumerate(ranges, 1),
+                    partial(self._copy_part, client, upload_id),
+                    self.concurrency,
+                )
+                self.multipart.complete(client, upload_id, parts)
+            except BaseException:
+                self.multipart.abort_quietly(client, upload_id)
+                raise
+
+    def _copy_part(
+        self,
+        client: AuthHttpClient,
+        upload_id: str,
+        part_number: int,
+        span: tuple[int, int],
+    ) -> str:
+        start, end = span
+        response = client.put(
+            self.multipart.part_url(upload_id, part_number),
+            headers={
+                "x-amz-copy-source": copy_source(self.source),
+                "x-amz-copy-source-range": f"bytes={start}-{end}",
+                "x-amz-copy-source-if-match": f'"{self.e_tag}"',
+            },
+        )
+        if not response.ok:
+            if response.status_code == HTTPStatus.NOT_FOUND:
+                raise NotFound(self.source.object_name, SERVICE_NAME)
+            raise RequestFailed(response)
+        _raise_for_error_body(response, "part copy failed")
+        e_tag = None
+        with suppress(ET.ParseError):
+            e_tag = ET.fromstring(response.content).findtext(
+                f"{{{xmlns}}}ETag"
+            )
+        if not e_tag:
+            raise UnexpectedResponse("unexpected response from S3")
+        return e_tag
+
+
+CopyPair = tuple[CopyParams, CopyParams]
+
+
+class CopyError(NamedTuple):
+    source: CopyParams
+    target: CopyParams
+    error: Exception
+
+
+@dataclass
+class CopyResult:
+    """Pairs copied by a `CopyMany` and the ones that failed to be.
+    When moving, `delete_errors` holds the sources of copied pairs
+    that S3 failed to delete"""
+
+    copied: list[CopyPair] = field(default_factory=list)
+    errors: list[CopyError] = field(default_factory=list)
+    delete_errors: list[DeleteError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.delete_errors
+
+
+@dataclass(frozen=True)
+class CopyMany:
+    """Copies `(source, target)` pairs, sending up to `concurrency`
+    CopyObject requests at the same time. Sources are not checked
+    beforehand, a missing one fails its copy with `NotFound`. A failed
+    copy is reported in the result and does not stop the others.
+
+    With `move`, the sources of the pairs copied are deleted in
+    DeleteObjects batches, the others are kept. Pairs are processed
+    `MAX_DELETE_BATCH` at a time, so any number of them can be given
+    as an iterable."""
+
+    core: S3Core
+    pairs: Iterable[CopyPair]
+    concurrency: int = DEFAULT_CONCURRENCY
+    move: bool = False
+
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+
+    def copy(self) -> CopyResult:
+        copy = Copy(self.core, prevalidate=False)
+        result = CopyResult()
+        pairs = iter(self.pairs)
+        with self.core.context.begin() as client:
+            while batch := list(itertools.islice(pairs, MAX_DELETE_BATCH)):
+                outcomes = run_parts(
+                    enumerate(batch, 1),
+                    lambda _, pair: _try_send(copy, client, pair),
+                    self.concurrency,
+                )
+                copied = []
+                for pair, (_, error) in zip(batch, outcomes):
+                    if error is None:
+                        copied.append(pair)
+                    else:
+                        result.errors.append(CopyError(*pair, error))
+                result.copied.extend(copied)
+                if self.move and copied:
+                    result.delete_errors.extend(
+                        self._delete_sources(copied).errors
+                    )
+        return result
+
+    def _delete_sources(self, batch: list[CopyPair]) -> DeleteResult:
+        by_bucket: defaultdict[str, list[str]] = defaultdict(list)
+        for source, _ in batch:
+            by_bucket[source.bucket].append(source.object_name)
+        result = DeleteResult()
+        for bucket, object_names in by_bucket.items():
+            result.extend(
+                DeleteMany(
+                    self.core.for_bucket(bucket), object_names, quiet=True
+                ).delete()
+            )
+        return result
+
+
+def _try_send(
+    copy: Copy, client: AuthHttpClient, pair: CopyPair
+) -> Optional[Exception]:
+    try:
+        copy.send(client, *pair)
+    except Exception as error:
+        # reported with its pair, the other copies go on
+        return error
+    return None
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from dataclasses import field
+from typing import Mapping
+from typing import Optional
 
-from gyver.context import Context
 from gyver.url import URL
 from gyver.utils import lazyfield
 
@@ -10,18 +11,65 @@ from simple_aws.config import make_default_factory
 from simple_aws.credentials import Credentials
 from simple_aws.http import AuthHttpAdapter
 from simple_aws.http import AuthHttpClient
+from simple_aws.http import PooledContext
+from simple_aws.instrumentation import RequestHook
+from simple_aws.retry import AdaptiveRateLimiter
+from simple_aws.retry import RetryPolicy
 from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.transport import RequestsTransport
+from simple_aws.transport import TransportFactory
 
 HOST_TEMPLATE = "https://{bucket}.s3.{region}.amazonaws.com"
 SERVICE_NAME = "s3"
 
 
+def describe_request(
+    method: str, url: URL, headers: Mapping[str, str]
+) -> tuple[str, str]:
+    """Names S3 requests after their API operation and bucket"""
+    params = url.query.params
+    copy = "x-amz-copy-source" in headers
+    if method == "GET":
+        if "list-type" in params:
+            operation = "ListObjectsV2"
+        elif "tagging" in params:
+            operation = "GetObjectTagging"
+        else:
+            operation = "GetObject"
+    elif method == "HEAD":
+        operation = "HeadObject"
+    elif method == "PUT":
+        if "uploadId" in params:
+            operation = "UploadPartCopy" if copy else "UploadPart"
+        else:
+            operation = "CopyObject" if copy else "PutObject"
+    elif method == "POST":
+        if "delete" in params:
+            operation = "DeleteObjects"
+        elif "uploads" in params:
+            operation = "CreateMultipartUpload"
+        elif "uploadId" in params:
+            operation = "CompleteMultipartUpload"
+        else:
+            operation = "PostObject"
+    elif "uploadId" in params:
+        operation = "AbortMultipartUpload"
+    else:
+        operation = "DeleteObject"
+    # buckets are addressed virtual-hosted style
+    return operation, url.netloc.encode().partition(".s3.")[0]
+
+
 @dataclass(frozen=True)
 class S3Core:
     credentials: Credentials
     config: S3ObjectConfig = field(
         default_factory=make_default_factory(S3ObjectConfig)
     )
+    hooks: tuple[RequestHook, ...] = ()
+    transport: TransportFactory = RequestsTransport
+    # connection pool of the core this one was made from by `for_bucket`
+    shared_context: Optional[PooledContext] = None
 
     @lazyfield
     def base_uri(self) -> URL:
@@ -36,12 +84,56 @@ class S3Core:
 
     @lazyfield
     def aws_auth(self) -> AwsAuthV4:
-        return AwsAuthV4(self.credentials, SERVICE_NAME)
+        return AwsAuthV4(
+            self.credentials,
+            SERVICE_NAME,
+            payload_signing=self.config.payload_signing,
+        )
 
     @lazyfield
     def http_provider(self):
-        return AuthHttpAdapter(self.credentials, SERVICE_NAME)
+        return AuthHttpAdapter(
+            self.credentials,
+            SERVICE_NAME,
+            payload_signing=self.config.payload_signing,
+            pool_size=self.config.pool_size,
+            keep_alive=self.config.keep_alive,
+            retry_policy=RetryPolicy(self.config.max_attempts),
+            rate_limiter=AdaptiveRateLimiter()
+            if self.config.adaptive_rate_limit
+            else None,
+            hooks=self.hooks,
+            describe=describe_request,
+            transport_factory=self.transport,
+        )
 
     @lazyfield
-    def context(self) -> Context[AuthHttpClient]:
-        return Context(self.http_provider)
+    def context(self) -> PooledContext:
+        if self.shared_context is not None:
+            return self.shared_context
+        return PooledContext(self.http_provider, self._prewarm)
+
+    def _prewarm(self, client: AuthHttpClient):
+        """Opens `prewarm_connections` with HEAD requests to the bucket
+        root, which only succeed with s3:ListBucket, or to the
+        `prewarm_key` object when set. Connections are kept whatever
+        the answer, but denied requests still show in access logs"""
+        url = self.base_uri
+        if self.config.prewarm_key is not None:
+            url = self.get_uri_copy().add(path=self.config.prewarm_key)
+        client.prewarm(url, self.config.prewarm_connections)
+
+    def for_bucket(self, bucket_name: str) -> "S3Core":
+        """Returns a core for another bucket sharing this connection pool"""
+        if bucket_name == self.config.bucket_name:
+            return self
+        return S3Core(
+            self.credentials,
+            self.config.copy(update={"bucket_name": bucket_name}),
+            self.hooks,
+            self.transport,
+            self.context,
+        )
+
+    def close(self):
+        self.context.close()
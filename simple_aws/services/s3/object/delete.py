@@ -1,16 +1,36 @@
-import io
+import itertools
+import threading
 from dataclasses import dataclass
+from dataclasses import field
+from functools import partial
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import NamedTuple
 from typing import Optional
 from typing import Sequence
+from typing import Union
 from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
 
+from simple_aws.auth import PayloadSigning
+from simple_aws.exc import InvalidParam
 from simple_aws.exc import RequestFailed
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.http import AuthHttpClient
 from simple_aws.utils import xmlns
 
 from .core import S3Core
+from .list_ import List
+from .multipart import DEFAULT_CONCURRENCY
+from .multipart import run_parts
+from .multipart import validate_concurrency
 
-DEFAULT_ENCODING = "UTF-8"
+# S3 rejects DeleteObjects requests with more keys
+MAX_DELETE_BATCH = 1000
+
+# a key, or a (key, version) pair such as an ObjectTuple
+DeleteTarget = Union[str, tuple[str, Optional[str]]]
 
 
 class ObjectTuple(NamedTuple):
@@ -18,32 +38,215 @@ class ObjectTuple(NamedTuple):
     version: Optional[str] = None
 
 
+class DeleteError(NamedTuple):
+    object_name: str
+    version: Optional[str]
+    code: str
+    message: str
+
+
+@dataclass
+class DeleteResult:
+    """Objects deleted by a `DeleteMany` and the ones S3 failed to
+    delete. `deleted` stays empty in quiet mode"""
+
+    deleted: list[ObjectTuple] = field(default_factory=list)
+    errors: list[DeleteError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def extend(self, other: "DeleteResult"):
+        self.deleted.extend(other.deleted)
+        self.errors.extend(other.errors)
+
+
+class DeleteProgress:
+    """Counters of a running `DeleteMany`, updated as batches are read
+    and completed. `callback` is called with the progress after each
+    batch, possibly from a worker thread"""
+
+    def __init__(
+        self, callback: Optional[Callable[["DeleteProgress"], None]] = None
+    ) -> None:
+        self.callback = callback
+        self.listed = 0
+        self.deleted = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def add_listed(self, count: int):
+        with self._lock:
+            self.listed += count
+
+    def add_result(self, count: int, result: DeleteResult):
+        with self._lock:
+            self.failed += len(result.errors)
+            self.deleted += count - len(result.errors)
+        if self.callback is not None:
+            self.callback(self)
+
+
+def object_tuple(target: DeleteTarget) -> ObjectTuple:
+    if isinstance(target, str):
+        return ObjectTuple(target)
+    if isinstance(target, tuple) and len(target) == 2:
+        return ObjectTuple(*target)
+    raise InvalidParam(
+        "objects",
+        target,
+        "Objects must be keys or (key, version) pairs",
+    )
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def parse_delete_result(content: bytes) -> DeleteResult:
+    root = ET.fromstring(content)
+    if _local_name(root.tag) != "DeleteResult":
+        raise UnexpectedResponse(f"delete failed: {content.decode()}")
+    result = DeleteResult()
+    for element in root:
+        fields = {_local_name(child.tag): child.text for child in element}
+        kind = _local_name(element.tag)
+        if kind == "Deleted":
+            result.deleted.append(
+                ObjectTuple(fields.get("Key") or "", fields.get("VersionId"))
+            )
+        elif kind == "Error":
+            result.errors.append(
+                DeleteError(
+                    fields.get("Key") or "",
+                    fields.get("VersionId"),
+                    fields.get("Code") or "",
+                    fields.get("Message") or "",
+                )
+            )
+    return result
+
+
 @dataclass(frozen=True)
 class DeleteMany:
+    """Deletes `objects` in batches of `batch_size` keys, sending up
+    to `concurrency` DeleteObjects requests at the same time.
+
+    Objects may be an iterable of any size, it is only read one batch
+    per running request ahead."""
+
     core: S3Core
-    objects: Sequence[ObjectTuple]
+    objects: Iterable[DeleteTarget]
+    quiet: bool = False
+    concurrency: int = DEFAULT_CONCURRENCY
+    batch_size: int = MAX_DELETE_BATCH
+    progress: Optional[DeleteProgress] = None
 
-    def delete(self):
-        url = self.core.get_uri_copy().add({"delete": ""}, path="/")
-        payload = self._build_payload()
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+        if not 1 <= self.batch_size <= MAX_DELETE_BATCH:
+            raise InvalidParam(
+                "batch_size",
+                self.batch_size,
+                f"Batch size must be between 1 and {MAX_DELETE_BATCH}",
+            )
+
+    def new_url(self):
+        return self.core.get_uri_copy().add({"delete": ""}, path="/")
 
+    def delete(self) -> DeleteResult:
+        result = DeleteResult()
         with self.core.context.begin() as client:
-            response = client.post(
-                url,
-                data=payload,
-                headers={"content-type": "text/xml"},
+            batches = enumerate(self.batches(), 1)
+            first = next(batches, None)
+            if first is None:
+                return result
+            second = next(batches, None)
+            if second is None:
+                return self._delete_batch(client, *first)
+            for _, batch_result in run_parts(
+                itertools.chain((first, second), batches),
+                partial(self._delete_batch, client),
+                self.concurrency,
+            ):
+                result.extend(batch_result)
+        return result
+
+    def batches(self) -> Iterator[list[ObjectTuple]]:
+        objects = map(object_tuple, self.objects)
+        while batch := list(itertools.islice(objects, self.batch_size)):
+            if self.progress is not None:
+                self.progress.add_listed(len(batch))
+            yield batch
+
+    def _delete_batch(
+        self, client: AuthHttpClient, number: int, batch: list[ObjectTuple]
+    ) -> DeleteResult:
+        del number
+        response = client.post(
+            self.new_url(),
+            data=self.build_payload(batch),
+            headers={"content-type": "text/xml"},
+            # DeleteObjects requires Content-MD5
+            payload_signing=PayloadSigning.SHA256_MD5,
+            idempotent=True,
+        )
+        if not response.ok:
+            raise RequestFailed(response)
+        result = parse_delete_result(response.content)
+        if self.progress is not None:
+            self.progress.add_result(len(batch), result)
+        return result
+
+    def build_payload(self, batch: Sequence[ObjectTuple]) -> bytes:
+        return "".join(
+            (
+                '<?xml version="1.0" encoding="UTF-8"?>',
+                f'<Delete xmlns="{xmlns}">',
+                "<Quiet>true</Quiet>" if self.quiet else "",
+                *(
+                    f"<Object><Key>{escape(name)}</Key>"
+                    + (
+                        f"<VersionId>{escape(version)}</VersionId>"
+                        if version
+                        else ""
+                    )
+                    + "</Object>"
+                    for name, version in batch
+                ),
+                "</Delete>",
             )
-            if not response.ok:
-                raise RequestFailed(response)
-
-    def _build_payload(self):
-        root = ET.Element("Delete", xmlns=xmlns)
-        for item in self.objects:
-            object_el = ET.SubElement(root, "Object")
-            ET.SubElement(object_el, "Key").text = item.object_name
-            if item.version:
-                ET.SubElement(object_el, "VersionId").text = item.version
-        et = ET.ElementTree(root)
-        stream = io.BytesIO()
-        et.write(stream, encoding=DEFAULT_ENCODING, xml_declaration=True)
-        return stream.getvalue()
+        ).encode()
+
+
+@dataclass(frozen=True)
+class DeletePrefix:
+    """Deletes every object under `prefix` in a single pipeline.
+
+    Keys are listed page by page and deleted in quiet batches while
+    the listing continues, so memory stays bounded by `concurrency`
+    batches and only the failures are kept in the result."""
+
+    core: S3Core
+    prefix: str
+    concurrency: int = DEFAULT_CONCURRENCY
+    progress: Optional[DeleteProgress] = None
+
+    def __post_init__(self):
+        if not self.prefix.removeprefix("/"):
+            raise InvalidParam(
+                "prefix",
+                self.prefix,
+                "Prefix must not be empty, it would delete the whole bucket",
+            )
+
+    def delete(self) -> DeleteResult:
+        with self.core.context.open():
+            return DeleteMany(
+                self.core,
+                List(self.core, self.prefix, keys_only=True),
+                quiet=True,
+                concurrency=self.concurrency,
+                progress=self.progress,
+            ).delete()
@@ -0,0 +1,255 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from typing import IO
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import NotFound
+from simple_aws.exc import RequestFailed
+from simple_aws.exc import UnexpectedResponse
+
+from .core import SERVICE_NAME
+from .download import READ_BLOCK_SIZE
+from .get import ByteRange
+from .get import Get
+from .get import range_slice
+
+DEFAULT_DISK_CACHE_SIZE = 1024**3
+
+_TEMP_PREFIX = ".fill-"
+# fills by other processes sharing the directory may still be running
+STALE_FILL_AGE = 24 * 3600
+# <sha256 of bucket, key and version>-<etag>
+_ENTRY_PATTERN = re.compile(r"[0-9a-f]{64}-.+")
+
+
+class _CachedFile(NamedTuple):
+    path: Path
+    size: int
+
+
+def _entry_name(bucket: str, object_name: str, version: Optional[str]):
+    return hashlib.sha256(
+        "\0".join((bucket, object_name.lstrip("/"), version or "")).encode()
+    ).hexdigest()
+
+
+def _e_tag(cached: _CachedFile) -> str:
+    return cached.path.name.partition("-")[2]
+
+
+def _map(file: IO[bytes]) -> memoryview:
+    if not os.fstat(file.fileno()).st_size:
+        # empty files cannot be mapped
+        return memoryview(b"")
+    return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class DiskCache:
+    """Read-through cache of object contents under `directory`.
+
+    Each object is stored in a file named after its bucket, key and
+    version followed by its ETag. Every read sends a GET conditional
+    on the cached ETag, so an unchanged object costs an empty 304 and
+    a changed one replaces its file. Files are filled in a temporary
+    file renamed into place, so readers and other processes sharing
+    the directory never see partial content.
+
+    The least recently read files are removed once the cache holds
+    more than `max_size` bytes. Hits are memory mapped, so they are
+    not read into memory. Ranged reads are sliced from cached files
+    but never fill them."""
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        max_size: int = DEFAULT_DISK_CACHE_SIZE,
+    ) -> None:
+        if max_size < 1:
+            raise InvalidParam(
+                "max_size", max_size, "Max size must be positive"
+            )
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._lock = threading.Lock()
+        self._files: OrderedDict[str, _CachedFile] = OrderedDict()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Indexes the files left by previous runs, oldest read first.
+        Other files in the directory are left alone, but for temporary
+        files of fills older than STALE_FILL_AGE, which were abandoned"""
+        files = []
+        stale_before = time.time() - STALE_FILL_AGE
+        for path in self.directory.iterdir():
+            try:
+                info = path.stat()
+            except OSError:
+                # renamed or removed by another process meanwhile
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                continue
+            if path.name.startswith(_TEMP_PREFIX):
+                if info.st_mtime < stale_before:
+                    with contextlib.suppress(OSError):
+                        path.unlink()
+            elif _ENTRY_PATTERN.fullmatch(path.name):
+                files.append((info.st_mtime, path, info.st_size))
+        for _, path, size in sorted(files):
+            name = path.name.partition("-")[0]
+            previous = self._files.pop(name, None)
+            if previous is not None:
+                self.size -= previous.size
+                self._remove(previous)
+            self._files[name] = _CachedFile(path, size)
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def read(self, get: Get) -> memoryview:
+        """Returns the current content of the object `get` points to,
+        mapped from its cached file"""
+        name = _entry_name(
+            get.core.config.bucket_name, get.object_name, get.version
+        )
+        with self._lock:
+            cached = self._files.get(name)
+        headers = {}
+        if cached is not None:
+            headers["if-none-match"] = f'"{_e_tag(cached)}"'
+        with get.core.context.begin() as client:
+            with client.get(
+                get.presigned_url(expires=30),
+                headers=headers,
+                raw=True,
+                stream=True,
+            ) as response:
+                if (
+                    cached is None
+                    or response.status_code != HTTPStatus.NOT_MODIFIED
+                ):
+                    return self._fill(name, get, response)
+        try:
+            return self._hit(name, cached)
+        except FileNotFoundError:
+            # removed by another process sharing the directory
+            self._forget(name)
+            return self.read(get)
+
+    def read_range(self, get: Get, byte_range: ByteRange) -> bytes:
+        """Returns the inclusive `byte_range` of the object `get` points
+        to, sliced from its cached file while the object is unchanged.
+        Otherwise only the range is downloaded, leaving the cache as
+        is, so ranged reads never fetch the whole object"""
+        name = _entry_name(
+            get.core.config.bucket_name, get.object_name, get.version
+        )
+        with self._lock:
+            cached = self._files.get(name)
+        if cached is not None:
+            content = get.download(
+                if_none_match=_e_tag(cached), byte_range=byte_range
+            )
+            if content is not None:
+                return content
+            try:
+                mapped = self._hit(name, cached)
+            except FileNotFoundError:
+                # removed by another process sharing the directory
+                self._forget(name)
+            else:
+                return mapped[range_slice(byte_range)].tobytes()
+        return get.download(byte_range=byte_range)
+
+    def _hit(self, name: str, cached: _CachedFile) -> memoryview:
+        with open(cached.path, "rb") as file:
+            content = _map(file)
+        with contextlib.suppress(OSError):
+            # keeps the read order for the next runs
+            os.utime(cached.path)
+        with self._lock:
+            self.hits += 1
+            if name in self._files:
+                self._files.move_to_end(name)
+        return content
+
+    def _fill(self, name: str, get: Get, response) -> memoryview:
+        if not response.ok:
+            if response.status_code == HTTPStatus.NOT_FOUND:
+                self._forget(name)
+                raise NotFound(get.object_name, SERVICE_NAME)
+            raise RequestFailed(response)
+        e_tag = response.headers.get("ETag", "").strip("\"'")
+        if not e_tag:
+            raise UnexpectedResponse("object without an ETag")
+        path = self.directory / f"{name}-{e_tag}"
+        fd, temp_path = tempfile.mkstemp(
+            prefix=_TEMP_PREFIX, dir=self.directory
+        )
+        try:
+            with os.fdopen(fd, "w+b") as file:
+                for chunk in response.iter_content(READ_BLOCK_SIZE):
+                    file.write(chunk)
+                file.flush()
+                size = file.tell()
+                # mapped before the rename, so an eviction
+                # right after it cannot remove the content
+                content = _map(file)
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+        with self._lock:
+            self.misses += 1
+            previous = self._files.pop(name, None)
+            if previous is not None:
+                self.size -= previous.size
+                if previous.path != path:
+                    self._remove(previous)
+            self._files[name] = _CachedFile(path, size)
+            self.size += size
+            self._evict()
+        return content
+
+    def _forget(self, name: str):
+        with self._lock:
+            cached = self._files.pop(name, None)
+            if cached is not None:
+                self.size -= cached.size
+                self._remove(cached)
+
+    def _evict(self):
+        # the newest file is kept even when larger than max_size
+        while self.size > self.max_size and len(self._files) > 1:
+            _, cached = self._files.popitem(last=False)
+            self.size -= cached.size
+            self._remove(cached)
+
+    def _remove(self, cached: _CachedFile):
+        # mapped files stay readable after being unlinked
+        with contextlib.suppress(OSError):
+            cached.path.unlink()
+
+    def clear(self):
+        with self._lock:
+            for cached in self._files.values():
+                self._remove(cached)
+            self._files.clear()
+            self.size = 0
@@ -0,0 +1,150 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from typing import Union
+
+from gyver.utils import lazyfield
+
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import RequestFailed
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.http import AuthHttpClient
+from simple_aws.services.s3.models import FileInfo
+
+from .core import S3Core
+from .get import Get
+from .multipart import DEFAULT_CONCURRENCY
+from .multipart import MIB
+from .multipart import run_parts
+from .multipart import validate_concurrency
+
+DEFAULT_RANGE_SIZE = 8 * MIB
+READ_BLOCK_SIZE = 256 * 1024
+
+DownloadTarget = Union[str, "os.PathLike[str]", bytearray, memoryview]
+
+
+class _FileWriter:
+    def __init__(self, path: Union[str, "os.PathLike[str]"], size: int):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.truncate(size)
+        self._lock = threading.Lock()
+
+    def write_at(self, offset: int, data: bytes):
+        if hasattr(os, "pwrite"):
+            os.pwrite(self.file.fileno(), data, offset)
+            return
+        with self._lock:
+            self.file.seek(offset)
+            self.file.write(data)
+
+    def close(self, failed: bool):
+        self.file.close()
+        if failed:
+            os.remove(self.path)
+
+
+class _BufferWriter:
+    def __init__(self, buffer: Union[bytearray, memoryview], size: int):
+        self.view = memoryview(buffer).cast("B")
+        if len(self.view) < size:
+            raise InvalidParam(
+                "target",
+                buffer,
+                f"Buffer of {len(self.view)} bytes cannot hold {size} bytes",
+            )
+
+    def write_at(self, offset: int, data: bytes):
+        self.view[offset : offset + len(data)] = data
+
+    def close(self, failed: bool):
+        del failed
+
+
+@dataclass(frozen=True)
+class RangedDownload:
+    """Downloads an object with concurrent ranged GETs, writing each
+    range at its offset of a preallocated file or buffer.
+
+    Ranges are streamed in small blocks, so memory stays around
+    `concurrency` blocks no matter the range or object size."""
+
+    core: S3Core
+    object_name: str
+    target: DownloadTarget
+    range_size: int = DEFAULT_RANGE_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
+    version: Optional[str] = None
+
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+        if self.range_size < 1:
+            raise InvalidParam(
+                "range_size", self.range_size, "Range size must be positive"
+            )
+
+    @lazyfield
+    def url(self):
+        url = self.core.get_uri_copy().add(path=self.object_name)
+        if self.version:
+            url.add({"versionId": self.version})
+        return url
+
+    def download(self) -> FileInfo:
+        with self.core.context.open():
+            info = Get(self.core, self.object_name, self.version).info()
+            writer = (
+                _BufferWriter(self.target, info.size)
+                if isinstance(self.target, (bytearray, memoryview))
+                else _FileWriter(self.target, info.size)
+            )
+            failed = True
+            try:
+                with self.core.context.begin() as client:
+                    run_parts(
+                        enumerate(self._ranges(info.size), 1),
+                        lambda _, span: self._fetch_range(
+                            client, info.e_tag, writer, *span
+                        ),
+                        self.concurrency,
+                    )
+                failed = False
+            finally:
+                writer.close(failed)
+        return info
+
+    def _ranges(self, size: int):
+        for start in range(0, size, self.range_size):
+            yield start, min(start + self.range_size, size) - 1
+
+    def _fetch_range(
+        self,
+        client: AuthHttpClient,
+        e_tag: str,
+        writer: Union[_FileWriter, _BufferWriter],
+        start: int,
+        end: int,
+    ):
+        response = client.get(
+            self.url,
+            headers={
+                "range": f"bytes={start}-{end}",
+                "if-match": f'"{e_tag}"',
+            },
+            stream=True,
+        )
+        with response:
+            if not response.ok:
+                raise RequestFailed(response)
+            offset = start
+            for block in response.raw.stream(
+                READ_BLOCK_SIZE, decode_content=False
+            ):
+                writer.write_at(offset, block)
+                offset += len(block)
+        if offset != end + 1:
+            raise UnexpectedResponse(
+                f"expected bytes {start}-{end} from S3, got {offset - start}"
+            )
@@ -1,23 +1,100 @@
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
+from typing import Iterator
+from typing import Mapping
 from typing import Optional
+from typing import overload
+from xml.etree import ElementTree as ET
 
 from gyver.url import URL
 
 from simple_aws.auth import AWS_ALGORITHM
+from simple_aws.auth import UNSIGNED_PAYLOAD
 from simple_aws.auth import amz_dateformat
 from simple_aws.exc import InvalidParam
 from simple_aws.exc import NotFound
 from simple_aws.exc import RequestFailed
+from simple_aws.exc import UnexpectedResponse
 from simple_aws.services.s3.models import FileInfo
 from simple_aws.typedef import METHODS
+from simple_aws.utils import xmlns
 
 from .core import S3Core
 
 DAY = 86400
 WEEK = 604800
+DEFAULT_STREAM_CHUNK_SIZE = 64 * 1024
+HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+QUOTES = "\"'"
+
+
+# inclusive (start, end) offsets, without an end it reads to the end
+ByteRange = tuple[int, Optional[int]]
+
+
+def range_slice(byte_range: ByteRange) -> slice:
+    start, end = byte_range
+    if start < 0 or (end is not None and end < start):
+        raise InvalidParam(
+            "byte_range",
+            byte_range,
+            "Range must start at 0 or after and end at its start or after",
+        )
+    return slice(start, None if end is None else end + 1)
+
+
+def range_header(byte_range: ByteRange) -> str:
+    span = range_slice(byte_range)
+    end = "" if span.stop is None else span.stop - 1
+    return f"bytes={span.start}-{end}"
+
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def check_range_response(
+    byte_range: ByteRange, status_code: int, content_range: Optional[str]
+):
+    """Raises UnexpectedResponse unless a response is the partial
+    content of `byte_range`, since a server ignoring the Range header
+    answers 200 with the whole object"""
+    span = range_slice(byte_range)
+    match = _CONTENT_RANGE.fullmatch(content_range or "")
+    if status_code != HTTPStatus.PARTIAL_CONTENT or match is None:
+        raise UnexpectedResponse(
+            f"expected {range_header(byte_range)} from S3, got status"
+            f" {status_code} with content range {content_range!r}"
+        )
+    start, end, size = map(int, match.groups())
+    last = size - 1 if span.stop is None else min(span.stop, size) - 1
+    if (start, end) != (span.start, last):
+        raise UnexpectedResponse(
+            f"expected {range_header(byte_range)} from S3,"
+            f" got {content_range!r}"
+        )
+
+
+def quote_e_tag(e_tag: str) -> str:
+    return e_tag if e_tag == "*" else f'"{e_tag.strip(QUOTES)}"'
+
+
+def http_date(moment: datetime) -> str:
+    # naive datetimes are UTC, like the ones parsed from S3 headers
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.strftime(HTTP_DATE_FORMAT)
+
+
+def validate_expires(expires: int):
+    if not 1 <= expires <= WEEK:
+        raise InvalidParam(
+            "expires",
+            expires,
+            f"Expires must be greater than 1 and lower than a {WEEK=}",
+        )
 
 
 @dataclass(frozen=True)
@@ -33,57 +110,162 @@ class Get:
     def new_url(self):
         return self.core.get_uri_copy().add(path=self.object_name)
 
-    def download(self):
-        url = self.presigned_url(expires=30)
+    def object_url(self) -> URL:
+        """Returns the url of the object `version`, if any"""
+        url = self.new_url()
+        if self.version:
+            url.add({"versionId": self.version})
+        return url
+
+    @overload
+    def download(
+        self,
+        *,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True,
+    ) -> bytes:
+        ...
+
+    @overload
+    def download(
+        self,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True,
+    ) -> Optional[bytes]:
+        ...
+
+    def download(
+        self,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True,
+    ) -> Optional[bytes]:
+        """Returns the object content, or only the inclusive
+        `byte_range` of it. Returns None when a condition makes S3
+        answer 304 Not Modified"""
+        url, headers, raw = self.download_request(
+            if_none_match, if_modified_since, byte_range, presigned
+        )
         with self.core.context.begin() as client:
-            response = client.get(url, raw=True)
+            response = client.get(url, headers=headers, raw=raw)
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                return None
             if not response.ok:
                 raise RequestFailed(response)
+            if byte_range is not None:
+                check_range_response(
+                    byte_range,
+                    response.status_code,
+                    response.headers.get("content-range"),
+                )
             return response.content
 
+    def download_request(
+        self,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True,
+    ) -> tuple[URL, dict[str, str], bool]:
+        """Returns the url and headers of a GetObject request and
+        whether it is presigned, which sends the headers unsigned"""
+        headers = {}
+        if if_none_match is not None:
+            headers["if-none-match"] = quote_e_tag(if_none_match)
+        if if_modified_since is not None:
+            headers["if-modified-since"] = http_date(if_modified_since)
+        if byte_range is not None:
+            headers["range"] = range_header(byte_range)
+        if presigned:
+            return self.presigned_url(expires=30), headers, True
+        return self.object_url(), headers, False
+
+    def stream(
+        self, chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Yields the object content in chunks of up to `chunk_size`
+        bytes while it is read from the socket. Closing the generator
+        before the end closes the connection instead of reading the
+        remaining body"""
+        url = self.presigned_url(expires=30)
+        with self.core.context.begin() as client:
+            with client.get(url, raw=True, stream=True) as response:
+                if not response.ok:
+                    raise RequestFailed(response)
+                yield from response.iter_content(chunk_size)
+
     def presigned_url(self, expires: int = DAY):
-        url = self._append_get_object_params("GET", expires)
-        if self.version:
-            url.add({"v": self.version})
-        return url
+        return self._append_get_object_params("GET", expires)
 
     def info(self):
+        return self.parse_info(self.head())
+
+    def head(self) -> Mapping[str, str]:
+        """Returns the object headers"""
+        return self._head({}).headers
+
+    def head_if_changed(self, e_tag: str) -> Optional[Mapping[str, str]]:
+        """Returns the object headers, or None if its ETag is still
+        `e_tag`, in which case S3 answers 304 without them"""
+        response = self._head({"if-none-match": quote_e_tag(e_tag)})
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return None
+        return response.headers
+
+    def tags(self) -> dict[str, str]:
+        """Returns the object tags, read with GetObjectTagging"""
         with self.core.context.begin() as client:
-            response = client.head(self.new_url())
+            response = client.get(self.object_url().add({"tagging": ""}))
             if not response.ok:
                 if response.status_code == HTTPStatus.NOT_FOUND:
                     raise NotFound(self.object_name, "s3")
                 raise RequestFailed(response)
-            # formatting last_modifies from this format:
-            # Fri, 27 Jan 2023 10:21:12 GMT
-            return FileInfo.parse_obj(
-                {
-                    "key": self.object_name,
-                    "last_modified": datetime.strptime(
-                        response.headers["Last-Modified"],
-                        "%a, %d %b %Y %H:%M:%S GMT",
-                    ),
-                    "size": response.headers["Content-Length"],
-                    "e_tag": response.headers["ETag"].strip("\"'"),
-                    "storage_class": response.headers.get(
-                        "x-amz-storage-class", "UNKNOWN"
-                    ),
-                }
+            root = ET.fromstring(response.content)
+        return {
+            tag.findtext(f"{{{xmlns}}}Key", ""): tag.findtext(
+                f"{{{xmlns}}}Value", ""
             )
+            for tag in root.iter(f"{{{xmlns}}}Tag")
+        }
+
+    def _head(self, headers: Mapping[str, str]):
+        with self.core.context.begin() as client:
+            response = client.head(self.object_url(), headers=headers)
+            if not response.ok:
+                if response.status_code == HTTPStatus.NOT_FOUND:
+                    raise NotFound(self.object_name, "s3")
+                raise RequestFailed(response)
+            return response
+
+    def parse_info(self, headers: Mapping[str, str]) -> FileInfo:
+        # formatting last_modifies from this format:
+        # Fri, 27 Jan 2023 10:21:12 GMT
+        return FileInfo.parse_obj(
+            {
+                "key": self.object_name,
+                "last_modified": datetime.strptime(
+                    headers["Last-Modified"], HTTP_DATE_FORMAT
+                ),
+                "size": headers["Content-Length"],
+                "e_tag": headers["ETag"].strip(QUOTES),
+                "storage_class": headers.get("x-amz-storage-class", "UNKNOWN"),
+            }
+        )
 
     def _append_get_object_params(
         self,
         method: METHODS,
         expires: int,
     ) -> URL:
-        if not 1 <= expires <= WEEK:
-            raise InvalidParam(
-                "expires",
-                expires,
-                f"Expires must be greater than 1 and lower than a {WEEK=}",
-            )
+        validate_expires(expires)
         timestamp = datetime.now(timezone.utc)
-        url = self.new_url().add(
+        # the version is part of the signed query
+        url = self.object_url().add(
             {
                 "X-Amz-Algorithm": AWS_ALGORITHM,
                 "X-Amz-Credential": self.aws_auth.make_credential(timestamp),
@@ -95,7 +277,7 @@ class Get:
         _, signature = self.aws_auth.make_signature(
             method,
             url,
-            "UNSIGNED-PAYLOAD",
+            UNSIGNED_PAYLOAD,
             timestamp,
             {"host": url.netloc.encode()},
         )
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+
+from simple_aws.exc import InvalidParam
+from simple_aws.services.s3.models import FileInfo
+
+from .get import Get
+
+DEFAULT_INFO_CACHE_SIZE = 1024
+DEFAULT_INFO_TTL = 60.0
+
+# (bucket, object_name), the infos of all its versions are dropped
+# together since changing one version may change the latest
+ObjectKey = tuple[str, str]
+InfoKey = tuple[str, str, Optional[str]]
+
+
+def _object_key(bucket: str, object_name: str) -> ObjectKey:
+    # leading slashes are dropped from the object path
+    return bucket, object_name.lstrip("/")
+
+
+class _Entry(NamedTuple):
+    info: FileInfo
+    expires_at: float
+
+
+class InfoCache:
+    """Bounded LRU cache of object infos.
+
+    Entries are served for `ttl` seconds, or the ttl given when they
+    were read, after which they are revalidated with a HEAD request
+    conditional on their ETag, which S3 answers with an empty 304
+    while the object is unchanged. Safe to share between threads."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_INFO_CACHE_SIZE,
+        ttl: float = DEFAULT_INFO_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise InvalidParam("maxsize", maxsize, "Maxsize must be positive")
+        _validate_ttl(ttl)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[InfoKey, _Entry] = OrderedDict()
+        self._versions: dict[ObjectKey, set[Optional[str]]] = {}
+        # bumped on every invalidation, so a request that started
+        # before one does not store what it read
+        self._generation = 0
+
+    def info(self, get: Get, ttl: Optional[float] = None) -> FileInfo:
+        """Returns the info of the object `get` points to, from the
+        cache while fresh. `ttl` overrides the cache ttl for the info
+        read by this call"""
+        if ttl is None:
+            ttl = self.ttl
+        _validate_ttl(ttl)
+        key = (
+            *_object_key(get.core.config.bucket_name, get.object_name),
+            get.version,
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.info
+            generation = self._generation
+        if entry is None:
+            info = get.info()
+            self._count_miss()
+        elif (headers := get.head_if_changed(entry.info.e_tag)) is None:
+            info = entry.info
+            with self._lock:
+                self.revalidations += 1
+        else:
+            info = get.parse_info(headers)
+            self._count_miss()
+        self._store(key, info, ttl, generation)
+        return info
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _store(
+        self, key: InfoKey, info: FileInfo, ttl: float, generation: int
+    ):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = _Entry(info, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            self._versions.setdefault(key[:2], set()).add(key[2])
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: InfoKey):
+        del self._entries[key]
+        versions = self._versions[key[:2]]
+        versions.discard(key[2])
+        if not versions:
+            del self._versions[key[:2]]
+
+    def invalidate(self, bucket: str, object_name: str):
+        self.invalidate_many(((bucket, object_name),))
+
+    def invalidate_many(self, keys: Iterable[ObjectKey]):
+        """Drops the entries of every version of the
+        `(bucket, object_name)` objects"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                object_key = _object_key(*key)
+                for version in self._versions.pop(object_key, ()):
+                    del self._entries[(*object_key, version)]
+
+    def invalidate_prefix(self, bucket: str, prefix: str):
+        with self._lock:
+            self._generation += 1
+            for key in [
+                key
+                for key in self._entries
+                if key[0] == bucket and key[1].startswith(prefix.lstrip("/"))
+            ]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._versions.clear()
+
+
+def _validate_ttl(ttl: float):
+    if ttl < 0:
+        raise InvalidParam("ttl", ttl, "TTL must not be negative")
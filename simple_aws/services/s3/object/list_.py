@@ -1,28 +1,208 @@
-import re
 from dataclasses import dataclass
+from typing import Callable
+from typing import Generic
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
 from typing import Optional
+from typing import TypeVar
+from typing import Union
 from xml.etree import ElementTree as ET
 
 from gyver.url import URL
+from gyver.utils import lazyfield
 
 from simple_aws.exc import InvalidParam
 from simple_aws.exc import RequestFailed
 from simple_aws.exc import UnexpectedResponse
+from simple_aws.services.s3.models import CommonPrefix
 from simple_aws.services.s3.models import FileInfo
+from simple_aws.services.s3.models import ObjectRecord
 from simple_aws.utils import xmlns
 
 from .core import S3Core
 
 MAX_CHUNKSIZE = 1000
+READ_SIZE = 64 * 1024
 
-xmlns_re = re.compile(f' xmlns="{re.escape(xmlns)}"'.encode())
+
+def _tags(name: str) -> tuple[str, str]:
+    return name, f"{{{xmlns}}}{name}"
+
+
+_CONTENTS_TAGS = _tags("Contents")
+_IS_TRUNCATED_TAGS = _tags("IsTruncated")
+_NEXT_TOKEN_TAGS = _tags("NextContinuationToken")
+_KEY_TAGS = _tags("Key")
+_COMMON_PREFIXES_TAGS = _tags("CommonPrefixes")
+_PREFIX_TAGS = _tags("Prefix")
+
+T = TypeVar("T")
+ListEntry = Union[FileInfo, ObjectRecord, str]
+
+
+def entry_key(entry: ListEntry) -> str:
+    return entry if isinstance(entry, str) else entry.key
+
+
+def _fields(element: ET.Element) -> dict[str, Optional[str]]:
+    return {child.tag.rpartition("}")[2]: child.text for child in element}
+
+
+def parse_file_info(element: ET.Element) -> FileInfo:
+    return FileInfo.parse_obj(_fields(element))
+
+
+def parse_record(element: ET.Element) -> ObjectRecord:
+    fields = _fields(element)
+    return ObjectRecord(
+        fields["Key"],
+        int(fields["Size"]),
+        fields["ETag"],
+        fields["LastModified"],
+        fields.get("StorageClass") or "UNKNOWN",
+    )
+
+
+def parse_key(element: ET.Element) -> str:
+    for child in element:
+        if child.tag in _KEY_TAGS:
+            return child.text or ""
+    raise UnexpectedResponse("listed object without a key")
+
+
+class ListPageParser(Generic[T]):
+    """Incremental parser for ListObjectsV2 pages.
+
+    `feed` returns the objects whose `Contents` closed in the data read
+    so far, built by `parse_contents` and cleared from the tree, so
+    entries are available while the rest of the page is still being
+    received. Common prefixes are returned as `CommonPrefix`. `close`
+    returns the continuation token read along the way."""
+
+    def __init__(
+        self,
+        parse_contents: Callable[[ET.Element], T] = parse_file_info,
+    ) -> None:
+        self._parse_contents = parse_contents
+        self._parser = ET.XMLPullParser(("end",))
+        self._is_truncated: Optional[str] = None
+        self._next_token: Optional[str] = None
+
+    def feed(self, data: bytes) -> Iterator[Union[T, CommonPrefix]]:
+        """Parses `data` and iterates over the objects it completed,
+        which must be consumed before feeding more data"""
+        self._parser.feed(data)
+        return self._read_items()
+
+    def close(self) -> Optional[str]:
+        """Returns the token for the next page,
+        or None if this is the last one"""
+        self._parser.close()
+        for _ in self._read_items():
+            pass
+        if self._is_truncated == "false":
+            return None
+        if self._next_token is not None:
+            return self._next_token
+        raise UnexpectedResponse("unexpected response from S3")
+
+    def _read_items(self) -> Iterator[Union[T, CommonPrefix]]:
+        parse_contents = self._parse_contents
+        for _, element in self._parser.read_events():
+            tag = element.tag
+            if tag in _CONTENTS_TAGS:
+                yield parse_contents(element)
+                element.clear()
+            elif tag in _COMMON_PREFIXES_TAGS:
+                for child in element:
+                    if child.tag in _PREFIX_TAGS:
+                        yield CommonPrefix(child.text or "")
+                element.clear()
+            elif tag in _IS_TRUNCATED_TAGS:
+                self._is_truncated = element.text
+            elif tag in _NEXT_TOKEN_TAGS:
+                self._next_token = element.text
+
+
+class ListCheckpoint(NamedTuple):
+    """Position of a listing: the continuation token of the page being
+    read (None for the first page), the last yielded object key and
+    the last yielded common prefix"""
+
+    continuation_token: Optional[str] = None
+    last_key: Optional[str] = None
+    last_prefix: Optional[str] = None
+
+
+class ListProgress:
+    """Mutable position of a running listing, see `List.checkpoint`"""
+
+    def __init__(self, resume_from: Optional[ListCheckpoint] = None):
+        self.reset(resume_from)
+
+    def reset(self, resume_from: Optional[ListCheckpoint] = None):
+        checkpoint = resume_from or ListCheckpoint()
+        self.continuation_token = checkpoint.continuation_token
+        self.last_key = checkpoint.last_key
+        self.last_prefix = checkpoint.last_prefix
+        # the refetched page may hold entries yielded before resuming
+        self.resuming = resume_from is not None
+        self.stopped = False
+
+    def next_page(self, continuation_token: str):
+        self.continuation_token = continuation_token
+        self.resuming = False
+
+    def was_yielded(self, entry: "ListEntry") -> bool:
+        """Whether `entry` was yielded before resuming. Pages list
+        their objects and their common prefixes each in key order, so
+        entries up to the last key of their kind were"""
+        if not self.resuming:
+            return False
+        last = (
+            self.last_prefix
+            if isinstance(entry, CommonPrefix)
+            else self.last_key
+        )
+        return last is not None and entry_key(entry) <= last
+
+    def advance(self, entry: "ListEntry"):
+        if isinstance(entry, CommonPrefix):
+            self.last_prefix = str(entry)
+        else:
+            self.last_key = entry_key(entry)
+
+    @property
+    def checkpoint(self) -> ListCheckpoint:
+        return ListCheckpoint(
+            self.continuation_token, self.last_key, self.last_prefix
+        )
 
 
 @dataclass(frozen=True)
 class List:
+    """Lists the bucket objects as `FileInfo`, or as `ObjectRecord`
+    with `compact`, or only their keys with `keys_only`.
+
+    Only keys after `start_after` and up to `stop_after` are listed.
+    With a `delimiter`, the keys sharing a prefix up to it are listed
+    once as a `CommonPrefix`.
+
+    `checkpoint` includes every entry yielded so far. A `List` with
+    the same parameters and `resume_from` set to it continues after
+    its last key instead of listing from the start again, so objects
+    written or deleted in between do not shift the listing."""
+
     core: S3Core
     prefix: Optional[str] = None
     chunksize: int = MAX_CHUNKSIZE
+    compact: bool = False
+    keys_only: bool = False
+    start_after: Optional[str] = None
+    stop_after: Optional[str] = None
+    delimiter: Optional[str] = None
+    resume_from: Optional[ListCheckpoint] = None
 
     def __post_init__(self):
         if not (1 <= self.chunksize <= MAX_CHUNKSIZE):
@@ -32,6 +212,31 @@ class List:
                 "Chunksize must be greater "
                 f"than 1 and lesser than {MAX_CHUNKSIZE}",
             )
+        if self.compact and self.keys_only:
+            raise InvalidParam(
+                "keys_only",
+                self.keys_only,
+                "Keys only listing cannot be compact",
+            )
+
+    @property
+    def parse_contents(self) -> Callable[[ET.Element], ListEntry]:
+        if self.keys_only:
+            return parse_key
+        if self.compact:
+            return parse_record
+        return parse_file_info
+
+    def new_parser(self) -> ListPageParser[ListEntry]:
+        return ListPageParser(self.parse_contents)
+
+    @lazyfield
+    def progress(self) -> ListProgress:
+        return ListProgress(self.resume_from)
+
+    @property
+    def checkpoint(self) -> ListCheckpoint:
+        return self.progress.checkpoint
 
     def new_url(self):
         return self.core.get_uri_copy().add(
@@ -49,48 +254,74 @@ class List:
     def __iter__(self):
         yield from self.iter()
 
-    def iter(self):
+    def iter(self) -> Iterator[ListEntry]:
         base_url = self.new_url()
-        continuation_token = None
+        progress = self.progress
+        progress.reset(self.resume_from)
         with self.context.begin() as client:
             while True:
-                url = self._prepare_url(base_url, continuation_token)
-                response = client.get(
-                    url,
-                )
-                if not response.ok:
-                    print(response.text)
-                    raise RequestFailed(response)
-                xml_content = ET.fromstring(
-                    xmlns_re.sub(b"", response.content)
-                )
-                for contents in xml_content.findall("Contents"):
-                    yield FileInfo.parse_obj(
-                        {items.tag: items.text for items in contents}
-                    )
-                if self._list_is_exhausted(xml_content):
+                url = self.page_url(base_url, progress.continuation_token)
+                with client.get(url, stream=True) as response:
+                    if not response.ok:
+                        raise RequestFailed(response)
+                    parser = self.new_parser()
+                    for data in response.iter_content(READ_SIZE):
+                        yield from self.accept(progress, parser.feed(data))
+                        if self.is_done(progress):
+                            return
+                    continuation_token = parser.close()
+                if progress.stopped or continuation_token is None:
                     break
-                if (
-                    t := xml_content.find("NextContinuationToken")
-                ) is not None:
-                    continuation_token = t.text
-                else:
-                    raise UnexpectedResponse("unexpected response from S3")
-
-    def _list_is_exhausted(self, xml_content: ET.Element):
+                progress.next_page(continuation_token)
+
+    def accept(
+        self, progress: ListProgress, entries: Iterable[ListEntry]
+    ) -> Iterator[ListEntry]:
+        """Yields the parsed `entries` that were not listed before
+        `progress` and are not past `stop_after`, advancing it"""
+        for entry in entries:
+            if self._is_past_stop(entry):
+                progress.stopped = True
+                continue
+            if progress.was_yielded(entry):
+                continue
+            progress.advance(entry)
+            yield entry
+
+    def is_done(self, progress: ListProgress) -> bool:
+        # pages list objects before common prefixes,
+        # so only those need the rest of the page
+        return progress.stopped and not self.delimiter
+
+    def _is_past_stop(self, entry: ListEntry) -> bool:
         return (
-            t := xml_content.find("IsTruncated")
-        ) is not None and t.text == "false"
+            self.stop_after is not None and entry_key(entry) > self.stop_after
+        )
+
+    def parse_page(
+        self, content: bytes
+    ) -> tuple[list[ListEntry], Optional[str]]:
+        """Returns the objects of a ListObjectsV2 page and the token
+        for the next page, or None if this is the last one"""
+        parser = self.new_parser()
+        items = list(parser.feed(content))
+        return items, parser.close()
 
-    def _prepare_url(
+    def page_url(
         self,
         base_url: URL,
         continuation_token: Optional[str],
-    ):
+    ) -> URL:
+        """Returns the url of the page `continuation_token` points to,
+        `base_url` being the one `new_url` returns"""
         url = base_url.copy()
         if self.prefix:
             prefix = self.prefix.removeprefix("/")
             url.add({"prefix": prefix})
+        if self.delimiter:
+            url.add({"delimiter": self.delimiter})
         if continuation_token:
             url.add({"continuation-token": continuation_token})
+        elif self.start_after:
+            url.add({"start-after": self.start_after})
         return url
@@ -0,0 +1,272 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import TypeVar
+from typing import Union
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from gyver.url import URL
+from gyver.utils import lazyfield
+
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import RequestFailed
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.http import AuthHttpClient
+from simple_aws.streaming import PayloadSource
+from simple_aws.streaming import iter_chunks
+from simple_aws.streaming import source_length
+from simple_aws.utils import xmlns
+
+from .core import S3Core
+from .upload import content_disposition
+from .upload import guess_mimetype
+
+MIB = 1024 * 1024
+MIN_PART_SIZE = 5 * MIB
+DEFAULT_PART_SIZE = 8 * MIB
+MAX_PARTS = 10_000
+# largest object a single PUT or POST form upload accepts
+MAX_SINGLE_UPLOAD_SIZE = 5 * 1024 * MIB
+DEFAULT_CONCURRENCY = 8
+
+UploadContent = Union[bytes, PayloadSource]
+PartT = TypeVar("PartT")
+ResultT = TypeVar("ResultT")
+
+
+def fit_part_size(part_size: int, content_length: Optional[int]) -> int:
+    """Grows `part_size` when needed to fit the object in MAX_PARTS parts"""
+    if part_size < MIN_PART_SIZE:
+        raise InvalidParam(
+            "part_size",
+            part_size,
+            f"Part size must be at least {MIN_PART_SIZE} bytes",
+        )
+    if content_length is None:
+        return part_size
+    return max(part_size, -(-content_length // MAX_PARTS))
+
+
+def validate_concurrency(concurrency: int):
+    if concurrency < 1:
+        raise InvalidParam(
+            "concurrency", concurrency, "Concurrency must be at least 1"
+        )
+
+
+def _raise_for_error_body(response, message: str):
+    # S3 may answer 200 and only report the failure in the body
+    if b"<Error>" in response.content[:512]:
+        raise UnexpectedResponse(f"{message}: {response.text}")
+
+
+def run_parts(
+    parts: Iterable[tuple[int, PartT]],
+    send: Callable[[int, PartT], ResultT],
+    concurrency: int,
+) -> list[tuple[int, ResultT]]:
+    """Runs `send` for each part on a pool of `concurrency` threads and
+    returns the part numbers with their results, usually ETags.
+
+    Parts are only pulled from `parts` when a worker is free, so about
+    `concurrency` parts are held in memory. Pending parts are cancelled
+    on the first failure, which is then raised."""
+    slots = threading.BoundedSemaphore(concurrency)
+    failed = threading.Event()
+    futures: list[tuple[int, Future]] = []
+
+    def release(future: Future):
+        if future.cancelled() or future.exception() is not None:
+            failed.set()
+        slots.release()
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        try:
+            for number, part in parts:
+                slots.acquire()
+                if failed.is_set():
+                    slots.release()
+                    break
+                future = executor.submit(send, number, part)
+                future.add_done_callback(release)
+                futures.append((number, future))
+        except BaseException:
+            for _, future in futures:
+                future.cancel()
+            raise
+        if failed.is_set():
+            for _, future in futures:
+                future.cancel()
+    for _, future in futures:
+        if not future.cancelled() and (error := future.exception()):
+            raise error
+    return [(number, future.result()) for number, future in futures]
+
+
+@dataclass(frozen=True)
+class Multipart:
+    """CreateMultipartUpload, Complete and Abort calls for an object"""
+
+    core: S3Core
+    object_name: str
+
+    def new_url(self):
+        return self.core.get_uri_copy().add(path=self.object_name)
+
+    def create(
+        self,
+        client: AuthHttpClient,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> str:
+        response = client.post(
+            self.new_url().add({"uploads": ""}), headers=headers
+        )
+        if not response.ok:
+            raise RequestFailed(response)
+        upload_id = ET.fromstring(response.content).find(
+            f"{{{xmlns}}}UploadId"
+        )
+        if upload_id is None or not upload_id.text:
+            raise UnexpectedResponse("unexpected response from S3")
+        return upload_id.text
+
+    def part_url(self, upload_id: str, part_number: int) -> URL:
+        return self.new_url().add(
+            {"partNumber": str(part_number), "uploadId": upload_id}
+        )
+
+    def complete(
+        self,
+        client: AuthHttpClient,
+        upload_id: str,
+        parts: Sequence[tuple[int, str]],
+    ):
+        response = client.post(
+            self.new_url().add({"uploadId": upload_id}),
+            data=self._build_complete_payload(parts),
+            headers={"content-type": "text/xml"},
+            idempotent=True,
+        )
+        if not response.ok:
+            raise RequestFailed(response)
+        _raise_for_error_body(response, "multipart upload failed")
+
+    def abort(self, client: AuthHttpClient, upload_id: str):
+        response = client.delete(self.new_url().add({"uploadId": upload_id}))
+        if not response.ok:
+            raise RequestFailed(response)
+
+    def abort_quietly(self, client: AuthHttpClient, upload_id: str):
+        """Aborts after a failure without masking the original error"""
+        with suppress(Exception):
+            self.abort(client, upload_id)
+
+    def _build_complete_payload(self, parts: Sequence[tuple[int, str]]):
+        return "".join(
+            (
+                f'<CompleteMultipartUpload xmlns="{xmlns}">',
+                *(
+                    f"<Part><PartNumber>{number}</PartNumber>"
+                    f"<ETag>{escape(etag)}</ETag></Part>"
+                    for number, etag in parts
+                ),
+                "</CompleteMultipartUpload>",
+            )
+        ).encode()
+
+
+@dataclass(frozen=True)
+class MultipartUpload:
+    """Uploads an object in parts sent concurrently, aborting the
+    upload if any part fails"""
+
+    core: S3Core
+    object_name: str
+    content: UploadContent
+    content_type: Optional[str] = None
+    part_size: int = DEFAULT_PART_SIZE
+    concurrency: int = DEFAULT_CONCURRENCY
+
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+
+    @lazyfield
+    def mimetype(self):
+        return guess_mimetype(self.object_name, self.content_type)
+
+    @lazyfield
+    def multipart(self):
+        return Multipart(self.core, self.object_name)
+
+    @lazyfield
+    def effective_part_size(self):
+        content_length = (
+            len(self.content)
+            if isinstance(self.content, bytes)
+            else source_length(self.content)
+        )
+        return fit_part_size(self.part_size, content_length)
+
+    def upload(self):
+        part_size = self.effective_part_size
+        with self.core.context.begin() as client:
+            upload_id = self.multipart.create(
+                client,
+                {
+                    "content-type": self.mimetype,
+                    "content-disposition": content_disposition(
+                        self.object_name
+                    ),
+                },
+            )
+            try:
+                parts = run_parts(
+                    enumerate(self._iter_parts(part_size), 1),
+                    partial(self._upload_part, client, upload_id),
+                    self.concurrency,
+                )
+                self.multipart.complete(client, upload_id, parts)
+            except BaseException:
+                self.multipart.abort_quietly(client, upload_id)
+                raise
+
+    def _iter_parts(self, part_size: int) -> Iterator[bytes]:
+        if isinstance(self.content, bytes):
+            view = memoryview(self.content)
+            parts = (
+                bytes(view[offset : offset + part_size])
+                for offset in range(0, len(view), part_size)
+            )
+        else:
+            parts = iter_chunks(self.content, part_size)
+        empty = True
+        for part in parts:
+            empty = False
+            yield part
+        if empty:
+            # an upload needs at least one part, even if empty
+            yield b""
+
+    def _upload_part(
+        self,
+        client: AuthHttpClient,
+        upload_id: str,
+        part_number: int,
+        part: bytes,
+    ) -> str:
+        response = client.put(
+            self.multipart.part_url(upload_id, part_number), data=part
+        )
+        if not response.ok:
+            raise RequestFailed(response)
+        return response.headers["ETag"]
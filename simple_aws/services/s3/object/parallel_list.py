@@ -0,0 +1,181 @@
+import heapq
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import replace
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Sequence
+
+from simple_aws.exc import InvalidParam
+from simple_aws.services.s3.models import CommonPrefix
+
+from .core import S3Core
+from .list_ import MAX_CHUNKSIZE
+from .list_ import List
+from .list_ import ListEntry
+from .list_ import entry_key
+from .multipart import DEFAULT_CONCURRENCY
+from .multipart import validate_concurrency
+
+DEFAULT_DELIMITER = "/"
+# pages buffered per shard ahead of the consumer
+SHARD_PREFETCH = 2
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class ParallelList:
+    """Lists a bucket by splitting it in shards listed concurrently.
+
+    Shards are the key ranges between the sorted `boundaries`, each
+    range listing the keys after one boundary and up to the next, or,
+    without boundaries, the common prefixes found one `delimiter`
+    level below `prefix`. Flat key spaces have no common prefixes, so
+    they need boundaries to be listed in parallel.
+
+    Entries are yielded as shards produce them or, with `ordered`,
+    in key order like `List`, which buffers at most `SHARD_PREFETCH`
+    pages of each running shard."""
+
+    core: S3Core
+    prefix: Optional[str] = None
+    boundaries: Optional[Sequence[str]] = None
+    delimiter: str = DEFAULT_DELIMITER
+    concurrency: int = DEFAULT_CONCURRENCY
+    ordered: bool = False
+    chunksize: int = MAX_CHUNKSIZE
+    compact: bool = False
+    keys_only: bool = False
+
+    def __post_init__(self):
+        validate_concurrency(self.concurrency)
+        if self.boundaries is not None and list(self.boundaries) != sorted(
+            set(self.boundaries)
+        ):
+            raise InvalidParam(
+                "boundaries",
+                self.boundaries,
+                "Boundaries must be sorted and unique",
+            )
+
+    def new_list(self, **changes) -> List:
+        return replace(
+            List(
+                self.core,
+                self.prefix,
+                self.chunksize,
+                self.compact,
+                self.keys_only,
+            ),
+            **changes,
+        )
+
+    def __iter__(self):
+        yield from self.iter()
+
+    def iter(self) -> Iterator[ListEntry]:
+        if self.boundaries is not None:
+            direct: list[ListEntry] = []
+            shards = self._range_shards(self.boundaries)
+        else:
+            direct, shards = self._discover()
+        if self.ordered:
+            yield from heapq.merge(
+                direct, self._iter_ordered(shards), key=entry_key
+            )
+        else:
+            yield from direct
+            yield from self._iter_unordered(shards)
+
+    def _range_shards(self, boundaries: Sequence[str]) -> list[List]:
+        bounds: list[Optional[str]] = [None, *boundaries, None]
+        return [
+            self.new_list(start_after=start, stop_after=stop)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+
+    def _discover(self) -> tuple[list[ListEntry], list[List]]:
+        """Lists one delimiter level, returning the objects found there
+        and a shard for each common prefix"""
+        direct: list[ListEntry] = []
+        shards: list[List] = []
+        for entry in self.new_list(delimiter=self.delimiter):
+            if isinstance(entry, CommonPrefix):
+                shards.append(self.new_list(prefix=entry))
+            else:
+                direct.append(entry)
+        return direct, shards
+
+    def _iter_unordered(self, shards: list[List]) -> Iterator[ListEntry]:
+        pages: queue.Queue = queue.Queue(self.concurrency * SHARD_PREFETCH)
+        with _ShardPool(self.concurrency) as pool:
+            for shard in shards:
+                pool.submit(shard, pages)
+            for _ in shards:
+                yield from _drain(pages)
+
+    def _iter_ordered(self, shards: list[List]) -> Iterator[ListEntry]:
+        # shards are disjoint ranges submitted in key order, so the one
+        # being drained is always running or done and no merge is needed
+        with _ShardPool(self.concurrency) as pool:
+            queues = []
+            for shard in shards:
+                pages: queue.Queue = queue.Queue(SHARD_PREFETCH)
+                pool.submit(shard, pages)
+                queues.append(pages)
+            yield from itertools.chain.from_iterable(map(_drain, queues))
+
+
+def _drain(pages: queue.Queue) -> Iterator[ListEntry]:
+    """Yields the entries of one shard from `pages`"""
+    while (page := pages.get()) is not _DONE:
+        if isinstance(page, BaseException):
+            raise page
+        yield from page
+
+
+class _ShardPool:
+    def __init__(self, concurrency: int) -> None:
+        self._executor = ThreadPoolExecutor(concurrency)
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self._stop.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, shard: List, pages: queue.Queue):
+        self._executor.submit(self._run, shard, pages)
+
+    def _put(self, pages: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _run(self, shard: List, pages: queue.Queue):
+        try:
+            for page in _batched(shard, shard.chunksize):
+                if not self._put(pages, page):
+                    return
+            self._put(pages, _DONE)
+        except BaseException as e:
+            self._put(pages, e)
+
+
+def _batched(
+    entries: Iterable[ListEntry], size: int
+) -> Iterator[list[ListEntry]]:
+    iterator = iter(entries)
+    while page := list(itertools.islice(iterator, size)):
+        yield page
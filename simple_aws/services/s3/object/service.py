@@ -1,8 +1,14 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import datetime
 from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
+from typing import Sequence
 from typing import TypeVar
+from typing import overload
 
 from gyver.utils import lazyfield
 from typing_extensions import Concatenate
@@ -10,21 +16,56 @@ from typing_extensions import ParamSpec
 
 from simple_aws.config import make_default_factory
 from simple_aws.credentials import Credentials
+from simple_aws.instrumentation import RequestHook
 from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.object.copy import DEFAULT_COPY_PART_SIZE
+from simple_aws.services.s3.object.copy import DEFAULT_MULTIPART_COPY_THRESHOLD
 from simple_aws.services.s3.object.copy import Copy
+from simple_aws.services.s3.object.copy import CopyMany
+from simple_aws.services.s3.object.copy import CopyPair
 from simple_aws.services.s3.object.copy import CopyParams
+from simple_aws.services.s3.object.copy import CopyResult
+from simple_aws.streaming import DEFAULT_CHUNK_SIZE
+from simple_aws.streaming import PayloadSource
+from simple_aws.transport import RequestsTransport
+from simple_aws.transport import TransportFactory
 
 from .core import S3Core
 from .delete import DeleteMany
+from .delete import DeletePrefix
+from .delete import DeleteProgress
+from .delete import DeleteResult
+from .delete import DeleteTarget
 from .delete import ObjectTuple
+from .delete import object_tuple
+from .disk_cache import DiskCache
+from .download import DEFAULT_RANGE_SIZE
+from .download import DownloadTarget
+from .download import RangedDownload
 from .get import DAY
+from .get import DEFAULT_STREAM_CHUNK_SIZE
+from .get import ByteRange
 from .get import Get
+from .info_cache import InfoCache
+from .info_cache import ObjectKey
 from .list_ import MAX_CHUNKSIZE
 from .list_ import List
+from .list_ import ListCheckpoint
+from .multipart import DEFAULT_CONCURRENCY
+from .multipart import DEFAULT_PART_SIZE
+from .multipart import MAX_SINGLE_UPLOAD_SIZE
+from .multipart import MultipartUpload
+from .multipart import UploadContent
+from .parallel_list import DEFAULT_DELIMITER
+from .parallel_list import ParallelList
+from .presign import PresignCache
+from .presign import Presigner
+from .upload import StreamUpload
 from .upload import Upload
 
 P = ParamSpec("P")
 T = TypeVar("T")
+R = TypeVar("R")
 
 
 @dataclass(frozen=True)
@@ -33,10 +74,59 @@ class S3Object:
     config: S3ObjectConfig = field(
         default_factory=make_default_factory(S3ObjectConfig)
     )
+    presign_cache: Optional[PresignCache] = None
+    info_cache: Optional[InfoCache] = None
+    disk_cache: Optional[DiskCache] = None
+    hooks: Sequence[RequestHook] = ()
+    transport: TransportFactory = RequestsTransport
 
     @lazyfield
     def core(self):
-        return S3Core(self.credentials, self.config)
+        return S3Core(
+            self.credentials, self.config, tuple(self.hooks), self.transport
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Closes the pooled connections, they are reopened on demand"""
+        self.core.close()
+
+    @contextmanager
+    def _changing(self, *keys: ObjectKey):
+        """Invalidates the cached infos of `keys` after changing them,
+        even if the change fails midway"""
+        try:
+            yield
+        finally:
+            if self.info_cache is not None:
+                self.info_cache.invalidate_many(keys)
+
+    def _changing_each(
+        self,
+        change: Callable[[Iterable[T]], R],
+        items: Iterable[T],
+        keys: Callable[[T], Iterable[ObjectKey]],
+    ) -> R:
+        """Calls `change` with `items`, invalidating the cached infos
+        of the `keys` of each item it consumed"""
+        if self.info_cache is None:
+            return change(items)
+        changed: list[ObjectKey] = []
+
+        def track() -> Iterator[T]:
+            for item in items:
+                changed.extend(keys(item))
+                yield item
+
+        try:
+            return change(track())
+        finally:
+            self.info_cache.invalidate_many(changed)
 
     def build(
         self,
@@ -51,23 +141,211 @@ class S3Object:
         object_name: str,
         content: bytes,
         *,
-        content_type: Optional[str] = None
+        content_type: Optional[str] = None,
+        multipart_threshold: int = MAX_SINGLE_UPLOAD_SIZE
     ) -> None:
-        return self.build(Upload, object_name, content, content_type).upload()
+        """Uploads `content` with a single POST form request or,
+        when larger than `multipart_threshold`, with a multipart upload"""
+        if len(content) > multipart_threshold:
+            return self.upload_multipart(
+                object_name, content, content_type=content_type
+            )
+        with self._changing((self.config.bucket_name, object_name)):
+            self.build(Upload, object_name, content, content_type).upload()
+
+    def upload_multipart(
+        self,
+        object_name: str,
+        content: UploadContent,
+        *,
+        content_type: Optional[str] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> None:
+        """Uploads `content` (bytes, a binary file object or an iterable
+        of bytes) in `part_size` parts, sending up to `concurrency`
+        parts at the same time"""
+        with self._changing((self.config.bucket_name, object_name)):
+            self.build(
+                MultipartUpload,
+                object_name,
+                content,
+                content_type,
+                part_size,
+                concurrency,
+            ).upload()
+
+    def upload_stream(
+        self,
+        object_name: str,
+        body: PayloadSource,
+        *,
+        content_length: Optional[int] = None,
+        content_type: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """Uploads `body` (a binary file object or an iterable of bytes)
+        without loading it in memory. `content_length` is required
+        unless `body` is a seekable file object"""
+        with self._changing((self.config.bucket_name, object_name)):
+            self.build(
+                StreamUpload,
+                object_name,
+                body,
+                content_length,
+                content_type,
+                chunk_size,
+            ).upload()
 
     def list_objects(
         self,
         prefix: Optional[str] = None,
         chunksize: int = MAX_CHUNKSIZE,
+        *,
+        compact: bool = False,
+        keys_only: bool = False,
+        delimiter: Optional[str] = None,
+        start_after: Optional[str] = None,
+        resume_from: Optional[ListCheckpoint] = None
+    ):
+        """Lists the objects after `start_after`, grouping the keys
+        under `delimiter` as `CommonPrefix` entries. The returned `List`
+        exposes a `checkpoint` to resume the listing with `resume_from`"""
+        return self.build(
+            List,
+            prefix,
+            chunksize,
+            compact,
+            keys_only,
+            start_after,
+            delimiter=delimiter,
+            resume_from=resume_from,
+        )
+
+    def list_objects_parallel(
+        self,
+        prefix: Optional[str] = None,
+        *,
+        boundaries: Optional[Sequence[str]] = None,
+        delimiter: str = DEFAULT_DELIMITER,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        ordered: bool = False,
+        chunksize: int = MAX_CHUNKSIZE,
+        compact: bool = False,
+        keys_only: bool = False
     ):
-        return self.build(List, prefix, chunksize)
+        """Lists up to `concurrency` shards of the bucket at the same
+        time, split at the `boundaries` keys or by the common prefixes
+        one `delimiter` level below `prefix`"""
+        return self.build(
+            ParallelList,
+            prefix,
+            boundaries,
+            delimiter,
+            concurrency,
+            ordered,
+            chunksize,
+            compact,
+            keys_only,
+        )
 
+    @overload
     def download(
         self,
         object_name: str,
         version: Optional[str] = None,
+        *,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
     ) -> bytes:
-        return self._make_get_object(object_name, version).download()
+        ...
+
+    @overload
+    def download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
+    ) -> Optional[bytes]:
+        ...
+
+    def download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        *,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[datetime] = None,
+        byte_range: Optional[ByteRange] = None,
+        presigned: bool = True
+    ) -> Optional[bytes]:
+        """Downloads the object content, or only the inclusive
+        `byte_range` of it, through `disk_cache` when it is set.
+
+        With `if_none_match` (an ETag) or `if_modified_since`, returns
+        None instead when the object did not change, which bypasses
+        the disk cache. `presigned=False` signs the request headers
+        instead of the url"""
+        if if_none_match is None and if_modified_since is None:
+            if self.disk_cache is not None:
+                get = self._make_get_object(object_name, version)
+                if byte_range is not None:
+                    return self.disk_cache.read_range(get, byte_range)
+                return self.disk_cache.read(get).tobytes()
+        return self._make_get_object(object_name, version).download(
+            if_none_match=if_none_match,
+            if_modified_since=if_modified_since,
+            byte_range=byte_range,
+            presigned=presigned,
+        )
+
+    def download_mapped(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+    ) -> memoryview:
+        """Returns the object content memory mapped from its file in
+        `disk_cache`, which is only downloaded again when the object
+        changed. Without a disk cache it is downloaded in memory"""
+        get = self._make_get_object(object_name, version)
+        if self.disk_cache is None:
+            return memoryview(get.download())
+        return self.disk_cache.read(get)
+
+    def iter_download(
+        self,
+        object_name: str,
+        version: Optional[str] = None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Yields the object content in chunks, keeping memory constant
+        regardless of the object size"""
+        return self._make_get_object(object_name, version).stream(chunk_size)
+
+    def download_to(
+        self,
+        object_name: str,
+        target: DownloadTarget,
+        *,
+        version: Optional[str] = None,
+        range_size: int = DEFAULT_RANGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ):
+        """Downloads an object into `target`, a file path or a writable
+        buffer large enough for it, fetching up to `concurrency` byte
+        ranges at the same time. Returns the object info"""
+        return self.build(
+            RangedDownload,
+            object_name,
+            target,
+            range_size,
+            concurrency,
+            version,
+        ).download()
 
     def create_presigned_get(
         self,
@@ -79,20 +357,89 @@ class S3Object:
             expires
         )
 
+    def create_presigned_get_many(
+        self, object_names: Iterable[str], expires: int = DAY
+    ) -> list[str]:
+        """Presigns GET URLs for `object_names` with a single timestamp
+        and signing key, returning the encoded URLs in the same order.
+        URLs are reused from `presign_cache` when it is set"""
+        return self.build(Presigner, expires).sign_many(
+            object_names, self.presign_cache
+        )
+
     def object_info(
         self,
         object_name: str,
         version: Optional[str] = None,
+        *,
+        ttl: Optional[float] = None
     ):
-        return self._make_get_object(object_name, version).info()
+        """Returns the object info, served from `info_cache` when it
+        is set. `ttl` overrides the cache ttl for this object"""
+        get = self._make_get_object(object_name, version)
+        if self.info_cache is not None:
+            return self.info_cache.info(get, ttl)
+        return get.info()
 
-    def delete(self, object_name: str, version: Optional[str] = None):
-        return self.build(
-            DeleteMany, (ObjectTuple(object_name, version),)
-        ).delete()
+    def delete(
+        self, object_name: str, version: Optional[str] = None
+    ) -> DeleteResult:
+        with self._changing((self.config.bucket_name, object_name)):
+            return self.build(
+                DeleteMany, (ObjectTuple(object_name, version),)
+            ).delete()
+
+    def delete_many(
+        self,
+        *objects: DeleteTarget,
+        quiet: bool = False,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> DeleteResult:
+        """Deletes the objects, each a key or a (key, version) pair,
+        see `delete_iter`"""
+        return self.delete_iter(objects, quiet=quiet, concurrency=concurrency)
+
+    def delete_iter(
+        self,
+        objects: Iterable[DeleteTarget],
+        *,
+        quiet: bool = False,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> DeleteResult:
+        """Deletes an iterable of objects of any size, each a key or a
+        (key, version) pair, in batches of 1000 keys sent up to
+        `concurrency` at the same time. With `quiet`, S3 only reports
+        the failures"""
+        return self._changing_each(
+            lambda targets: self.build(
+                DeleteMany, targets, quiet, concurrency
+            ).delete(),
+            objects,
+            self._delete_target_keys,
+        )
 
-    def delete_many(self, *objects: ObjectTuple):
-        return self.build(DeleteMany, objects).delete()
+    def _delete_target_keys(self, target: DeleteTarget) -> list[ObjectKey]:
+        return [(self.config.bucket_name, object_tuple(target).object_name)]
+
+    def delete_prefix(
+        self,
+        prefix: str,
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_progress: Optional[Callable[[DeleteProgress], None]] = None
+    ) -> DeleteResult:
+        """Deletes every object under `prefix`, overlapping listing with
+        deletion. `on_progress` receives the listed, deleted and failed
+        counters after each batch. Only failures are returned"""
+        try:
+            return self.build(
+                DeletePrefix, prefix, concurrency, DeleteProgress(on_progress)
+            ).delete()
+        finally:
+            if self.info_cache is not None:
+                self.info_cache.invalidate_prefix(
+                    self.config.bucket_name, prefix
+                )
 
     def _make_get_object(
         self, object_name: str, version: Optional[str] = None
@@ -100,9 +447,22 @@ class S3Object:
         return self.build(Get, object_name, version)
 
     def copy(
-        self, source: CopyParams, target: CopyParams, prevalidate: bool = True
+        self,
+        source: CopyParams,
+        target: CopyParams,
+        prevalidate: bool = True,
+        *,
+        multipart_threshold: int = DEFAULT_MULTIPART_COPY_THRESHOLD,
+        part_size: int = DEFAULT_COPY_PART_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY
     ):
-        return self.build(Copy, prevalidate).copy(source, target)
+        """Copies `source` to `target`. When `prevalidate` finds a source
+        larger than `multipart_threshold`, it is copied server side in
+        `part_size` ranges, up to `concurrency` at the same time"""
+        with self._changing((target.bucket, target.object_name)):
+            return self.build(
+                Copy, prevalidate, multipart_threshold, part_size, concurrency
+            ).copy(source, target)
 
     def copy_from(
         self,
@@ -110,7 +470,9 @@ class S3Object:
         target_name: Optional[str] = None,
         prevalidate: bool = True,
     ):
-        return self.build(Copy, prevalidate).copy_from(source, target_name)
+        target = target_name or source.object_name
+        with self._changing((self.config.bucket_name, target)):
+            return self.build(Copy, prevalidate).copy_from(source, target)
 
     def copy_to(
         self,
@@ -118,7 +480,41 @@ class S3Object:
         source_name: Optional[str] = None,
         prevalidate: bool = True,
     ):
-        return self.build(Copy, prevalidate).copy_to(target, source_name)
+        with self._changing((target.bucket, target.object_name)):
+            return self.build(Copy, prevalidate).copy_to(target, source_name)
+
+    def copy_many(
+        self,
+        pairs: Iterable[CopyPair],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> CopyResult:
+        """Copies each `(source, target)` pair with a single request,
+        up to `concurrency` at the same time. Returns the pairs copied
+        and the ones that failed"""
+        return self._changing_each(
+            lambda items: self.build(CopyMany, items, concurrency).copy(),
+            pairs,
+            _copy_target_keys,
+        )
+
+    def move_many(
+        self,
+        pairs: Iterable[CopyPair],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> CopyResult:
+        """Copies each `(source, target)` pair like `copy_many` and then
+        deletes in batches the sources of the pairs copied. Returns the
+        pairs copied, the ones that failed and the sources that could
+        not be deleted"""
+        return self._changing_each(
+            lambda items: self.build(
+                CopyMany, items, concurrency, move=True
+            ).copy(),
+            pairs,
+            _move_keys,
+        )
 
     def move(
         self, object_name: str, destination: str, prevalidate: bool = True
@@ -139,3 +535,16 @@ class S3Object:
             object_name,
             prevalidate,
         )
+
+
+def _copy_target_keys(pair: CopyPair) -> list[ObjectKey]:
+    _, target = pair
+    return [(target.bucket, target.object_name)]
+
+
+def _move_keys(pair: CopyPair) -> list[ObjectKey]:
+    source, target = pair
+    return [
+        (source.bucket, source.object_name),
+        (target.bucket, target.object_name),
+    ]
@@ -1,5 +1,6 @@
 import base64
 import mimetypes
+import posixpath
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timedelta
@@ -15,10 +16,35 @@ from simple_aws.auth import AWS_ALGORITHM
 from simple_aws.auth import amz_dateformat
 from simple_aws.exc import RequestFailed
 from simple_aws.services.s3.models import UploadParams
+from simple_aws.streaming import DEFAULT_CHUNK_SIZE
+from simple_aws.streaming import PayloadSource
 
 from .core import S3Core
 
 DEFAULT_MIMETYPE = "application/octet-stream"
+# the types mimetypes knows before reading the system databases,
+# which its first guess does at the cost of several milliseconds
+_BUILTIN_TYPES = mimetypes.types_map.copy()
+
+
+def guess_mimetype(object_name: str, content_type: Optional[str] = None):
+    if content_type:
+        return content_type
+    object_name = object_name.strip("/")
+    extension = posixpath.splitext(object_name)[1]
+    if not extension:
+        return DEFAULT_MIMETYPE
+    return (
+        _BUILTIN_TYPES.get(extension)
+        or _BUILTIN_TYPES.get(extension.lower())
+        or mimetypes.guess_type(object_name)[0]
+        or DEFAULT_MIMETYPE
+    )
+
+
+def content_disposition(object_name: str):
+    filename = object_name.strip("/").rsplit("/", 1)[-1]
+    return f'attachment; filename="{filename}"'
 
 
 @dataclass(frozen=True)
@@ -30,11 +56,7 @@ class Upload:
 
     @lazyfield
     def mimetype(self):
-        return (
-            self.content_type
-            or mimetypes.guess_type(self.object_name.strip("/"))[0]
-            or DEFAULT_MIMETYPE
-        )
+        return guess_mimetype(self.object_name, self.content_type)
 
     @lazyfield
     def content_size(self):
@@ -49,22 +71,25 @@ class Upload:
         return self.core.aws_auth
 
     def upload(self):
-        parts = self.fileparts()
-        fields = self._put_object_fields(
-            parts[0] if len(parts) > 1 else "",
-            parts[-1],
-            expires=datetime.now(timezone.utc) + timedelta(minutes=30),
-        )
         with self.core.context.begin() as client:
             response = client.post(
                 self.core.base_uri,
-                fields,
+                self.form_fields(),
                 files={"file": self.content},
                 raw=True,
+                idempotent=True,
             )
             if response.status_code != HTTPStatus.NO_CONTENT:
                 raise RequestFailed(response)
 
+    def form_fields(self) -> UploadParams:
+        parts = self.fileparts()
+        return self._put_object_fields(
+            parts[0] if len(parts) > 1 else "",
+            parts[-1],
+            expires=datetime.now(timezone.utc) + timedelta(minutes=30),
+        )
+
     def fileparts(self):
         object_name = self.object_name.strip("/")
         return object_name.rsplit("/", 1)
@@ -87,7 +112,7 @@ class Upload:
         if content_disp:
             policy_conditions.append(
                 content_disposition_fields := {
-                    "Content-Disposition": f'attachment; filename="{filename}"'
+                    "Content-Disposition": content_disposition(filename)
                 }
             )
         timestamp = datetime.now(timezone.utc)
@@ -126,3 +151,39 @@ class Upload:
                 policy, timestamp
             ),
         }
+
+
+@dataclass(frozen=True)
+class StreamUpload:
+    """Uploads a file object or an iterable of bytes with a single
+    PUT using aws-chunked streaming signatures, so the body never
+    needs to be fully in memory"""
+
+    core: S3Core
+    object_name: str
+    body: PayloadSource
+    content_length: Optional[int] = None
+    content_type: Optional[str] = None
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+    @lazyfield
+    def mimetype(self):
+        return guess_mimetype(self.object_name, self.content_type)
+
+    def upload(self):
+        url = self.core.get_uri_copy().add(path=self.object_name)
+        with self.core.context.begin() as client:
+            response = client.put_stream(
+                url,
+                self.body,
+                self.content_length,
+                headers={
+                    "content-disposition": content_disposition(
+                        self.object_name
+                    )
+                },
+                content_type=self.mimetype,
+                chunk_size=self.chunk_size,
+            )
+            if not response.ok:
+                raise RequestFailed(response)
@@ -0,0 +1,149 @@
+import io
+import os
+import queue
+import threading
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Union
+
+from simple_aws.auth import ChunkSigner
+from simple_aws.auth import chunked_length
+from simple_aws.exc import InvalidParam
+
+# S3 requires every chunk but the last to be at least 8KB
+MIN_CHUNK_SIZE = 8 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_PREFETCH = 4
+
+PayloadSource = Union[BinaryIO, Iterable[bytes]]
+
+_CRLF = b"\r\n"
+_END = object()
+
+
+def source_length(source: PayloadSource) -> Optional[int]:
+    """Returns the remaining bytes of a seekable file object
+    or None if it cannot be known without reading it"""
+    try:
+        size = os.fstat(source.fileno()).st_size  # type: ignore
+        return size - source.tell()  # type: ignore
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        current = source.tell()  # type: ignore
+        end = source.seek(0, io.SEEK_END)  # type: ignore
+        source.seek(current)  # type: ignore
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return end - current
+
+
+def iter_chunks(source: PayloadSource, chunk_size: int) -> Iterator[bytes]:
+    """Yields `chunk_size` blocks from a file object or an iterable of
+    bytes, only the last one may be smaller"""
+    if hasattr(source, "read"):
+        read = source.read  # type: ignore
+        while chunk := read(chunk_size):
+            while len(chunk) < chunk_size and (
+                rest := read(chunk_size - len(chunk))
+            ):
+                chunk += rest
+            yield chunk
+        return
+    buffer = bytearray()
+    for item in source:  # type: ignore
+        buffer += item
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class ChunkedPayload:
+    """aws-chunked request body read from `source` with bounded memory.
+
+    Reading and hashing happens on a background thread up to `prefetch`
+    chunks ahead of the sender, so it overlaps with network I/O.
+    Iterating yields the encoded frames, and `len` is the size of the
+    encoded body, which lets `requests` send it with a Content-Length
+    instead of Transfer-Encoding."""
+
+    def __init__(
+        self,
+        source: PayloadSource,
+        decoded_length: int,
+        signer: ChunkSigner,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> None:
+        if chunk_size < MIN_CHUNK_SIZE:
+            raise InvalidParam(
+                "chunk_size",
+                chunk_size,
+                f"Chunk size must be at least {MIN_CHUNK_SIZE} bytes",
+            )
+        self.source = source
+        self.decoded_length = decoded_length
+        self.signer = signer
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self._consumed = False
+
+    def __len__(self) -> int:
+        return chunked_length(self.decoded_length, self.chunk_size)
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._consumed:
+            raise InvalidParam(
+                "source", self.source, "Chunked payloads can be sent once"
+            )
+        self._consumed = True
+        frames: queue.Queue = queue.Queue(self.prefetch)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(frames, stop), daemon=True
+        )
+        producer.start()
+        try:
+            while (frame := frames.get()) is not _END:
+                if isinstance(frame, BaseException):
+                    raise frame
+                header, chunk = frame
+                yield header
+                yield chunk
+                yield _CRLF
+        finally:
+            stop.set()
+            producer.join()
+
+    def _produce(self, frames: queue.Queue, stop: threading.Event):
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        try:
+            size = 0
+            for chunk in iter_chunks(self.source, self.chunk_size):
+                size += len(chunk)
+                if size > self.decoded_length:
+                    break
+                if not put((self.signer.frame_header(chunk), chunk)):
+                    return
+            if size != self.decoded_length:
+                raise InvalidParam(
+                    "content_length",
+                    self.decoded_length,
+                    "Payload size does not match the declared length",
+                )
+            put((self.signer.frame_header(b""), b""))
+            put(_END)
+        except BaseException as e:
+            put(e)
@@ -0,0 +1,217 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Protocol
+from typing import Union
+from urllib.parse import urlencode
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.certs import where
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3 import HTTPConnectionPool
+from urllib3 import HTTPSConnectionPool
+
+from simple_aws.config import DEFAULT_POOL_SIZE
+from simple_aws.typedef import METHODS
+
+Body = Union[bytes, Mapping[str, Any], Iterable[bytes], None]
+
+# connections opened by each thread, to tell whether a request reused one
+_connections = threading.local()
+
+
+def opened_connections() -> int:
+    """Connections opened so far by the current thread through
+    transports counting them"""
+    return getattr(_connections, "opened", 0)
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _connections.opened = opened_connections() + 1
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _connections.opened = opened_connections() + 1
+        return super()._new_conn()
+
+
+_COUNTING_POOLS = {
+    "http": _CountingHTTPConnectionPool,
+    "https": _CountingHTTPSConnectionPool,
+}
+
+
+class TransportOptions(NamedTuple):
+    pool_size: int = DEFAULT_POOL_SIZE
+    keep_alive: bool = True
+    verify_ssl: bool = True
+    # for `opened_connections`, only needed by request hooks
+    count_connections: bool = False
+
+
+class Transport(Protocol):
+    """Sends signed requests. Responses are `requests.Response`
+    objects whatever sends them, which is all callers rely on"""
+
+    def request(
+        self,
+        method: METHODS,
+        url: str,
+        headers: Mapping[str, str],
+        data: Body = None,
+        files: Optional[Mapping[str, bytes]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+TransportFactory = Callable[[TransportOptions], Transport]
+
+
+class RequestsTransport:
+    """Sends requests with a `requests.Session`, the default"""
+
+    def __init__(self, options: TransportOptions = TransportOptions()):
+        session = requests.Session()
+        session.verify = options.verify_ssl
+        adapter = HTTPAdapter(pool_maxsize=options.pool_size)
+        if options.count_connections:
+            adapter.poolmanager.pool_classes_by_scheme = _COUNTING_POOLS
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not options.keep_alive:
+            session.headers["Connection"] = "close"
+        self.session = session
+
+    def request(
+        self,
+        method: METHODS,
+        url: str,
+        headers: Mapping[str, str],
+        data: Body = None,
+        files: Optional[Mapping[str, bytes]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        return self.session.request(
+            method,
+            url,
+            data=data,
+            headers=headers,
+            files=files,
+            stream=stream,
+            allow_redirects=method != "HEAD",
+        )
+
+    def close(self):
+        self.session.close()
+
+
+def build_response(
+    url: str, raw: urllib3.HTTPResponse, elapsed: float = 0.0
+) -> requests.Response:
+    """Wraps a urllib3 response the way `requests` adapters do"""
+    response = requests.Response()
+    response.status_code = raw.status
+    response.headers = CaseInsensitiveDict(raw.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.reason = raw.reason
+    response.raw = raw
+    response.url = url
+    response.elapsed = timedelta(seconds=elapsed)
+    return response
+
+
+def encode_body(
+    headers: dict[str, str],
+    data: Body,
+    files: Optional[Mapping[str, bytes]],
+) -> Union[bytes, str, Iterable[bytes], None]:
+    """Encodes form data and files like `requests` does, setting the
+    content type in `headers`"""
+    if files:
+        fields: list[tuple[str, Any]] = list(
+            data.items() if isinstance(data, Mapping) else ()
+        )
+        fields.extend(
+            (name, (name, content)) for name, content in files.items()
+        )
+        body, headers["content-type"] = urllib3.encode_multipart_formdata(
+            fields
+        )
+        return body
+    if isinstance(data, Mapping):
+        headers.setdefault("content-type", "application/x-www-form-urlencoded")
+        return urlencode(data)
+    return data or None
+
+
+class Urllib3Transport:
+    """Sends requests with a bare `urllib3.PoolManager`, skipping the
+    request preparation, cookies and hooks `requests` goes through for
+    each call. Its errors are raised as the `requests` ones"""
+
+    def __init__(self, options: TransportOptions = TransportOptions()):
+        self.keep_alive = options.keep_alive
+        self.pool = urllib3.PoolManager(
+            maxsize=options.pool_size,
+            cert_reqs="CERT_REQUIRED" if options.verify_ssl else "CERT_NONE",
+            ca_certs=where(),
+        )
+        if options.count_connections:
+            self.pool.pool_classes_by_scheme = _COUNTING_POOLS
+
+    def request(
+        self,
+        method: METHODS,
+        url: str,
+        headers: Mapping[str, str],
+        data: Body = None,
+        files: Optional[Mapping[str, bytes]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        headers = dict(headers)
+        body = encode_body(headers, data, files)
+        if not self.keep_alive:
+            headers["connection"] = "close"
+        started = time.perf_counter()
+        try:
+            raw = self.pool.urlopen(
+                method,
+                url,
+                body=body,
+                headers=headers,
+                redirect=False,
+                retries=False,
+                preload_content=False,
+                decode_content=False,
+            )
+        except urllib3.exceptions.NewConnectionError as exc:
+            # a subclass of the connect timeout error in urllib3
+            raise requests.ConnectionError(exc) from exc
+        except urllib3.exceptions.TimeoutError as exc:
+            raise requests.Timeout(exc) from exc
+        except urllib3.exceptions.HTTPError as exc:
+            raise requests.ConnectionError(exc) from exc
+        response = build_response(url, raw, time.perf_counter() - started)
+        if not stream:
+            # reading the body returns the connection to the pool
+            response.content
+        return response
+
+    def close(self):
+        self.pool.clear()
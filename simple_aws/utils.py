@@ -1 +1,36 @@
+import importlib
+from typing import Any
+from typing import Callable
+from typing import Collection
+from typing import Mapping
+
 xmlns = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def lazy_exports(
+    package: str,
+    exports: Mapping[str, str],
+    submodules: Collection[str] = (),
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Returns the module `__getattr__` and `__dir__` for `package`
+    to import each name of `exports` from its relative module, and
+    each of `submodules`, only once it is first accessed"""
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            return importlib.import_module(f".{name}", package)
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            )
+        value = namespace[name] = getattr(
+            importlib.import_module(module, package), name
+        )
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*namespace, *exports, *submodules})
+
+    return __getattr__, __dir__
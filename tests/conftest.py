@@ -1,6 +1,15 @@
+from typing import Callable
+from typing import Optional
+
 import pytest
 
 from simple_aws.credentials import Credentials
+from simple_aws.http import AuthHttpAdapter
+from simple_aws.http import PooledContext
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3 import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.core import S3Core
 
 
 @pytest.fixture
@@ -10,3 +19,50 @@ def credential() -> Credentials:
         secret_access_key="wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY",
         region="us-east-1",
     )
+
+
+@pytest.fixture
+def backend(credential: Credentials) -> InMemoryS3:
+    return InMemoryS3(credential)
+
+
+@pytest.fixture
+def versioned_backend(credential: Credentials) -> InMemoryS3:
+    return InMemoryS3(credential, versioned=True)
+
+
+@pytest.fixture
+def make_object(credential: Credentials) -> Callable[..., S3Object]:
+    """Builds objects of "bucket" served by an in-memory backend,
+    passing the other options, such as a wrapping transport, to
+    `S3Object`"""
+
+    def make(
+        backend: InMemoryS3,
+        credentials: Optional[Credentials] = None,
+        **options,
+    ) -> S3Object:
+        return S3Object(
+            credentials or credential,
+            S3ObjectConfig(bucket_name="bucket"),
+            **{"transport": backend.transport, **options},
+        )
+
+    return make
+
+
+@pytest.fixture
+def s3_object(make_object, backend: InMemoryS3) -> S3Object:
+    return make_object(backend)
+
+
+@pytest.fixture
+def patch_client(credential: Credentials) -> Callable[[S3Core, object], None]:
+    """Makes a core send its requests through a fake pooled client"""
+
+    def patch(core: S3Core, client: object):
+        context = PooledContext(AuthHttpAdapter(credential, "s3"))
+        object.__setattr__(context, "_client", client)
+        object.__setattr__(core, "context", context)
+
+    return patch
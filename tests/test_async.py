@@ -0,0 +1,162 @@
+import asyncio
+from typing import Optional
+
+import httpx
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import NotFound
+from simple_aws.exc import RequestFailed
+from simple_aws.services.s3 import CommonPrefix
+from simple_aws.services.s3 import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.async_service import AsyncS3Object
+from simple_aws.services.s3.object.copy import CopyParams
+
+
+def mock_transport(backend: InMemoryS3) -> httpx.MockTransport:
+    """Answers the async client requests with `backend`"""
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        status, headers, body = backend.handle(
+            request.method, str(request.url), request.headers, request.content
+        )
+        return httpx.Response(status, headers=headers, content=body)
+
+    return httpx.MockTransport(handle)
+
+
+@pytest.fixture
+def make_async_object(credential: Credentials):
+    """Builds async objects of "bucket" served by an in-memory backend,
+    or by another `transport`"""
+
+    def make(
+        backend: InMemoryS3,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> AsyncS3Object:
+        return AsyncS3Object(
+            credential,
+            S3ObjectConfig(bucket_name="bucket"),
+            transport=transport or mock_transport(backend),
+        )
+
+    return make
+
+
+def test_async_objects_round_trip(backend: InMemoryS3, make_async_object):
+    async def run():
+        async with make_async_object(backend) as s3:
+            await s3.upload("folder/a b+c.txt", b"hello world")
+            await s3.upload("folder/sub/file.txt", b"content")
+            info = await s3.object_info("folder/a b+c.txt")
+            chunks = [
+                chunk
+                async for chunk in s3.iter_download(
+                    "folder/a b+c.txt", chunk_size=4
+                )
+            ]
+            listed = [
+                entry
+                async for entry in s3.list_objects(
+                    "folder/", keys_only=True, delimiter="/"
+                )
+            ]
+            return (
+                info,
+                await s3.download("folder/a b+c.txt"),
+                await s3.download("folder/a b+c.txt", byte_range=(6, None)),
+                await s3.download(
+                    "folder/a b+c.txt", if_none_match=info.e_tag
+                ),
+                chunks,
+                listed,
+            )
+
+    info, content, suffix, not_modified, chunks, listed = asyncio.run(run())
+
+    assert info.size == 11
+    assert content == b"hello world"
+    assert suffix == b"world"
+    assert not_modified is None
+    assert b"".join(chunks) == b"hello world" and len(chunks) == 3
+    assert listed == ["folder/a b+c.txt", CommonPrefix("folder/sub/")]
+
+
+def test_async_copy_move_and_delete(backend: InMemoryS3, make_async_object):
+    backend.put_object("bucket", "source.txt", b"content")
+    backend.put_object("other", "kept.txt", b"kept")
+
+    async def run():
+        async with make_async_object(backend) as s3:
+            await s3.copy(
+                CopyParams("kept.txt", "other"),
+                CopyParams("copied.txt", "bucket"),
+            )
+            await s3.move("source.txt", "moved.txt")
+            return await s3.delete_many("copied.txt", "missing.txt")
+
+    result = asyncio.run(run())
+
+    assert result.ok and len(result.deleted) == 2
+    assert list(backend.buckets["bucket"]) == ["moved.txt"]
+    assert backend.buckets["bucket"]["moved.txt"].content == b"content"
+
+
+def test_async_object_info_reads_versions_and_reports_failures(
+    versioned_backend: InMemoryS3, make_async_object
+):
+    first = versioned_backend.put_object("bucket", "key.txt", b"first")
+    versioned_backend.put_object("bucket", "key.txt", b"second version")
+    s3 = make_async_object(versioned_backend)
+
+    info = asyncio.run(s3.object_info("key.txt", first.version_id))
+
+    assert info.size == 5 and info.e_tag == first.e_tag
+    with pytest.raises(NotFound):
+        asyncio.run(s3.object_info("missing.txt"))
+    with pytest.raises(RequestFailed) as exc_info:
+        asyncio.run(s3.download("missing.txt", presigned=False))
+    assert exc_info.value.response.status_code == 404
+
+
+class InFlight:
+    """Counts the requests `handle` is answering at the same time"""
+
+    def __init__(self, backend: InMemoryS3):
+        self.backend = backend
+        self.current = 0
+        self.peak = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        await asyncio.sleep(0.001)
+        self.current -= 1
+        status, headers, body = self.backend.handle(
+            request.method, str(request.url), request.headers, request.content
+        )
+        return httpx.Response(status, headers=headers, content=body)
+
+
+def test_async_delete_iter_bounds_batches_in_flight(
+    backend: InMemoryS3, make_async_object
+):
+    in_flight = InFlight(backend)
+    pulled = []
+
+    def keys():
+        for index in range(5500):
+            pulled.append(index)
+            yield f"key-{index}"
+
+    async def run():
+        async with make_async_object(
+            backend, httpx.MockTransport(in_flight.handle)
+        ) as s3:
+            return await s3.delete_iter(keys(), quiet=True, concurrency=2)
+
+    result = asyncio.run(run())
+
+    assert result.ok and len(pulled) == 5500
+    assert in_flight.peak == 2
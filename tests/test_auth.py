@@ -1,7 +1,16 @@
 from datetime import datetime
 from datetime import timezone
 
+from gyver.url import URL
+
+from simple_aws.auth import UNSIGNED_PAYLOAD
 from simple_aws.auth import AwsAuthV4
+from simple_aws.auth import PayloadSigning
+from simple_aws.auth import SigningKeyCache
+from simple_aws.auth import canonical_query
+from simple_aws.auth import canonical_uri
+from simple_aws.auth import chunked_length
+from simple_aws.auth import derive_signing_key
 from simple_aws.credentials import Credentials
 
 now = datetime.fromisoformat("2013-05-24T00:00:00")
@@ -80,3 +89,112 @@ def test_aws_auth_returns_expected_result_list_object_case(
         now=now,
     )
     assert headers["authorization"] == expected
+
+
+def test_signing_key_cache_reuses_keys_for_the_same_day():
+    cache = SigningKeyCache()
+    first = cache.get("secret", "20130524", "us-east-1", "s3")
+    second = cache.get("secret", "20130524", "us-east-1", "s3")
+
+    assert first is second
+    assert first == derive_signing_key("secret", "20130524", "us-east-1", "s3")
+    assert len(cache) == 1
+
+
+def test_signing_key_cache_evicts_when_the_day_rolls_over():
+    cache = SigningKeyCache()
+    cache.get("secret", "20130524", "us-east-1", "s3")
+    cache.get("secret", "20130524", "us-east-1", "sqs")
+    cache.get("secret", "20130525", "us-east-1", "s3")
+    assert len(cache) == 1
+
+    # late signatures for the previous day are not cached
+    cache.get("secret", "20130524", "us-east-1", "s3")
+    assert len(cache) == 1
+
+
+def test_prepared_scope_signs_like_the_unprepared_path(
+    credential: Credentials,
+):
+    aws_auth_v4 = AwsAuthV4(credential, "s3")
+    scope = aws_auth_v4.prepare(now)
+
+    assert scope.amz_date == "20130524T000000Z"
+    assert scope.credential == aws_auth_v4.make_credential(now)
+    assert scope.sign("policy") == aws_auth_v4.aws4_sign_string("policy", now)
+
+
+def test_aws_auth_streaming_signatures_match_chunked_upload_example(
+    credential: Credentials,
+):
+    aws_auth_v4 = AwsAuthV4(credential, "s3", use_default_headers=False)
+    headers, signer = aws_auth_v4.streaming_headers(
+        "PUT",
+        URL("https://s3.amazonaws.com/examplebucket/chunkObject.txt"),
+        66560,
+        65536,
+        headers={"x-amz-storage-class": "REDUCED_REDUNDANCY"},
+        now=now,
+    )
+
+    assert headers["content-length"] == str(chunked_length(66560, 65536))
+    assert headers["content-length"] == "66824"
+    assert headers["authorization"].endswith(
+        "Signature=4f232c4386841ef735655705268965c44a0e4690baa4adea153f7db9fa80a0a9"
+    )
+    assert signer.sign(b"a" * 65536) == (
+        "ad80c730a21e5b8d04586a2213dd63b9a0e99e0e2307b0ade35a65485a288648"
+    )
+    assert signer.sign(b"a" * 1024) == (
+        "0055627c9e194cb4542bae2aa5492e3c1575bbb81b612b7d234b86a503ef5497"
+    )
+    assert signer.sign(b"") == (
+        "b6c6ea8a5354eaf15b3cb7646744f4275b71ea724fed81ceb9323e279d449df9"
+    )
+
+
+def test_aws_auth_payload_signing_policies(credential: Credentials):
+    url = URL("https://examplebucket.s3.amazonaws.com/test.txt")
+    body = b"Welcome to Amazon S3."
+    aws_auth_v4 = AwsAuthV4(credential, "s3")
+
+    signed = aws_auth_v4.headers("PUT", url, data=body, now=now)
+    sha_only = aws_auth_v4.headers(
+        "PUT",
+        url,
+        data=body,
+        now=now,
+        payload_signing=PayloadSigning.SHA256,
+    )
+    unsigned = AwsAuthV4(
+        credential, "s3", payload_signing=PayloadSigning.UNSIGNED
+    ).headers("PUT", url, data=body, now=now)
+
+    assert "content-md5" in signed
+    assert "content-md5" not in sha_only
+    assert "content-md5" not in unsigned
+    assert sha_only["x-amz-content-sha256"] == signed["x-amz-content-sha256"]
+    assert unsigned["x-amz-content-sha256"] == UNSIGNED_PAYLOAD
+
+
+def test_canonical_uri_and_query_encode_like_s3():
+    assert canonical_uri("/folder/a%20b+c~d.txt") == "/folder/a%20b%2Bc~d.txt"
+    assert canonical_query("prefix=a%20b/&delimiter=%2F&list-type=2") == (
+        "delimiter=%2F&list-type=2&prefix=a%20b%2F"
+    )
+
+
+def test_aws_auth_signs_canonical_queries_and_paths(credential: Credentials):
+    aws_auth_v4 = AwsAuthV4(credential, "s3")
+
+    def authorization(url: str) -> str:
+        return aws_auth_v4.headers("GET", URL(url), now=now)["authorization"]
+
+    assert authorization(
+        "https://examplebucket.s3.amazonaws.com/?prefix=a/&list-type=2"
+    ) == authorization(
+        "https://examplebucket.s3.amazonaws.com/?list-type=2&prefix=a%2F"
+    )
+    assert authorization(
+        "https://examplebucket.s3.amazonaws.com/a+b.txt"
+    ) == authorization("https://examplebucket.s3.amazonaws.com/a%2Bb.txt")
@@ -0,0 +1,196 @@
+import threading
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import NotFound
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.copy import Copy
+from simple_aws.services.s3.object.copy import CopyMany
+from simple_aws.services.s3.object.copy import CopyParams
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.multipart import MIB
+from simple_aws.services.s3.object.multipart import MIN_PART_SIZE
+from simple_aws.utils import xmlns
+
+from .test_delete import FakeDeleteClient
+from .test_delete import FakeResponse
+
+
+class FakeCopyResponse(FakeResponse):
+    def __init__(self, status_code: int):
+        super().__init__(b"<CopyObjectResult></CopyObjectResult>")
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.url = "url"
+
+
+class FakeCopyClient(FakeDeleteClient):
+    """Copies every source but the missing ones"""
+
+    def __init__(self):
+        super().__init__()
+        self.copies: list[str] = []
+        self.copy_lock = threading.Lock()
+
+    def put(self, url, headers):
+        source = headers["x-amz-copy-source"]
+        if "missing" in source:
+            return FakeCopyResponse(404)
+        with self.copy_lock:
+            self.copies.append(source)
+        return FakeCopyResponse(200)
+
+
+@pytest.fixture
+def client():
+    return FakeCopyClient()
+
+
+@pytest.fixture
+def core(credential: Credentials, client: FakeCopyClient, patch_client):
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, client)
+    return core
+
+
+def test_move_many_copies_then_deletes_sources_in_batches(core, client):
+    pairs = (
+        (CopyParams(f"src/{index}", "bucket"), CopyParams(f"dst/{index}", "b"))
+        for index in range(1500)
+    )
+
+    result = CopyMany(core, pairs, concurrency=4, move=True).copy()
+
+    assert result.ok
+    assert len(client.copies) == 1500
+    assert sorted(map(len, client.batches)) == [500, 1000]
+
+
+def test_move_many_only_deletes_the_sources_copied(core, client):
+    copied = (CopyParams("src/a", "bucket"), CopyParams("dst/a", "bucket"))
+    missing = (
+        CopyParams("src/missing", "bucket"),
+        CopyParams("dst/missing", "bucket"),
+    )
+
+    result = CopyMany(core, [missing, copied], move=True).copy()
+
+    assert not result.ok
+    assert result.copied == [copied]
+    ((source, target, error),) = result.errors
+    assert (source, target) == missing
+    assert isinstance(error, NotFound)
+    assert client.batches == [["src/a"]]
+
+
+class FakeMultipartCopyClient:
+    """Serves a large source and records a multipart copy of it"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.created_headers: dict[str, str] = {}
+        self.ranges: list[str] = []
+        self.completed = b""
+        self.lock = threading.Lock()
+
+    def head(self, url, headers=None):
+        response = FakeCopyResponse(200)
+        response.headers = {
+            "Last-Modified": "Fri, 27 Jan 2023 10:21:12 GMT",
+            "Content-Length": str(self.size),
+            "ETag": '"source-etag"',
+            "Content-Type": "video/mp4",
+            "X-Amz-Meta-Owner": "someone",
+            "Server": "AmazonS3",
+        }
+        return response
+
+    def get(self, url, headers=None):
+        assert "tagging" in url.encode()
+        response = FakeCopyResponse(200)
+        response.content = (
+            f'<Tagging xmlns="{xmlns}"><TagSet>'
+            "<Tag><Key>team</Key><Value>video &amp; audio</Value></Tag>"
+            "</TagSet></Tagging>"
+        ).encode()
+        return response
+
+    def post(self, url, data=b"", headers=None, idempotent=False):
+        response = FakeCopyResponse(200)
+        if "uploads" in url.encode():
+            self.created_headers = dict(headers)
+            response.content = (
+                f'<InitiateMultipartUploadResult xmlns="{xmlns}">'
+                "<UploadId>upload-id</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            ).encode()
+        else:
+            self.completed = data
+        return response
+
+    def put(self, url, headers):
+        assert headers["x-amz-copy-source-if-match"] == '"source-etag"'
+        with self.lock:
+            self.ranges.append(headers["x-amz-copy-source-range"])
+        response = FakeCopyResponse(200)
+        response.content = (
+            f'<CopyPartResult xmlns="{xmlns}">'
+            f'<ETag>"{headers["x-amz-copy-source-range"]}"</ETag>'
+            "</CopyPartResult>"
+        ).encode()
+        return response
+
+
+def test_copy_switches_to_multipart_for_large_sources(
+    credential: Credentials, patch_client
+):
+    size = 12 * MIB + 1
+    client = FakeMultipartCopyClient(size)
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, client)
+
+    Copy(
+        core, multipart_threshold=MIN_PART_SIZE, part_size=MIN_PART_SIZE
+    ).copy(CopyParams("big.mp4", "bucket"), CopyParams("copy.mp4", "other"))
+
+    assert client.created_headers == {
+        "content-type": "video/mp4",
+        "x-amz-meta-owner": "someone",
+        "x-amz-tagging": "team=video+%26+audio",
+    }
+    assert sorted(client.ranges) == [
+        f"bytes=0-{MIN_PART_SIZE - 1}",
+        f"bytes={2 * MIN_PART_SIZE}-{size - 1}",
+        f"bytes={MIN_PART_SIZE}-{2 * MIN_PART_SIZE - 1}",
+    ]
+    assert client.completed.count(b"<Part>") == 3
+
+
+def test_multipart_copy_keeps_the_source_metadata_and_tags(
+    s3_object: S3Object, backend: InMemoryS3
+):
+    content = bytes(range(256)) * (MIN_PART_SIZE // 256) + b"last part"
+    backend.put_object(
+        "bucket",
+        "big.bin",
+        content,
+        {"content-type": "video/mp4", "x-amz-meta-owner": "someone"},
+        tags={"team": "video & audio", "stage": "raw"},
+    )
+    Copy(
+        s3_object.core,
+        multipart_threshold=MIN_PART_SIZE,
+        part_size=MIN_PART_SIZE,
+    ).copy(CopyParams("big.bin", "bucket"), CopyParams("copy.bin", "other"))
+
+    copied = backend.get_object("other", "copy.bin")
+    assert copied is not None and copied.content == content
+    assert copied.e_tag.endswith("-2")
+    assert copied.headers == {
+        "content-type": "video/mp4",
+        "x-amz-meta-owner": "someone",
+    }
+    assert dict(copied.tags) == {"team": "video & audio", "stage": "raw"}
@@ -0,0 +1,181 @@
+import threading
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.delete import DeleteError
+from simple_aws.services.s3.object.delete import DeleteMany
+from simple_aws.services.s3.object.delete import DeletePrefix
+from simple_aws.services.s3.object.delete import DeleteProgress
+from simple_aws.services.s3.object.delete import ObjectTuple
+from simple_aws.services.s3.object.delete import parse_delete_result
+from simple_aws.utils import xmlns
+
+
+class FakeResponse:
+    ok = True
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+
+class FakeDeleteClient:
+    """Deletes every key but the locked ones"""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+        self.lock = threading.Lock()
+
+    def post(self, url, data: bytes, headers, payload_signing, idempotent):
+        root = ET.fromstring(data)
+        keys = [key.text for key in root.iter(f"{{{xmlns}}}Key")]
+        quiet = root.find(f"{{{xmlns}}}Quiet") is not None
+        with self.lock:
+            self.batches.append(keys)
+        body = "".join(
+            f"<Error><Key>{escape(key)}</Key><Code>AccessDenied</Code>"
+            "<Message>Access Denied</Message></Error>"
+            if "locked" in key
+            else ""
+            if quiet
+            else f"<Deleted><Key>{escape(key)}</Key></Deleted>"
+            for key in keys
+        )
+        return FakeResponse(
+            f'<DeleteResult xmlns="{xmlns}">{body}</DeleteResult>'.encode()
+        )
+
+
+@pytest.fixture
+def client():
+    return FakeDeleteClient()
+
+
+@pytest.fixture
+def core(credential: Credentials, client: FakeDeleteClient, patch_client):
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, client)
+    return core
+
+
+def test_delete_many_batches_any_number_of_keys(core, client):
+    keys = (f"key-{index}" for index in range(2500))
+
+    result = DeleteMany(core, keys, concurrency=2).delete()
+
+    assert sorted(map(len, client.batches)) == [500, 1000, 1000]
+    assert len(result.deleted) == 2500
+    assert result.ok
+
+
+def test_delete_many_reports_errors_in_quiet_mode(core):
+    objects = [ObjectTuple("a & b"), "locked-<1>", ObjectTuple("c", "v1")]
+
+    result = DeleteMany(core, objects, quiet=True).delete()
+
+    assert result.deleted == []
+    assert result.errors == [
+        DeleteError("locked-<1>", None, "AccessDenied", "Access Denied")
+    ]
+
+
+def test_delete_payload_escapes_keys(core):
+    payload = DeleteMany(core, ()).build_payload(
+        [ObjectTuple("a&b<c>"), ObjectTuple("d", "v&1")]
+    )
+
+    root = ET.fromstring(payload)
+    objects = [
+        (
+            item.findtext(f"{{{xmlns}}}Key"),
+            item.findtext(f"{{{xmlns}}}VersionId"),
+        )
+        for item in root
+    ]
+    assert objects == [("a&b<c>", None), ("d", "v&1")]
+
+
+def test_parse_delete_result_rejects_error_documents():
+    with pytest.raises(UnexpectedResponse, match="InternalError"):
+        parse_delete_result(b"<Error><Code>InternalError</Code></Error>")
+
+
+class FakeBucketClient(FakeDeleteClient):
+    """Lists `keys` in pages of 1000 and deletes them"""
+
+    def __init__(self, keys: list[str]):
+        super().__init__()
+        self.keys = keys
+
+    def get(self, url, stream: bool = False):
+        start = int(url.query.params.get("continuation-token", ["0"])[0])
+        page = self.keys[start : start + 1000]
+        token = (
+            f"<NextContinuationToken>{start + 1000}</NextContinuationToken>"
+            if start + 1000 < len(self.keys)
+            else ""
+        )
+        contents = "".join(
+            f"<Contents><Key>{key}</Key></Contents>" for key in page
+        )
+        return FakeStreamResponse(
+            f'<ListBucketResult xmlns="{xmlns}">'
+            f"<IsTruncated>{str(bool(token)).lower()}</IsTruncated>"
+            f"{contents}{token}</ListBucketResult>".encode()
+        )
+
+
+class FakeStreamResponse(FakeResponse):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def iter_content(self, size: int):
+        yield self.content
+
+
+def test_delete_prefix_streams_listing_into_batches(
+    credential: Credentials, patch_client
+):
+    keys = [f"prefix/{index:05d}" for index in range(3500)]
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, FakeBucketClient(keys + ["prefix/locked"]))
+    updates = []
+    progress = DeleteProgress(lambda p: updates.append(p.deleted))
+
+    result = DeletePrefix(core, "prefix/", 2, progress).delete()
+
+    assert [error.object_name for error in result.errors] == ["prefix/locked"]
+    assert (progress.listed, progress.deleted, progress.failed) == (
+        3501,
+        3500,
+        1,
+    )
+    assert len(updates) == 4
+    with pytest.raises(InvalidParam):
+        DeletePrefix(core, "/")
+
+
+def test_delete_many_takes_keys_and_version_pairs(
+    s3_object: S3Object, backend: InMemoryS3
+):
+    for key in ("a", "b", "v1"):
+        backend.put_object("bucket", key, b"")
+
+    result = s3_object.delete_many(("a", "v1"), "b")
+
+    assert result.deleted == [ObjectTuple("a", "v1"), ObjectTuple("b")]
+    assert list(backend.buckets["bucket"]) == ["v1"]
+    with pytest.raises(InvalidParam):
+        s3_object.delete_many(["v1"])  # type: ignore
+    assert s3_object.delete_iter(["v1"]).deleted == [ObjectTuple("v1")]
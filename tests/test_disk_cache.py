@@ -0,0 +1,205 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import NotFound
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.disk_cache import STALE_FILL_AGE
+from simple_aws.services.s3.object.disk_cache import DiskCache
+from simple_aws.services.s3.object.service import S3Object
+
+
+class FakeGetResponse:
+    def __init__(self, status_code: int, content: bytes = b"", headers=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = content
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def iter_content(self, size: int):
+        for start in range(0, len(self.content), size):
+            yield self.content[start : start + size]
+
+
+class FakeObjectsClient:
+    """Serves GETs conditional on the ETag of in-memory objects"""
+
+    def __init__(self):
+        self.objects = {"model.bin": (b"weights-v1", "v1")}
+        self.bytes_sent = 0
+
+    def get(self, url, headers, raw, stream):
+        name = url.path.encode().lstrip("/")
+        if name not in self.objects:
+            return FakeGetResponse(404)
+        content, e_tag = self.objects[name]
+        if headers.get("if-none-match") == f'"{e_tag}"':
+            return FakeGetResponse(304)
+        self.bytes_sent += len(content)
+        return FakeGetResponse(200, content, {"ETag": f'"{e_tag}"'})
+
+
+@pytest.fixture
+def make_cached_object(credential: Credentials, patch_client):
+    """Builds objects caching on disk what a fake client serves"""
+
+    def make(client: FakeObjectsClient, cache: DiskCache) -> S3Object:
+        s3_object = S3Object(
+            credential, S3ObjectConfig(bucket_name="bucket"), disk_cache=cache
+        )
+        patch_client(s3_object.core, client)
+        return s3_object
+
+    return make
+
+
+def test_disk_cache_only_downloads_changed_objects(
+    make_cached_object, tmp_path
+):
+    client = FakeObjectsClient()
+    cache = DiskCache(tmp_path)
+    s3_object = make_cached_object(client, cache)
+
+    assert s3_object.download("model.bin") == b"weights-v1"
+    assert s3_object.download_mapped("model.bin") == b"weights-v1"
+    assert (cache.hits, cache.misses, client.bytes_sent) == (1, 1, 10)
+
+    client.objects["model.bin"] = (b"weights-v2", "v2")
+    assert s3_object.download("model.bin") == b"weights-v2"
+    assert [path.name.partition("-")[2] for path in tmp_path.iterdir()] == [
+        "v2"
+    ]
+
+    # a new cache over the same directory reuses the stored files
+    s3_object = make_cached_object(client, DiskCache(tmp_path))
+    assert s3_object.download("model.bin") == b"weights-v2"
+    assert client.bytes_sent == 20
+
+
+def test_disk_cache_evicts_least_recently_read(make_cached_object, tmp_path):
+    client = FakeObjectsClient()
+    client.objects = {
+        name: (name.encode() * 10, name) for name in ("a", "b", "c")
+    }
+    cache = DiskCache(tmp_path, max_size=25)
+    s3_object = make_cached_object(client, cache)
+
+    for name in ("a", "b", "a", "c"):
+        s3_object.download(name)
+
+    assert sorted(path.name[-1] for path in tmp_path.iterdir()) == ["a", "c"]
+    assert cache.size == 20
+
+    del client.objects["a"]
+    with pytest.raises(NotFound):
+        s3_object.download("a")
+    assert cache.size == 10
+
+
+def test_disk_cache_leaves_foreign_files_alone(make_cached_object, tmp_path):
+    foreign = ["notes.txt", "model-v1", "A" * 64 + "-v1", ".fill-running"]
+    for name in foreign:
+        (tmp_path / name).write_bytes(b"not cached" * 10)
+    (tmp_path / "subdirectory").mkdir()
+    stale = tmp_path / ".fill-abandoned"
+    stale.write_bytes(b"partial")
+    old = time.time() - STALE_FILL_AGE - 1
+    os.utime(stale, (old, old))
+
+    cache = DiskCache(tmp_path, max_size=15)
+    s3_object = make_cached_object(FakeObjectsClient(), cache)
+    assert s3_object.download("model.bin") == b"weights-v1"
+
+    names = {path.name for path in tmp_path.iterdir()}
+    assert cache.size == 10
+    assert names.issuperset(foreign) and stale.name not in names
+    assert len(names) == len(foreign) + 2
+
+
+class BlockingObjectsClient(FakeObjectsClient):
+    """Holds the first response midway until `release` is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def get(self, url, headers, raw, stream):
+        response = super().get(url, headers, raw, stream)
+        iter_content = response.iter_content
+
+        def blocking_iter_content(size: int):
+            for chunk in iter_content(size):
+                yield chunk[:1]
+                self.started.set()
+                self.release.wait(5)
+                yield chunk[1:]
+
+        response.iter_content = blocking_iter_content
+        return response
+
+
+def test_disk_cache_opened_during_a_fill_keeps_it(
+    make_cached_object, tmp_path
+):
+    client = BlockingObjectsClient()
+    s3_object = make_cached_object(client, DiskCache(tmp_path))
+
+    with ThreadPoolExecutor(1) as executor:
+        filling = executor.submit(s3_object.download, "model.bin")
+        assert client.started.wait(5)
+        # another process opening the cache while the fill runs
+        DiskCache(tmp_path)
+        client.release.set()
+        assert filling.result(5) == b"weights-v1"
+
+    other = make_cached_object(client, DiskCache(tmp_path))
+    assert other.download("model.bin") == b"weights-v1"
+    assert client.bytes_sent == 10
+
+
+def test_disk_cache_fills_the_requested_version(
+    versioned_backend: InMemoryS3, make_object, tmp_path
+):
+    first = versioned_backend.put_object("bucket", "model.bin", b"weights-v1")
+    versioned_backend.put_object("bucket", "model.bin", b"weights-v2")
+    cache = DiskCache(tmp_path)
+    s3_object = make_object(versioned_backend, disk_cache=cache)
+
+    assert (
+        s3_object.download_mapped("model.bin", first.version_id)
+        == b"weights-v1"
+    )
+    assert s3_object.download("model.bin", first.version_id) == b"weights-v1"
+    assert s3_object.download("model.bin") == b"weights-v2"
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_disk_cache_serves_ranges_without_filling(
+    backend: InMemoryS3, make_object, tmp_path
+):
+    backend.put_object("bucket", "model.bin", b"weights-v1")
+    cache = DiskCache(tmp_path)
+    s3_object = make_object(backend, disk_cache=cache)
+
+    assert s3_object.download("model.bin", byte_range=(0, 6)) == b"weights"
+    assert not os.listdir(tmp_path)
+
+    s3_object.download("model.bin")
+    assert s3_object.download("model.bin", byte_range=(8, None)) == b"v1"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    backend.put_object("bucket", "model.bin", b"weights-v2")
+    assert s3_object.download("model.bin", byte_range=(8, None)) == b"v2"
+    assert (cache.hits, cache.misses) == (1, 1)
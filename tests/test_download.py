@@ -0,0 +1,101 @@
+import pytest
+
+from simple_aws.exc import RequestFailed
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.transport import TransportOptions
+
+CONTENT = bytes(range(256)) * 40
+
+
+def test_download_to_fetches_ranges_into_files_and_buffers(
+    backend: InMemoryS3, make_object, tmp_path
+):
+    backend.put_object("bucket", "key.bin", CONTENT)
+    s3 = make_object(backend)
+    buffer = bytearray(len(CONTENT))
+
+    info = s3.download_to(
+        "key.bin", tmp_path / "key.bin", range_size=1000, concurrency=4
+    )
+    s3.download_to("key.bin", buffer, range_size=4096)
+
+    assert info.size == len(CONTENT)
+    assert (tmp_path / "key.bin").read_bytes() == CONTENT
+    assert buffer == CONTENT
+
+
+def test_download_to_fetches_the_requested_version(
+    versioned_backend: InMemoryS3, make_object, tmp_path
+):
+    first = versioned_backend.put_object("bucket", "key.bin", CONTENT)
+    versioned_backend.put_object("bucket", "key.bin", b"latest")
+    s3 = make_object(versioned_backend)
+
+    info = s3.download_to(
+        "key.bin", tmp_path / "key.bin", version=first.version_id
+    )
+
+    assert info.e_tag == first.e_tag
+    assert (tmp_path / "key.bin").read_bytes() == CONTENT
+
+
+def test_download_to_fails_when_the_object_changes_midway(
+    backend: InMemoryS3, make_object, tmp_path
+):
+    backend.put_object("bucket", "key.bin", CONTENT)
+
+    def transport(options: TransportOptions):
+        inner = backend.transport(options)
+
+        class ReplacingTransport:
+            def request(self, method, url, headers, *args, **kwargs):
+                response = inner.request(method, url, headers, *args, **kwargs)
+                if "range" in headers:
+                    backend.put_object("bucket", "key.bin", CONTENT[::-1])
+                return response
+
+            def close(self):
+                inner.close()
+
+        return ReplacingTransport()
+
+    s3 = make_object(backend, transport=transport)
+
+    with pytest.raises(RequestFailed) as exc_info:
+        s3.download_to(
+            "key.bin", tmp_path / "key.bin", range_size=1000, concurrency=1
+        )
+
+    assert exc_info.value.response.status_code == 412
+    assert not (tmp_path / "key.bin").exists()
+
+
+@pytest.mark.parametrize("presigned", [True, False])
+def test_download_reads_the_requested_version(
+    versioned_backend: InMemoryS3, make_object, presigned: bool
+):
+    first = versioned_backend.put_object("bucket", "key.bin", CONTENT)
+    versioned_backend.put_object("bucket", "key.bin", b"latest")
+    s3 = make_object(versioned_backend)
+
+    content = s3.download(
+        "key.bin", first.version_id, byte_range=(0, 9), presigned=presigned
+    )
+
+    assert content == CONTENT[:10]
+    assert s3.download("key.bin", presigned=presigned) == b"latest"
+
+
+def test_iter_download_streams_the_requested_version(
+    versioned_backend: InMemoryS3, make_object
+):
+    first = versioned_backend.put_object("bucket", "key.bin", CONTENT)
+    versioned_backend.put_object("bucket", "key.bin", b"latest")
+    s3 = make_object(versioned_backend)
+
+    chunks = list(
+        s3.iter_download("key.bin", first.version_id, chunk_size=4096)
+    )
+
+    assert b"".join(chunks) == CONTENT
+    assert [len(chunk) for chunk in chunks] == [4096, 4096, 2048]
@@ -0,0 +1,107 @@
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.get import Get
+from simple_aws.services.s3.object.get import range_header
+
+from .test_disk_cache import FakeGetResponse
+
+CONTENT = b"0123456789"
+LAST_MODIFIED = "Fri, 27 Jan 2023 10:21:12 GMT"
+
+
+class FakeConditionalClient:
+    """Answers GETs like S3 does for conditional and ranged requests"""
+
+    def __init__(self):
+        self.requests: list[tuple[str, dict, bool]] = []
+        self.content_range: Optional[str] = None
+
+    def get(self, url, headers, raw):
+        self.requests.append((url.encode(), dict(headers), raw))
+        if headers.get("if-none-match") == '"etag"' or (
+            headers.get("if-modified-since") == LAST_MODIFIED
+        ):
+            return FakeGetResponse(304)
+        if "range" in headers and self.content_range != "":
+            start, _, end = headers["range"][6:].partition("-")
+            stop = min(int(end) + 1, len(CONTENT)) if end else len(CONTENT)
+            content_range = self.content_range or (
+                f"bytes {start}-{stop - 1}/{len(CONTENT)}"
+            )
+            return FakeGetResponse(
+                206,
+                CONTENT[int(start) : stop],
+                {"content-range": content_range},
+            )
+        return FakeGetResponse(200, CONTENT)
+
+
+@pytest.fixture
+def client():
+    return FakeConditionalClient()
+
+
+@pytest.fixture
+def get(credential: Credentials, client, patch_client):
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, client)
+    return Get(core, "file.txt", "v1")
+
+
+def test_download_returns_none_when_not_modified(get, client):
+    modified_at = datetime(2023, 1, 27, 10, 21, 12, tzinfo=timezone.utc)
+
+    assert get.download(if_none_match="etag") is None
+    assert get.download(if_modified_since=modified_at) is None
+    assert get.download(if_none_match='"other"') == CONTENT
+    assert [headers for _, headers, _ in client.requests] == [
+        {"if-none-match": '"etag"'},
+        {"if-modified-since": LAST_MODIFIED},
+        {"if-none-match": '"other"'},
+    ]
+
+
+def test_download_ranges_presigned_or_signed(get, client):
+    assert get.download(byte_range=(2, 4)) == b"234"
+    assert get.download(byte_range=(7, None), presigned=False) == b"789"
+
+    (presigned_url, headers, raw), (url, signed, signed_raw) = client.requests
+    assert raw and "X-Amz-Signature" in presigned_url
+    assert headers == {"range": "bytes=2-4"}
+    assert not signed_raw and url.endswith("/file.txt?versionId=v1")
+    assert signed == {"range": "bytes=7-"}
+
+
+def test_download_clips_ranges_to_the_object_size(get):
+    assert get.download(byte_range=(8, 100)) == b"89"
+
+
+@pytest.mark.parametrize(
+    "content_range",
+    # the whole object, as from a server ignoring the Range header
+    ["", "bytes 0-9/10", "bytes 2-3/10", "bytes 2-4/*"],
+)
+def test_download_rejects_other_content_than_the_range(
+    get, client, content_range: str
+):
+    client.content_range = content_range
+
+    with pytest.raises(UnexpectedResponse):
+        get.download(byte_range=(2, 4))
+
+
+def test_range_header_rejects_invalid_ranges():
+    assert range_header((0, 0)) == "bytes=0-0"
+    with pytest.raises(InvalidParam):
+        range_header((5, 4))
+    with pytest.raises(InvalidParam):
+        range_header((-1, None))
@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_aws.credentials import Credentials
+from simple_aws.http import AuthHttpAdapter
+from simple_aws.http import PooledContext
+from simple_aws.services.s3 import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.transport import TransportOptions
+
+
+def test_pooled_context_shares_one_client_across_threads(
+    credential: Credentials,
+):
+    created = []
+    context = PooledContext(AuthHttpAdapter(credential, "s3"), created.append)
+
+    def acquire(_):
+        with context.begin() as client:
+            return client
+
+    with ThreadPoolExecutor(8) as executor:
+        clients = set(map(id, executor.map(acquire, range(64))))
+
+    assert len(clients) == 1
+    assert len(created) == 1
+
+
+def test_pooled_context_recreates_client_after_close(
+    credential: Credentials,
+):
+    context = PooledContext(AuthHttpAdapter(credential, "s3"))
+    first = context.acquire()
+
+    context.close()
+
+    assert not context.is_active()
+    assert context.acquire() is not first
+
+
+def test_cores_for_other_buckets_share_the_pooled_client(
+    credential: Credentials,
+):
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+
+    other = core.for_bucket("other")
+
+    assert other.context is core.context
+    assert other.base_uri.netloc.encode().startswith("other.s3.")
+    assert core.for_bucket("bucket") is core
+
+
+def test_prewarm_heads_the_configured_key(
+    credential: Credentials, backend: InMemoryS3
+):
+    sent = []
+
+    def transport(options: TransportOptions):
+        inner = backend.transport(options)
+
+        class RecordingTransport:
+            def request(self, method, url, *args, **kwargs):
+                sent.append((method, url))
+                return inner.request(method, url, *args, **kwargs)
+
+            def close(self):
+                inner.close()
+
+        return RecordingTransport()
+
+    core = S3Core(
+        credential,
+        S3ObjectConfig(
+            bucket_name="bucket", prewarm_connections=2, prewarm_key="warm"
+        ),
+        transport=transport,
+    )
+
+    core.context.acquire()
+
+    assert (
+        sent
+        == [("HEAD", "https://bucket.s3.us-east-1.amazonaws.com/warm")] * 2
+    )
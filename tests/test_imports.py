@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+
+def imported_modules(statement: str) -> set[str]:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{statement}\nimport sys\nprint(*sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stdout.split())
+
+
+def test_service_factory_does_not_import_services():
+    modules = imported_modules(
+        "from simple_aws.services import ServiceFactory"
+    )
+
+    assert "simple_aws.services.s3" not in modules
+    assert "requests" not in modules
+    assert "httpx" not in modules
+
+
+def test_s3_exports_import_only_their_modules():
+    modules = imported_modules(
+        "from simple_aws.services.s3 import S3Object, FileInfo"
+    )
+
+    assert "simple_aws.services.s3.object.service" in modules
+    assert "simple_aws.services.s3.object.async_service" not in modules
+    assert "httpx" not in modules
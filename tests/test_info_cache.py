@@ -0,0 +1,126 @@
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.object.info_cache import InfoCache
+from simple_aws.services.s3.object.service import S3Object
+
+from .test_delete import FakeDeleteClient
+
+
+class FakeHeadResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.headers = headers or {}
+
+
+class FakeHeadClient(FakeDeleteClient):
+    """Serves HEAD requests for objects whose ETag changes on demand"""
+
+    def __init__(self):
+        super().__init__()
+        self.e_tags = {"key": "v1", "other": "v1"}
+        self.heads: list[dict] = []
+
+    def head(self, url, headers=None):
+        self.heads.append(dict(headers or {}))
+        e_tag = f'"{self.e_tags[url.path.encode().lstrip("/")]}"'
+        if (headers or {}).get("if-none-match") == e_tag:
+            return FakeHeadResponse(304)
+        return FakeHeadResponse(
+            200,
+            {
+                "Last-Modified": "Fri, 27 Jan 2023 10:21:12 GMT",
+                "Content-Length": "10",
+                "ETag": e_tag,
+            },
+        )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client():
+    return FakeHeadClient()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cached_object(credential: Credentials, client, clock, patch_client):
+    s3_object = S3Object(
+        credential,
+        S3ObjectConfig(bucket_name="bucket"),
+        info_cache=InfoCache(maxsize=1, ttl=10, clock=clock),
+    )
+    patch_client(s3_object.core, client)
+    return s3_object
+
+
+def test_info_cache_serves_fresh_entries_and_revalidates(
+    cached_object, client, clock
+):
+    cache = cached_object.info_cache
+
+    first = cached_object.object_info("key")
+    assert cached_object.object_info("key") is first
+    assert len(client.heads) == 1
+
+    clock.now = 11
+    assert cached_object.object_info("key") is first
+    assert client.heads[-1] == {"if-none-match": '"v1"'}
+
+    clock.now = 22
+    client.e_tags["key"] = "v2"
+    assert cached_object.object_info("key").e_tag == "v2"
+    assert (cache.hits, cache.misses, cache.revalidations) == (1, 2, 1)
+
+
+def test_info_cache_keeps_entries_for_their_own_ttl(
+    cached_object, client, clock
+):
+    first = cached_object.object_info("key", ttl=100)
+
+    clock.now = 50
+    assert cached_object.object_info("key") is first
+    assert len(client.heads) == 1
+
+    clock.now = 101
+    cached_object.object_info("key")
+    assert client.heads[-1] == {"if-none-match": '"v1"'}
+
+
+def test_info_cache_evicts_and_is_invalidated_by_changes(
+    cached_object, client
+):
+    cache = cached_object.info_cache
+
+    cached_object.object_info("key")
+    cached_object.object_info("other")
+    cached_object.object_info("key")
+    assert cache.misses == 3
+
+    cached_object.delete_iter(["key", "locked-key"], quiet=True)
+    cached_object.object_info("key")
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_info_cache_drops_every_version_of_changed_objects(
+    cached_object, client
+):
+    cached_object.object_info("key")
+
+    cached_object.delete("key", "old-version")
+    client.e_tags["key"] = "v2"
+
+    assert cached_object.object_info("key").e_tag == "v2"
@@ -0,0 +1,125 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+from gyver.url import URL
+
+from simple_aws.credentials import Credentials
+from simple_aws.http import AuthHttpClient
+from simple_aws.instrumentation import Histogram
+from simple_aws.instrumentation import RequestStats
+from simple_aws.retry import RetryPolicy
+from simple_aws.services.s3.object.core import describe_request
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    statuses = [503, 200, 200]
+
+    def do_GET(self):
+        body = b"content"
+        self.send_response(self.statuses.pop(0))
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield URL(f"http://127.0.0.1:{server.server_port}/key")
+    server.shutdown()
+
+
+def test_hooks_receive_one_record_per_request(
+    credential: Credentials, server_url
+):
+    records = []
+    stats = RequestStats()
+    client = AuthHttpClient(
+        credential,
+        "s3",
+        retry_policy=RetryPolicy(base_delay=0),
+        hooks=(records.append, stats),
+    )
+
+    client.get(server_url)
+    client.get(server_url)
+
+    first, second = records
+    assert (first.operation, first.status, first.retries) == ("GET", 200, 1)
+    assert first.bytes_received == len(b"content")
+    assert first.signing_time > 0
+    assert 0 < first.time_to_first_byte <= first.total_time
+    assert not first.connection_reused
+    assert second.connection_reused and second.retries == 0
+    (summary,) = stats.summary().values()
+    assert summary["requests"] == 2 and summary["retries"] == 1
+
+
+class FailingTransport:
+    def request(self, method, url, headers, *args, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    def close(self):
+        pass
+
+
+def test_failing_hooks_keep_the_request_outcome(
+    credential: Credentials, server_url, caplog
+):
+    def failing_hook(record):
+        raise RuntimeError("hook failed")
+
+    records = []
+    hooks = (failing_hook, records.append)
+    client = AuthHttpClient(
+        credential,
+        "s3",
+        retry_policy=RetryPolicy(max_attempts=1),
+        hooks=hooks,
+    )
+    failing = AuthHttpClient(
+        credential,
+        "s3",
+        retry_policy=RetryPolicy(max_attempts=1),
+        hooks=hooks,
+        transport_factory=lambda options: FailingTransport(),
+    )
+
+    Handler.statuses = [200]
+    assert client.get(server_url).status_code == 200
+    with pytest.raises(requests.ConnectionError):
+        failing.get(server_url)
+
+    assert [record.status for record in records] == [200, None]
+    assert caplog.text.count("RuntimeError: hook failed") == 2
+
+
+def test_describe_request_names_s3_operations():
+    url = URL("https://bucket.s3.us-east-1.amazonaws.com/key")
+
+    assert describe_request("HEAD", url, {}) == ("HeadObject", "bucket")
+    assert describe_request(
+        "PUT", url.copy().add({"uploadId": "1"}), {"x-amz-copy-source": "a"}
+    ) == ("UploadPartCopy", "bucket")
+    assert describe_request("POST", url.copy().add({"delete": ""}), {})[0] == (
+        "DeleteObjects"
+    )
+
+
+def test_histogram_percentiles_within_growth():
+    histogram = Histogram(growth=1.05)
+    for value in range(1, 1001):
+        histogram.add(value / 1000)
+
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.05)
+    assert histogram.percentile(100) == 1.0
@@ -0,0 +1,207 @@
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import UnexpectedResponse
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.models import StorageClass
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.list_ import List
+from simple_aws.services.s3.object.list_ import ListPageParser
+from simple_aws.services.s3.object.list_ import parse_key
+from simple_aws.services.s3.object.list_ import parse_record
+from simple_aws.utils import xmlns
+
+
+def make_page(keys: int, truncated: bool, namespace: str = xmlns) -> bytes:
+    contents = "".join(
+        "<Contents>"
+        f"<Key>object-{index}.txt</Key>"
+        "<LastModified>2023-01-01T00:00:00.000Z</LastModified>"
+        '<ETag>"d41d8cd98f00b204e9800998ecf8427e"</ETag>'
+        f"<Size>{index}</Size>"
+        "<StorageClass>STANDARD</StorageClass>"
+        "</Contents>"
+        for index in range(keys)
+    )
+    token = (
+        "<NextContinuationToken>next-token</NextContinuationToken>"
+        if truncated
+        else ""
+    )
+    return (
+        f'<ListBucketResult xmlns="{namespace}">'
+        f"<IsTruncated>{str(truncated).lower()}</IsTruncated>"
+        f"{contents}{token}</ListBucketResult>"
+    ).encode()
+
+
+def test_list_page_parser_yields_entries_as_they_are_read():
+    page = make_page(50, truncated=True)
+    parser = ListPageParser()
+
+    received = [
+        item
+        for i in range(0, 1000, 100)
+        for item in parser.feed(page[i : i + 100])
+    ]
+    items = list(parser.feed(page[1000:]))
+
+    assert received
+    assert [item.key for item in received + items] == [
+        f"object-{index}.txt" for index in range(50)
+    ]
+    assert parser.close() == "next-token"
+
+
+@pytest.mark.parametrize("namespace", [xmlns, ""])
+def test_list_page_parser_reads_last_page(namespace: str):
+    parser = ListPageParser()
+
+    items = list(
+        parser.feed(make_page(3, truncated=False, namespace=namespace))
+    )
+
+    assert [item.key for item in items] == [
+        "object-0.txt",
+        "object-1.txt",
+        "object-2.txt",
+    ]
+    assert items[2].size == 2
+    assert parser.close() is None
+
+
+def test_list_page_parser_requires_a_token_for_truncated_pages():
+    parser = ListPageParser()
+    page = make_page(1, truncated=True).replace(b"next-token", b"")
+    list(parser.feed(page))
+
+    with pytest.raises(UnexpectedResponse):
+        parser.close()
+
+
+def test_list_page_parser_builds_compact_records_and_keys():
+    page = make_page(2, truncated=False)
+
+    infos = list(ListPageParser().feed(page))
+    records = list(ListPageParser(parse_record).feed(page))
+    keys = list(ListPageParser(parse_key).feed(page))
+
+    assert keys == ["object-0.txt", "object-1.txt"]
+    assert [record.key for record in records] == keys
+    assert records[1].storage_class is StorageClass.STANDARD
+    assert [record.to_file_info() for record in records] == infos
+
+
+class FakeResponse:
+    ok = True
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def iter_content(self, size: int):
+        for i in range(0, len(self.content), 64):
+            yield self.content[i : i + 64]
+
+
+class FakePagesClient:
+    """Serves two pages of three keys, starting from the token"""
+
+    def get(self, url, stream: bool = False):
+        first, rest = make_page(6, truncated=False).split(b"<Contents>", 1)
+        contents = [b"<Contents>" + c for c in rest.split(b"<Contents>")]
+        if "continuation-token=page-2" in url.encode():
+            page = first + b"".join(contents[3:])
+        else:
+            page = (
+                first.replace(b"false", b"true")
+                + b"".join(contents[:3])
+                + b"<NextContinuationToken>page-2</NextContinuationToken>"
+                + b"</ListBucketResult>"
+            )
+        return FakeResponse(page)
+
+
+@pytest.fixture
+def core(credential: Credentials, patch_client):
+    core = S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+    patch_client(core, FakePagesClient())
+    return core
+
+
+@pytest.mark.parametrize("stop_at", [1, 3, 4])
+def test_list_resumes_from_checkpoint(core: S3Core, stop_at: int):
+    lister = List(core, keys_only=True)
+    listed = []
+    for key in lister:
+        listed.append(key)
+        if len(listed) == stop_at:
+            break
+
+    resumed = List(core, keys_only=True, resume_from=lister.checkpoint)
+
+    assert listed + list(resumed) == [f"object-{i}.txt" for i in range(6)]
+    assert resumed.checkpoint.last_key == "object-5.txt"
+
+
+def test_list_resumes_after_the_last_key_when_the_bucket_changes(
+    s3_object: S3Object, backend: InMemoryS3
+):
+    for index in range(9):
+        backend.put_object("bucket", f"object-{index}.txt", b"")
+    lister = List(s3_object.core, chunksize=3, keys_only=True)
+    listed = []
+    for key in lister:
+        listed.append(key)
+        if len(listed) == 4:
+            break
+
+    backend.delete_object("bucket", "object-3.txt")
+    backend.delete_object("bucket", "object-7.txt")
+    backend.put_object("bucket", "object-4a.txt", b"")
+    resumed = List(
+        s3_object.core,
+        chunksize=3,
+        keys_only=True,
+        resume_from=lister.checkpoint,
+    )
+
+    assert listed == [f"object-{index}.txt" for index in range(4)]
+    assert list(resumed) == [
+        "object-4.txt",
+        "object-4a.txt",
+        "object-5.txt",
+        "object-6.txt",
+        "object-8.txt",
+    ]
+
+
+def test_delimited_list_resumes_after_the_last_prefix(
+    s3_object: S3Object, backend: InMemoryS3
+):
+    for key in ("a.txt", "b.txt", "x/1", "y/1", "z/1"):
+        backend.put_object("bucket", key, b"")
+    lister = List(s3_object.core, keys_only=True, delimiter="/")
+    listed = []
+    for key in lister:
+        listed.append(key)
+        if len(listed) == 3:
+            break
+
+    backend.put_object("bucket", "c.txt", b"")
+    resumed = List(
+        s3_object.core,
+        keys_only=True,
+        delimiter="/",
+        resume_from=lister.checkpoint,
+    )
+
+    assert listed == ["a.txt", "b.txt", "x/"]
+    assert list(resumed) == ["c.txt", "y/", "z/"]
@@ -0,0 +1,172 @@
+import io
+import threading
+from typing import Callable
+from typing import Optional
+
+import pytest
+import urllib3
+
+from simple_aws.exc import InvalidParam
+from simple_aws.exc import RequestFailed
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.services.s3.object.multipart import MAX_PARTS
+from simple_aws.services.s3.object.multipart import MIN_PART_SIZE
+from simple_aws.services.s3.object.multipart import fit_part_size
+from simple_aws.services.s3.object.multipart import run_parts
+from simple_aws.transport import Transport
+from simple_aws.transport import TransportFactory
+from simple_aws.transport import TransportOptions
+from simple_aws.transport import build_response
+
+CONTENT = bytes(range(256)) * (MIN_PART_SIZE * 2 // 256) + b"last part"
+
+
+class FaultyTransport:
+    """Answers requests `fail` returns a status for with that status,
+    sending the others to `transport`"""
+
+    def __init__(
+        self, transport: Transport, fail: Callable[[str], Optional[int]]
+    ):
+        self.transport = transport
+        self.fail = fail
+        self.sent: list[tuple[str, str]] = []
+
+    def request(self, method, url, headers, data=None, files=None, **kwargs):
+        self.sent.append((method, url))
+        status = self.fail(url)
+        if status is None:
+            return self.transport.request(
+                method, url, headers, data, files, **kwargs
+            )
+        return build_response(
+            url,
+            urllib3.HTTPResponse(
+                io.BytesIO(b""), {}, status, preload_content=False
+            ),
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+def faulty_transport(
+    backend: InMemoryS3, fail: Callable[[str], Optional[int]]
+) -> tuple[TransportFactory, list[FaultyTransport]]:
+    """Returns a factory of transports failing the requests `fail`
+    picks, with the transports it built"""
+    transports: list[FaultyTransport] = []
+
+    def transport(options: TransportOptions) -> FaultyTransport:
+        transports.append(FaultyTransport(backend.transport(options), fail))
+        return transports[-1]
+
+    return transport, transports
+
+
+def test_fit_part_size_grows_to_respect_max_parts():
+    assert fit_part_size(MIN_PART_SIZE, None) == MIN_PART_SIZE
+    assert fit_part_size(MIN_PART_SIZE, MIN_PART_SIZE * 3) == MIN_PART_SIZE
+    large = MIN_PART_SIZE * MAX_PARTS * 2
+    assert fit_part_size(MIN_PART_SIZE, large) * MAX_PARTS >= large
+
+    with pytest.raises(InvalidParam):
+        fit_part_size(MIN_PART_SIZE - 1, None)
+
+
+def test_run_parts_returns_etags_in_part_order():
+    parts = ((number, f"part-{number}") for number in range(1, 21))
+
+    result = run_parts(parts, lambda number, part: part.upper(), 4)
+
+    assert result == [(number, f"PART-{number}") for number in range(1, 21)]
+
+
+def test_run_parts_bounds_parts_in_flight():
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def send(number: int, part: int):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.005)
+        with lock:
+            active -= 1
+        return str(part)
+
+    run_parts(((n, n) for n in range(1, 41)), send, 3)
+
+    assert peak <= 3
+
+
+def test_run_parts_stops_pulling_parts_after_a_failure():
+    pulled = []
+
+    def parts():
+        for number in range(1, 1001):
+            pulled.append(number)
+            yield number, number
+
+    def send(number: int, part: int):
+        if number == 2:
+            raise ValueError("failed part")
+        threading.Event().wait(0.001)
+        return str(part)
+
+    with pytest.raises(ValueError):
+        run_parts(parts(), send, 2)
+    assert len(pulled) < 1000
+
+
+def test_multipart_upload_creates_uploads_parts_and_completes(
+    s3_object: S3Object, backend: InMemoryS3
+):
+    s3_object.upload_multipart(
+        "large.txt", CONTENT, part_size=MIN_PART_SIZE, concurrency=2
+    )
+
+    stored = backend.get_object("bucket", "large.txt")
+    assert stored is not None and stored.content == CONTENT
+    assert stored.e_tag.endswith("-3")
+    assert stored.headers["content-type"] == "text/plain"
+    assert backend.uploads == {}
+    assert s3_object.object_info("large.txt").size == len(CONTENT)
+
+
+def test_multipart_upload_is_aborted_when_a_part_fails(
+    backend: InMemoryS3, make_object
+):
+    transport, transports = faulty_transport(
+        backend, lambda url: 403 if "partNumber=2" in url else None
+    )
+    s3 = make_object(backend, transport=transport)
+
+    with pytest.raises(RequestFailed):
+        s3.upload_multipart("large.txt", CONTENT, part_size=MIN_PART_SIZE)
+
+    assert backend.get_object("bucket", "large.txt") is None
+    assert backend.uploads == {}
+    assert transports[0].sent[-1][0] == "DELETE"
+
+
+def test_multipart_upload_retries_a_failed_part(
+    backend: InMemoryS3, make_object
+):
+    failures = iter((503,))
+    transport, transports = faulty_transport(
+        backend,
+        lambda url: next(failures, None) if "partNumber=2" in url else None,
+    )
+    s3 = make_object(backend, transport=transport)
+
+    s3.upload_multipart("large.txt", CONTENT, part_size=MIN_PART_SIZE)
+
+    stored = backend.get_object("bucket", "large.txt")
+    assert stored is not None and stored.content == CONTENT
+    part_requests = [
+        url for _, url in transports[0].sent if "partNumber=2" in url
+    ]
+    assert len(part_requests) == 2
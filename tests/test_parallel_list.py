@@ -0,0 +1,73 @@
+import random
+import time
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.models import CommonPrefix
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.list_ import List
+from simple_aws.services.s3.object.parallel_list import ParallelList
+
+KEYS = sorted(
+    [f"dir-{d}/file-{f:03d}" for d in range(5) for f in range(120)]
+    + ["dir-2", "root-a", "root-b"]
+)
+
+
+def fake_iter(self: List):
+    """Lists `KEYS` the way S3 would, with random latency"""
+    prefixes = set()
+    for key in KEYS:
+        if self.prefix and not key.startswith(self.prefix):
+            continue
+        if self.start_after is not None and key <= self.start_after:
+            continue
+        if self.stop_after is not None and key > self.stop_after:
+            return
+        time.sleep(random.random() / 10_000)
+        rest = key[len(self.prefix or "") :]
+        if self.delimiter and self.delimiter in rest:
+            prefix = key[: key.index(self.delimiter, len(self.prefix or ""))]
+            prefix += self.delimiter
+            if prefix not in prefixes:
+                prefixes.add(prefix)
+                yield CommonPrefix(prefix)
+            continue
+        yield key
+
+
+@pytest.fixture
+def core(credential: Credentials, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(List, "iter", fake_iter)
+    return S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("boundaries", [None, ["dir-1/file-050", "dir-3"]])
+def test_parallel_list_lists_every_key_once(core, ordered, boundaries):
+    lister = ParallelList(
+        core,
+        boundaries=boundaries,
+        concurrency=3,
+        ordered=ordered,
+        chunksize=7,
+        keys_only=True,
+    )
+
+    keys = list(lister)
+
+    assert keys == KEYS if ordered else sorted(keys) == KEYS
+
+
+def test_parallel_list_raises_shard_errors(core, monkeypatch):
+    def failing_iter(self: List):
+        if self.prefix == "dir-3/":
+            raise RuntimeError("shard failed")
+        yield from fake_iter(self)
+
+    monkeypatch.setattr(List, "iter", failing_iter)
+
+    with pytest.raises(RuntimeError, match="shard failed"):
+        list(ParallelList(core, concurrency=2, keys_only=True))
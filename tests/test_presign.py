@@ -0,0 +1,100 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from simple_aws.credentials import Credentials
+from simple_aws.exc import InvalidParam
+from simple_aws.services.s3.config import S3ObjectConfig
+from simple_aws.services.s3.object import get
+from simple_aws.services.s3.object.core import S3Core
+from simple_aws.services.s3.object.get import Get
+from simple_aws.services.s3.object.presign import PresignCache
+from simple_aws.services.s3.object.presign import Presigner
+
+NOW = datetime(2023, 5, 17, 12, 30, 15, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+@pytest.fixture
+def core(credential: Credentials):
+    return S3Core(credential, S3ObjectConfig(bucket_name="bucket"))
+
+
+def test_presigner_matches_single_presigned_url(core, monkeypatch):
+    monkeypatch.setattr(get, "datetime", FrozenDatetime)
+    names = [
+        "file.txt",
+        "/folder/sub folder/file name.txt",
+        "ünïcödé/ファイル.bin",
+        "a?b&c=d+e#f;g",
+        "already%20escaped",
+    ]
+
+    urls = Presigner(core, 3600, NOW).sign_many(names)
+
+    assert urls == [
+        Get(core, name).presigned_url(3600).encode() for name in names
+    ]
+
+
+def test_presigner_validates_expires(core):
+    with pytest.raises(InvalidParam):
+        Presigner(core, 0)
+
+
+def test_presign_cache_serves_urls_with_enough_lifetime(core):
+    cache = PresignCache(maxsize=2, min_remaining=0.5)
+    first = Presigner(core, 100, NOW).sign_many(["a", "b"], cache)
+
+    later = NOW + timedelta(seconds=40)
+    assert Presigner(core, 100, later).sign_many(["a", "b"], cache) == first
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    expired = NOW + timedelta(seconds=51)
+    assert Presigner(core, 100, expired).sign_many(["a"], cache) != first[:1]
+    assert cache.misses == 3
+
+
+def test_presign_cache_evicts_least_recently_used(core):
+    cache = PresignCache(maxsize=2)
+    presigner = Presigner(core, 100, NOW)
+
+    presigner.sign_many(["a", "b", "a", "c", "b"], cache)
+
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_presign_cache_keeps_urls_of_other_credentials_apart(
+    core, credential: Credentials
+):
+    cache = PresignCache()
+    others = [
+        S3Core(
+            credential.copy(update=update),
+            S3ObjectConfig(bucket_name="bucket"),
+        )
+        for update in (
+            {"access_key_id": "AKIAOTHEREXAMPLE"},
+            {"region": "eu-west-1"},
+        )
+    ]
+
+    urls = [
+        Presigner(current, 100, NOW).sign_many(["a"], cache)
+        for current in (core, *others)
+    ]
+
+    assert cache.misses == 3
+    assert urls == [
+        Presigner(current, 100, NOW).sign_many(["a"])
+        for current in (core, *others)
+    ]
+    assert "AKIAOTHEREXAMPLE" in urls[1][0]
+    assert urls[2][0].startswith("https://bucket.s3.eu-west-1.")
@@ -0,0 +1,144 @@
+import pytest
+import requests
+from gyver.url import URL
+
+from simple_aws.credentials import Credentials
+from simple_aws.http import AuthHttpClient
+from simple_aws.retry import AdaptiveRateLimiter
+from simple_aws.retry import RetryPolicy
+from simple_aws.retry import rate_key
+
+URL_ = URL("https://bucket.s3.us-east-1.amazonaws.com/prefix/key")
+
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    """Answers with the scripted statuses, raising the exceptions"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.dates: list[str] = []
+
+    def request(
+        self, method, url, headers, data=None, files=None, stream=False
+    ):
+        self.dates.append(headers.get("x-amz-date", ""))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def make_client(
+    credential: Credentials,
+    transport: FakeTransport,
+    retry_policy: RetryPolicy = RetryPolicy(base_delay=0),
+    **kwargs,
+):
+    return AuthHttpClient(
+        credential,
+        "s3",
+        retry_policy=retry_policy,
+        transport_factory=lambda options: transport,
+        **kwargs,
+    )
+
+
+def test_idempotent_requests_are_retried_until_success(credential):
+    transport = FakeTransport(requests.ConnectionError(), 503, 200)
+
+    response = make_client(credential, transport).get(URL_)
+
+    assert response.status_code == 200
+    assert len(transport.dates) == 3
+
+
+def test_retries_stop_at_max_attempts_and_skip_non_idempotent(credential):
+    transport = FakeTransport(500, 500, 500, 500)
+    client = make_client(credential, transport)
+
+    assert client.get(URL_).status_code == 500
+    assert len(transport.outcomes) == 1
+    assert client.post(URL_, b"data").status_code == 500
+    assert transport.outcomes == []
+
+
+def test_retries_wait_the_backoff_delays(credential):
+    transport = FakeTransport(500, requests.Timeout(), 200)
+    slept: list[float] = []
+
+    make_client(
+        credential,
+        transport,
+        retry_policy=RetryPolicy(base_delay=1, jitter=lambda: 1.0),
+        sleep=slept.append,
+    ).get(URL_)
+
+    assert slept == [1, 2]
+
+
+def test_non_retryable_statuses_are_returned(credential):
+    transport = FakeTransport(404)
+
+    assert make_client(credential, transport).get(URL_).status_code == 404
+
+
+def test_backoff_grows_exponentially_with_full_jitter():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=lambda: 1.0)
+
+    assert [policy.delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept += seconds
+        self.now += seconds
+
+
+def test_rate_limiter_backs_off_on_throttling_and_ramps_up():
+    clock = Clock()
+    limiter = AdaptiveRateLimiter(
+        backoff=0.5, ramp_up=10, clock=clock, sleep=clock.sleep
+    )
+    key = rate_key(URL_)
+    assert key == "bucket.s3.us-east-1.amazonaws.com/prefix"
+
+    for _ in range(100):
+        limiter.acquire(key)
+        clock.now += 0.01
+    assert clock.slept == 0
+    limiter.on_throttle(key)
+    assert limiter.rate(key) == pytest.approx(50)
+
+    start = clock.now
+    for _ in range(50):
+        limiter.acquire(key)
+    # the rate ramps up while requests wait for tokens
+    assert clock.now - start == pytest.approx(0.9, abs=0.05)
+    assert limiter.rate(key) > 50
+
+
+def test_client_reports_throttling_to_rate_limiter(credential):
+    clock = Clock()
+    limiter = AdaptiveRateLimiter(clock=clock, sleep=clock.sleep)
+    transport = FakeTransport(503, 200)
+
+    make_client(credential, transport, rate_limiter=limiter).get(URL_)
+
+    # throttled at a single request per second, the retry waits for it
+    assert clock.slept == pytest.approx(1 / limiter.min_rate)
@@ -0,0 +1,115 @@
+import io
+
+import pytest
+
+from simple_aws.auth import AwsAuthV4
+from simple_aws.auth import ChunkSigner
+from simple_aws.credentials import Credentials
+from simple_aws.exc import InvalidParam
+from simple_aws.services.s3 import S3Object
+from simple_aws.services.s3.memory import InMemoryS3
+from simple_aws.streaming import MIN_CHUNK_SIZE
+from simple_aws.streaming import ChunkedPayload
+from simple_aws.streaming import iter_chunks
+from simple_aws.streaming import source_length
+
+from .test_auth import now
+
+
+def _decode(body: bytes) -> list[bytes]:
+    chunks, position = [], 0
+    while True:
+        end = body.index(b"\r\n", position)
+        size = int(body[position:end].split(b";")[0], 16)
+        chunks.append(body[end + 2 : end + 2 + size])
+        position = end + 2 + size + 2
+        if not size:
+            assert position == len(body)
+            return chunks
+
+
+def _signer(credential: Credentials):
+    return ChunkSigner(AwsAuthV4(credential, "s3").prepare(now), "seed")
+
+
+def test_iter_chunks_rechunks_iterables_and_files():
+    pieces = [b"a" * 5, b"b" * 7, b"c" * 3]
+
+    assert list(iter_chunks(pieces, 4)) == list(
+        iter_chunks(io.BytesIO(b"".join(pieces)), 4)
+    )
+    assert [len(chunk) for chunk in iter_chunks(pieces, 4)] == [4, 4, 4, 3]
+
+
+def test_source_length_uses_remaining_bytes():
+    stream = io.BytesIO(b"x" * 100)
+    stream.seek(40)
+
+    assert source_length(stream) == 60
+    assert source_length(iter([b"x"])) is None
+
+
+def test_chunked_payload_frames_the_whole_source(credential: Credentials):
+    data = bytes(range(256)) * 200
+    payload = ChunkedPayload(
+        io.BytesIO(data), len(data), _signer(credential), MIN_CHUNK_SIZE
+    )
+
+    body = b"".join(payload)
+
+    assert len(body) == len(payload)
+    chunks = _decode(body)
+    assert b"".join(chunks) == data
+    assert chunks[-1] == b""
+    assert all(len(chunk) == MIN_CHUNK_SIZE for chunk in chunks[:-2])
+
+
+def test_chunked_payload_rejects_size_mismatch(credential: Credentials):
+    payload = ChunkedPayload(
+        iter([b"x" * 10]), 20, _signer(credential), MIN_CHUNK_SIZE
+    )
+
+    with pytest.raises(InvalidParam):
+        b"".join(payload)
+
+
+def test_chunked_payload_stops_producer_when_consumer_stops_early(
+    credential: Credentials,
+):
+    data = b"x" * MIN_CHUNK_SIZE * 50
+    payload = ChunkedPayload(
+        io.BytesIO(data), len(data), _signer(credential), MIN_CHUNK_SIZE, 2
+    )
+
+    frames = iter(payload)
+    next(frames)
+    frames.close()  # joins the producer thread
+
+
+@pytest.mark.parametrize(
+    "size",
+    [0, MIN_CHUNK_SIZE, MIN_CHUNK_SIZE * 3 + 5],
+    ids=["empty", "exact-chunk", "multi-chunk"],
+)
+def test_streamed_uploads_and_downloads_round_trip(
+    s3_object: S3Object, backend: InMemoryS3, size: int
+):
+    content = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+
+    s3_object.upload_stream(
+        "key.bin",
+        iter_chunks(io.BytesIO(content), 1000),
+        content_length=size,
+        chunk_size=MIN_CHUNK_SIZE,
+    )
+    s3_object.upload_stream(
+        "file.bin", io.BytesIO(content), chunk_size=MIN_CHUNK_SIZE
+    )
+    chunks = list(
+        s3_object.iter_download("key.bin", chunk_size=MIN_CHUNK_SIZE)
+    )
+
+    assert backend.get_object("bucket", "key.bin").content == content
+    assert backend.get_object("bucket", "file.bin").content == content
+    assert b"".join(chunks) == content
+    assert all(len(chunk) <= MIN_CHUNK_SIZE for chunk in chunks)
@@ -0,0 +1,92 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+from gyver.url import URL
+
+from simple_aws.credentials import Credentials
+from simple_aws.http import AuthHttpClient
+from simple_aws.transport import TransportOptions
+from simple_aws.transport import Urllib3Transport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.answer(self.headers.get("authorization", "").encode())
+
+    def do_POST(self):
+        length = int(self.headers["content-length"])
+        self.answer(
+            self.headers["content-type"].encode()
+            + b"\n"
+            + self.rfile.read(length)
+        )
+
+    def answer(self, body: bytes):
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield URL(f"http://127.0.0.1:{server.server_port}/key")
+    server.shutdown()
+
+
+def test_urllib3_transport_sends_signed_requests_on_pooled_connections(
+    credential: Credentials, server_url
+):
+    records = []
+    client = AuthHttpClient(
+        credential,
+        "s3",
+        transport_factory=Urllib3Transport,
+        hooks=(records.append,),
+    )
+
+    first = client.get(server_url)
+    client.get(server_url)
+
+    assert first.ok and first.content.startswith(b"AWS4-HMAC-SHA256 ")
+    assert [record.connection_reused for record in records] == [False, True]
+
+
+def test_urllib3_transport_encodes_form_files(
+    credential: Credentials, server_url
+):
+    client = AuthHttpClient(
+        credential, "s3", transport_factory=Urllib3Transport
+    )
+
+    response = client.post(
+        server_url, {"key": "value"}, files={"file": b"content"}, raw=True
+    )
+
+    content_type, _, body = response.content.partition(b"\n")
+    assert content_type.startswith(b"multipart/form-data; boundary=")
+    assert b'name="key"\r\n\r\nvalue' in body
+    assert b'name="file"; filename="file"' in body
+    assert b"\r\n\r\ncontent\r\n" in body
+
+
+def test_urllib3_transport_raises_requests_errors():
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        port = unused.getsockname()[1]
+    transport = Urllib3Transport(TransportOptions(keep_alive=False))
+
+    with pytest.raises(requests.ConnectionError):
+        transport.request("GET", f"http://127.0.0.1:{port}/key", {})